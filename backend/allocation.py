@@ -0,0 +1,266 @@
+"""
+Batch placement allocation
+Students order the profiles they applied to, recruiters rank each
+profile's applicants, and one run turns both into offers for the whole
+cohort: a stable assignment (utils/stable_matching.py) written as
+'Selected' applications in a single transaction
+
+Only applications of the active season still 'Applied' take part, of students without a
+'Selected'/'Accepted' offer, ranked by both sides; each profile offers at
+most its free seats. Declined offers free their seat, so running again
+later fills them from the remaining applicants.
+
+Usage:
+    python allocation.py             # allocate and write the offers
+    python allocation.py --dry-run   # compute only, nothing is written
+"""
+
+import argparse
+import json
+import time
+import psycopg2.extensions
+from config import config
+from database import execute_query, transaction
+from utils import metrics
+from utils.log import get_logger
+from utils.stable_matching import Proposals, deferred_acceptance, assigned_pairs
+
+
+log = get_logger(__name__)
+
+# changed_by value recorded for offers made by a command-line run
+ALLOCATION_ACTOR = 'system:allocation'
+
+# Rows fetched per round trip while loading the preference pairs
+FETCH_SIZE = 10000
+
+
+def get_preferences(entry_number):
+    """A student's preference list, most wanted profile first"""
+    rows = execute_query(
+        """
+        SELECT profile_code FROM student_preference
+        WHERE season = active_season() AND entry_number = %s
+        ORDER BY preference
+        """,
+        (entry_number,),
+        fetch_all=True
+    )
+    return [row['profile_code'] for row in rows]
+
+
+def set_preferences(entry_number, profile_codes):
+    """
+    Replace a student's preference list
+
+    Raises:
+        psycopg2.IntegrityError: If the student has not applied to one of
+            the profiles (or a profile is listed twice)
+    """
+    with transaction() as cursor:
+        cursor.execute(
+            "DELETE FROM student_preference WHERE season = active_season() AND entry_number = %s",
+            (entry_number,)
+        )
+        cursor.execute(
+            """
+            INSERT INTO student_preference (entry_number, profile_code, preference)
+            SELECT %s, t.profile_code, t.preference
+            FROM unnest(%s::int[]) WITH ORDINALITY AS t(profile_code, preference)
+            """,
+            (entry_number, list(profile_codes))
+        )
+
+
+def get_ranking(profile_code):
+    """A profile's ranking of its applicants, best first"""
+    rows = execute_query(
+        """
+        SELECT entry_number FROM recruiter_ranking
+        WHERE season = active_season() AND profile_code = %s
+        ORDER BY ranking
+        """,
+        (profile_code,),
+        fetch_all=True
+    )
+    return [row['entry_number'] for row in rows]
+
+
+def set_ranking(profile_code, entry_numbers):
+    """
+    Replace a profile's ranking
+
+    Raises:
+        psycopg2.IntegrityError: If one of the students has not applied to
+            the profile (or a student is listed twice)
+    """
+    with transaction() as cursor:
+        cursor.execute(
+            "DELETE FROM recruiter_ranking WHERE season = active_season() AND profile_code = %s",
+            (profile_code,)
+        )
+        cursor.execute(
+            """
+            INSERT INTO recruiter_ranking (profile_code, entry_number, ranking)
+            SELECT %s, t.entry_number, t.ranking
+            FROM unnest(%s::text[]) WITH ORDINALITY AS t(entry_number, ranking)
+            """,
+            (profile_code, list(entry_numbers))
+        )
+
+
+def _load(cursor):
+    """Eligible pairs in (student, preference) order, and the free seats of their profiles"""
+    cursor.execute(
+        """
+        SELECT sp.entry_number, sp.profile_code, rr.ranking
+        FROM student_preference sp
+        JOIN recruiter_ranking rr
+            ON rr.season = sp.season
+           AND rr.profile_code = sp.profile_code AND rr.entry_number = sp.entry_number
+        JOIN application a
+            ON a.season = sp.season
+           AND a.profile_code = sp.profile_code AND a.entry_number = sp.entry_number
+        WHERE sp.season = active_season()
+          AND a.status = 'Applied'
+          AND NOT EXISTS (
+              SELECT 1 FROM application l
+              WHERE l.season = active_season()
+                AND l.entry_number = sp.entry_number AND l.status IN ('Selected', 'Accepted')
+          )
+        ORDER BY sp.entry_number, sp.preference
+        """
+    )
+
+    def rows():
+        while True:
+            batch = cursor.fetchmany(FETCH_SIZE)
+            if not batch:
+                return
+            yield from batch
+
+    proposals = Proposals.from_rows(rows())
+
+    cursor.execute(
+        """
+        SELECT profile_code, openings - seats_filled
+        FROM profile
+        WHERE profile_code = ANY(%s)
+        """,
+        (proposals.profiles,)
+    )
+    return proposals, dict(cursor.fetchall())
+
+
+def _write_offers(cursor, pairs, changed_by):
+    """Mark the assigned applications 'Selected', take their seats and record history"""
+    cursor.execute(
+        """
+        WITH pairs AS (
+            SELECT * FROM unnest(%(profile_codes)s::int[], %(entry_numbers)s::text[])
+                AS t(profile_code, entry_number)
+        ), upd AS (
+            UPDATE application a
+            SET status = 'Selected', status_changed_at = now()
+            FROM pairs
+            WHERE a.season = active_season()
+              AND a.profile_code = pairs.profile_code
+              AND a.entry_number = pairs.entry_number
+              AND a.status = 'Applied'
+            RETURNING a.profile_code, a.entry_number
+        ), seats AS (
+            UPDATE profile p
+            SET seats_filled = p.seats_filled + c.n
+            FROM (SELECT profile_code, count(*) AS n FROM upd GROUP BY profile_code) c
+            WHERE p.profile_code = c.profile_code
+        )
+        INSERT INTO application_status_history
+            (profile_code, entry_number, old_status, new_status, changed_by)
+        SELECT profile_code, entry_number, 'Applied', 'Selected', %(changed_by)s FROM upd
+        """,
+        {
+            'profile_codes': [code for code, _ in pairs],
+            'entry_numbers': [entry for _, entry in pairs],
+            'changed_by': changed_by
+        }
+    )
+    return cursor.rowcount
+
+
+def summarize(proposals, pairs, written, dry_run, timings):
+    """Result shape shared by both repository engines"""
+    return {
+        'dry_run': dry_run,
+        'students': len(proposals.students),
+        'profiles': len(proposals.profiles),
+        'pairs': len(proposals),
+        'placed': written,
+        'unplaced': len(proposals.students) - len(pairs),
+        'offers': [{'profile_code': code, 'entry_number': entry} for code, entry in pairs],
+        'timings_ms': {step: round(seconds * 1000, 1) for step, seconds in timings.items()}
+    }
+
+
+def run_allocation(changed_by=ALLOCATION_ACTOR, dry_run=False):
+    """
+    Compute a stable assignment and write it as offers, all in one transaction
+
+    Writes to application and profile are held off for the length of the
+    run (a table lock taken before anything is read), so the inputs cannot
+    change under the matching and no seat is given out twice. Reads go on
+    as usual; writers queue for the few seconds a run takes. If running
+    writes do not finish within ALLOCATION_LOCK_TIMEOUT_SECONDS the run
+    fails without changes.
+
+    Args:
+        changed_by (str): Recorded in the status history of every offer
+        dry_run (bool): Compute the offers but roll back instead of writing
+
+    Returns:
+        dict: {"dry_run", "students", "profiles", "pairs", "placed",
+               "unplaced", "offers": [{"profile_code", "entry_number"}],
+               "timings_ms": {"load", "match", "write"}}
+    """
+    timings = {}
+    with transaction(cursor_factory=psycopg2.extensions.cursor) as cursor:
+        started = time.perf_counter()
+        cursor.execute("SET LOCAL lock_timeout = %s", (f"{config.ALLOCATION_LOCK_TIMEOUT_SECONDS}s",))
+        # SHARE ROW EXCLUSIVE conflicts with every writer but not with readers.
+        # Status changes take their table locks before any row lock, so
+        # taking this first cannot deadlock with them.
+        cursor.execute("LOCK TABLE application, profile IN SHARE ROW EXCLUSIVE MODE")
+        proposals, free_seats = _load(cursor)
+        timings['load'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        assignment = deferred_acceptance(proposals, proposals.capacities(free_seats))
+        pairs = assigned_pairs(proposals, assignment)
+        timings['match'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if dry_run:
+            written = len(pairs)
+            cursor.connection.rollback()
+        else:
+            written = _write_offers(cursor, pairs, changed_by) if pairs else 0
+        timings['write'] = time.perf_counter() - started
+
+    result = summarize(proposals, pairs, written, dry_run, timings)
+    metrics.incr('allocation.runs')
+    metrics.incr('allocation.offers', 0 if dry_run else written)
+    log.info("Allocation run", extra={key: value for key, value in result.items() if key != 'offers'})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Allocate offers from preferences and rankings')
+    parser.add_argument('--dry-run', action='store_true', help='compute only, write nothing')
+    args = parser.parse_args()
+
+    result = run_allocation(dry_run=args.dry_run)
+    result.pop('offers')
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -17,16 +17,26 @@ from routes.auth import auth_bp
 from routes.student import student_bp
 from routes.recruiter import recruiter_bp
 from routes.admin import admin_bp
+from routes.events import events_bp
+from routes.batch import batch_bp
+from middleware.compression import init_compression
+from middleware.read_routing import init_read_routing
+from middleware.request_id import init_request_id
 
 def create_app():
     app = Flask(__name__)
-    CORS(app)
+    CORS(app, expose_headers=['X-Request-ID', 'X-Refreshed-Token'])
+    init_request_id(app)
+    init_compression(app)
+    init_read_routing(app)
 
     # Register Blueprints with /api prefix
     app.register_blueprint(auth_bp, url_prefix='/api')
     app.register_blueprint(student_bp, url_prefix='/api/student')
     app.register_blueprint(recruiter_bp, url_prefix='/api/recruiter')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
+    app.register_blueprint(batch_bp, url_prefix='/api')
 
     @app.route('/')
     def index():
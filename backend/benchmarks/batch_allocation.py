@@ -0,0 +1,239 @@
+"""
+Batch allocation benchmark
+Generates a synthetic placement cohort (skewed profile popularity, ranked
+applicants, limited openings), runs the allocation and checks that the
+result is stable and respects every profile's openings
+
+Usage (from backend/):
+    python benchmarks/batch_allocation.py                        # matching engine only
+    python benchmarks/batch_allocation.py --backend memory       # full run on the in-memory repository
+    python benchmarks/batch_allocation.py --backend postgres     # full run on DATABASE_URL
+
+The Postgres backend bulk-inserts a fresh cohort (users, profiles,
+applications, preferences, rankings) under a new id prefix on every run
+and writes the offers: use a scratch database.
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.stable_matching import Proposals, deferred_acceptance, assigned_pairs
+
+
+def generate(students, profiles, choices, seat_ratio, seed):
+    """
+    Synthetic cohort
+
+    Returns:
+        dict: {"preferences": [[profile index, ...] per student, most wanted first],
+               "rankings": [[student index, ...] per profile, best first],
+               "openings": [seats per profile]}
+    """
+    rng = random.Random(seed)
+    popularity = [rng.paretovariate(1.2) for _ in range(profiles)]
+    cumulative = list(itertools.accumulate(popularity))
+    merit = [rng.random() for _ in range(students)]
+
+    preferences = []
+    applicants = [[] for _ in range(profiles)]
+    for student in range(students):
+        picks = set()
+        while len(picks) < min(choices, profiles):
+            picks.update(rng.choices(range(profiles), cum_weights=cumulative, k=choices - len(picks)))
+        ordered = sorted(picks, key=lambda p: -popularity[p] * rng.uniform(0.5, 1.5))
+        preferences.append(ordered)
+        for profile in ordered:
+            applicants[profile].append(student)
+
+    rankings = [sorted(pool, key=lambda s: -(merit[s] + rng.gauss(0, 0.1))) for pool in applicants]
+    mean_openings = seat_ratio * students / profiles
+    openings = [max(1, round(mean_openings * rng.uniform(0.5, 1.5))) for _ in range(profiles)]
+    return {'preferences': preferences, 'rankings': rankings, 'openings': openings}
+
+
+def rank_tables(cohort):
+    """profile index -> {student index: rank}"""
+    return [{student: rank for rank, student in enumerate(ranking, 1)}
+            for ranking in cohort['rankings']]
+
+
+def match_in_process(cohort, ranks):
+    """Run the engine on the cohort; returns ({student: profile}, timings)"""
+    started = time.perf_counter()
+    rows = (
+        (student, profile, ranks[profile][student])
+        for student, preferences in enumerate(cohort['preferences'])
+        for profile in preferences
+    )
+    proposals = Proposals.from_rows(rows)
+    capacities = proposals.capacities(dict(enumerate(cohort['openings'])))
+    built = time.perf_counter()
+
+    assignment = deferred_acceptance(proposals, capacities)
+    matched = time.perf_counter()
+
+    placed = {student: profile for profile, student in assigned_pairs(proposals, assignment)}
+    return placed, {'build': built - started, 'match': matched - built}
+
+
+def check(cohort, ranks, placed):
+    """Assert capacity and stability: no student/profile pair prefers each other"""
+    held = [[] for _ in cohort['openings']]
+    for student, profile in placed.items():
+        held[profile].append(ranks[profile][student])
+    for profile, ranks_held in enumerate(held):
+        assert len(ranks_held) <= cohort['openings'][profile], f"profile {profile} over capacity"
+        ranks_held.sort()
+
+    for student, preferences in enumerate(cohort['preferences']):
+        for profile in preferences:
+            if placed.get(student) == profile:
+                break
+            # The student wants this profile more: it must be full of better-ranked students
+            ranks_held = held[profile]
+            worse = len(ranks_held) - bisect.bisect_right(ranks_held, ranks[profile][student])
+            assert len(ranks_held) == cohort['openings'][profile] and worse == 0, \
+                f"blocking pair: student {student}, profile {profile}"
+
+
+def seed_memory(repo, cohort):
+    """Load the cohort through the repository API; returns (student ids, profile codes)"""
+    student_ids = [f"alloc_s{i:05d}" for i in range(len(cohort['preferences']))]
+    repo.add_user('alloc_r@bench', 'x', 'recruiter')
+    for userid in student_ids:
+        repo.add_user(userid, 'x', 'student')
+
+    codes = [repo.create_profile('alloc_r@bench', f"Company {i}", 'Engineer', openings)['profile_code']
+             for i, openings in enumerate(cohort['openings'])]
+    for student, preferences in enumerate(cohort['preferences']):
+        for profile in preferences:
+            repo.create_application(codes[profile], student_ids[student], changed_by=student_ids[student])
+        repo.set_preferences(student_ids[student], [codes[p] for p in preferences])
+    for profile, ranking in enumerate(cohort['rankings']):
+        repo.set_ranking(codes[profile], [student_ids[s] for s in ranking])
+    return student_ids, codes
+
+
+def seed_postgres(cohort):
+    """Bulk-insert the cohort under a fresh prefix; returns (student ids, profile codes)"""
+    from database import transaction
+
+    prefix = f"alloc{int(time.time())}"
+    recruiter = f"{prefix}_r@bench"
+    student_ids = [f"{prefix}_s{i:05d}" for i in range(len(cohort['preferences']))]
+    pairs = [(profile, student, preference)
+             for student, preferences in enumerate(cohort['preferences'])
+             for preference, profile in enumerate(preferences, 1)]
+
+    with transaction() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO users (userid, password_hash, role)
+            SELECT userid, 'x', role FROM unnest(%s::text[], %s::text[]) AS t(userid, role)
+            """,
+            ([recruiter] + student_ids, ['recruiter'] + ['student'] * len(student_ids))
+        )
+        cursor.execute(
+            """
+            INSERT INTO profile (recruiter_email, company_name, designation, openings)
+            SELECT %s, 'Company ' || n, 'Engineer', openings
+            FROM unnest(%s::int[]) WITH ORDINALITY AS t(openings, n)
+            ORDER BY n
+            RETURNING profile_code
+            """,
+            (recruiter, cohort['openings'])
+        )
+        codes = sorted(row['profile_code'] for row in cursor.fetchall())
+
+        profile_codes = [codes[profile] for profile, _, _ in pairs]
+        entry_numbers = [student_ids[student] for _, student, _ in pairs]
+        cursor.execute(
+            """
+            INSERT INTO application (season, profile_code, entry_number, status)
+            SELECT active_season(), profile_code, entry_number, 'Applied'
+            FROM unnest(%s::int[], %s::text[]) AS t(profile_code, entry_number)
+            """,
+            (profile_codes, entry_numbers)
+        )
+        cursor.execute(
+            """
+            INSERT INTO student_preference (entry_number, profile_code, preference)
+            SELECT * FROM unnest(%s::text[], %s::int[], %s::int[])
+            """,
+            (entry_numbers, profile_codes, [preference for _, _, preference in pairs])
+        )
+        ranked = [(codes[profile], student_ids[student], rank)
+                  for profile, ranking in enumerate(cohort['rankings'])
+                  for rank, student in enumerate(ranking, 1)]
+        cursor.execute(
+            """
+            INSERT INTO recruiter_ranking (profile_code, entry_number, ranking)
+            SELECT * FROM unnest(%s::int[], %s::text[], %s::int[])
+            """,
+            tuple(map(list, zip(*ranked)))
+        )
+        cursor.execute("ANALYZE application, student_preference, recruiter_ranking")
+    return student_ids, codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch allocation benchmark')
+    parser.add_argument('--backend', default=None, help='memory | postgres (default: engine only)')
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--profiles', type=int, default=2000)
+    parser.add_argument('--choices', type=int, default=20, help='applications per student')
+    parser.add_argument('--seat-ratio', type=float, default=0.8,
+                        help='total openings as a fraction of students')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    cohort = generate(args.students, args.profiles, args.choices, args.seat_ratio, args.seed)
+    ranks = rank_tables(cohort)
+    placed, timings = match_in_process(cohort, ranks)
+    check(cohort, ranks, placed)
+
+    result = {
+        'backend': args.backend or 'engine',
+        'students': args.students,
+        'profiles': args.profiles,
+        'pairs': sum(len(p) for p in cohort['preferences']),
+        'openings': sum(cohort['openings']),
+        'placed': len(placed),
+        'engine_ms': {step: round(seconds * 1000, 1) for step, seconds in timings.items()}
+    }
+
+    if args.backend:
+        from repositories import create_repository
+
+        repo = create_repository(args.backend)
+        started = time.perf_counter()
+        student_ids, codes = (seed_memory(repo, cohort) if args.backend == 'memory'
+                              else seed_postgres(cohort))
+        result['seed_seconds'] = round(time.perf_counter() - started, 2)
+
+        started = time.perf_counter()
+        run = repo.run_allocation(changed_by='system:benchmark')
+        result['run_seconds'] = round(time.perf_counter() - started, 3)
+        result['run_ms'] = run['timings_ms']
+
+        # The student-optimal stable assignment is unique: the run must find the same one
+        student_index = {userid: i for i, userid in enumerate(student_ids)}
+        profile_index = {code: i for i, code in enumerate(codes)}
+        offers = {student_index[offer['entry_number']]: profile_index[offer['profile_code']]
+                  for offer in run['offers'] if offer['entry_number'] in student_index}
+        assert offers == placed, "repository run differs from the in-process assignment"
+        assert run['placed'] == len(run['offers']), "some offers were not written"
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
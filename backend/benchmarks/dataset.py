@@ -0,0 +1,335 @@
+"""
+Synthetic placement dataset
+Generates a realistic, reproducible cohort and bulk-loads it with COPY:
+students, recruiters, profiles, applications with their status history,
+and student attributes. The same --seed always produces the same rows.
+
+Distributions:
+    profile popularity   Pareto: a few profiles draw most applications
+    profiles/recruiter   Zipf-like: a few recruiters post many profiles
+    applications/student log-normal, scaled to exactly --applications
+    statuses             per student: ~6% accepted an offer, ~4% hold one,
+                         ~30% of the other applications were turned down
+    openings             70% of profiles have some left, the rest are unlimited
+
+Defaults are placement-day scale (50k students, 2k recruiters, 10k profiles,
+1M applications); --scale shrinks or grows all four together.
+
+Usage (from backend/):
+    python benchmarks/dataset.py                          # full scale, about a minute
+    python benchmarks/dataset.py --scale 0.01 --prefix t1
+    python test_db.py                                     # check the result
+
+Every user id starts with --prefix, and all users share the password
+"password". Use a scratch database: rows are added to the active season,
+and a prefix that already exists is refused.
+"""
+
+import argparse
+import bisect
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2.extensions
+from bulk_import import _copy_escape
+from database import transaction
+
+
+# md5('password'): the frontend sends md5 hashes
+PASSWORD_MD5 = hashlib.md5(b'password').hexdigest()
+
+BRANCHES = [('CS', 30), ('EE', 20), ('ME', 15), ('CH', 10), ('CE', 10), ('MT', 5), ('PH', 5), ('MA', 5)]
+DEGREES = [('BTECH', 70), ('DUAL', 10), ('MTECH', 15), ('MSC', 5)]
+
+COMPANY_WORDS = ['Acme', 'Apex', 'Blue', 'Bright', 'Cloud', 'Delta', 'Edge', 'Globe', 'Green', 'Hyper',
+                 'Infra', 'Kite', 'Lumen', 'Meta', 'Nova', 'Orbit', 'Prime', 'Quant', 'Red', 'Sigma',
+                 'Silver', 'Stack', 'Terra', 'Vector', 'Zen']
+COMPANY_KINDS = ['Labs', 'Systems', 'Capital', 'Analytics', 'Technologies', 'Motors', 'Energy',
+                 'Consulting', 'Networks', 'Health', 'Securities', 'Robotics']
+DESIGNATIONS = ['Software Engineer', 'Data Scientist', 'Data Analyst', 'Product Manager',
+                'Quantitative Analyst', 'Hardware Engineer', 'Consultant', 'Research Engineer',
+                'Design Engineer', 'Business Analyst', 'Site Reliability Engineer', 'Trader']
+
+# Share of students who accepted an offer, and who hold one not yet answered
+ACCEPTED_SHARE = 0.06
+SELECTED_SHARE = 0.04
+# Share of the remaining applications already turned down
+REJECTED_SHARE = 0.30
+# Share of profiles with a limit on openings
+LIMITED_SHARE = 0.70
+
+DAY = 86400
+
+
+class CopyRows:
+    """File-like COPY text stream over an iterator of tuples (None -> NULL)"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self.count = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self.count += 1
+            self._buffer += '\t'.join(
+                '\\N' if value is None else _copy_escape(str(value)) for value in row
+            ) + '\n'
+
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def plan(students, recruiters, profiles, applications, seed):
+    """
+    Everything but the database ids, drawn from one seeded generator
+
+    Returns:
+        dict: {"recruiters": <count>,
+               "students": [(branch, degree, cgpa)],
+               "profiles": [(recruiter index, company, designation)],
+               "applications": [[(profile index, status, age seconds)] per student],
+               "openings": [extra free seats, or None for unlimited, per profile]}
+    """
+    rng = random.Random(seed)
+
+    student_rows = [
+        (_weighted(rng, BRANCHES), _weighted(rng, DEGREES),
+         round(min(10.0, max(4.0, rng.gauss(7.4, 1.1))), 2))
+        for _ in range(students)
+    ]
+
+    recruiter_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(recruiters)))
+    profile_rows = []
+    for _ in range(profiles):
+        recruiter = bisect.bisect_left(recruiter_weights, rng.random() * recruiter_weights[-1])
+        company = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_KINDS)}"
+        profile_rows.append((min(recruiter, recruiters - 1), company, rng.choice(DESIGNATIONS)))
+
+    # Applications per student: log-normal, scaled so the total comes out exact
+    weights = [rng.lognormvariate(0, 0.7) for _ in range(students)]
+    scale = applications / sum(weights)
+    counts = [min(profiles, max(1, round(w * scale))) for w in weights]
+    difference = applications - sum(counts)
+    step = 1 if difference > 0 else -1
+    position = 0
+    while difference:
+        student = position % students
+        if 1 <= counts[student] + step <= profiles:
+            counts[student] += step
+            difference -= step
+        position += 1
+
+    popularity = list(itertools.accumulate(rng.paretovariate(1.1) for _ in range(profiles)))
+    per_student = []
+    for count in counts:
+        picks = set()
+        while len(picks) < count:
+            picks.update(rng.choices(range(profiles), cum_weights=popularity, k=count - len(picks)))
+        picks = sorted(picks)
+
+        outcome = rng.random()
+        offer = rng.choice(picks) if outcome < ACCEPTED_SHARE + SELECTED_SHARE else None
+        rows = []
+        for profile in picks:
+            if profile == offer:
+                # Unanswered offers are recent, so the sweeper does not expire them at once
+                if outcome < ACCEPTED_SHARE:
+                    rows.append((profile, 'Accepted', rng.randrange(DAY, 30 * DAY)))
+                else:
+                    rows.append((profile, 'Selected', rng.randrange(0, DAY)))
+            elif rng.random() < REJECTED_SHARE:
+                rows.append((profile, 'Not Selected', rng.randrange(DAY, 45 * DAY)))
+            else:
+                rows.append((profile, 'Applied', rng.randrange(0, 60 * DAY)))
+        per_student.append(rows)
+
+    openings = [rng.randrange(0, 11) if rng.random() < LIMITED_SHARE else None for _ in range(profiles)]
+    return {'recruiters': recruiters, 'students': student_rows, 'profiles': profile_rows,
+            'applications': per_student, 'openings': openings}
+
+
+def load(cohort, prefix):
+    """
+    COPY the cohort into the active season in one transaction
+
+    Returns:
+        dict: rows written per table
+    """
+    student_ids = [f"{prefix}s{i:06d}" for i in range(len(cohort['students']))]
+    recruiter_ids = [f"{prefix}r{i:05d}@corp.example" for i in range(cohort['recruiters'])]
+    written = {}
+
+    with transaction(cursor_factory=psycopg2.extensions.cursor) as cursor:
+        cursor.execute("SELECT 1 FROM users WHERE userid LIKE %s LIMIT 1", (prefix + '%',))
+        if cursor.fetchone():
+            raise ValueError(f"Users with prefix {prefix!r} already exist; choose another --prefix")
+
+        cursor.execute("SELECT active_season(), extract(epoch FROM now())::bigint")
+        season, now = cursor.fetchone()
+
+        users = CopyRows(itertools.chain(
+            ((userid, PASSWORD_MD5, 'recruiter') for userid in recruiter_ids),
+            ((userid, PASSWORD_MD5, 'student') for userid in student_ids)
+        ))
+        cursor.copy_expert("COPY users (userid, password_hash, role) FROM STDIN", users)
+        written['users'] = users.count
+
+        attributes = CopyRows(
+            (userid, branch, degree, cgpa, '')
+            for userid, (branch, degree, cgpa) in zip(student_ids, cohort['students'])
+        )
+        cursor.copy_expert(
+            "COPY student_attributes (entry_number, branch, degree, cgpa, eligible_profiles) FROM STDIN",
+            attributes
+        )
+        written['student_attributes'] = attributes.count
+
+        # Take the codes up front so applications can reference them
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence('profile', 'profile_code')) FROM generate_series(1, %s)",
+            (len(cohort['profiles']),)
+        )
+        codes = sorted(code for code, in cursor.fetchall())
+
+        seats = [0] * len(codes)
+        for rows in cohort['applications']:
+            for profile, status, _ in rows:
+                if status in ('Selected', 'Accepted'):
+                    seats[profile] += 1
+
+        profiles = CopyRows(
+            (code, recruiter_ids[recruiter], company, designation, season,
+             None if extra is None else filled + extra, filled)
+            for code, (recruiter, company, designation), extra, filled
+            in zip(codes, cohort['profiles'], cohort['openings'], seats)
+        )
+        cursor.copy_expert(
+            "COPY profile (profile_code, recruiter_email, company_name, designation, season, "
+            "openings, seats_filled) FROM STDIN",
+            profiles
+        )
+        written['profile'] = profiles.count
+
+        applications = CopyRows(
+            (season, codes[profile], userid, status,
+             time.strftime('%Y-%m-%d %H:%M:%S+00', time.gmtime(now - age)))
+            for userid, rows in zip(student_ids, cohort['applications'])
+            for profile, status, age in rows
+        )
+        cursor.copy_expert(
+            "COPY application (season, profile_code, entry_number, status, status_changed_at) FROM STDIN",
+            applications
+        )
+        written['application'] = applications.count
+
+        # The history a real season would have left: the application,
+        # then the recruiter's decision, then the student's answer. Its
+        # per-row NOTIFY is off for the load: nobody wants a million events.
+        cursor.execute("ALTER TABLE application_status_history DISABLE TRIGGER trg_application_status_notify")
+        cursor.execute(
+            """
+            INSERT INTO application_status_history
+                (profile_code, entry_number, old_status, new_status, changed_by, changed_at)
+            SELECT profile_code, entry_number, old_status, new_status, changed_by, changed_at
+            FROM (
+                SELECT a.profile_code, a.entry_number, NULL AS old_status, 'Applied' AS new_status,
+                       a.entry_number AS changed_by,
+                       a.status_changed_at - CASE a.status WHEN 'Applied' THEN interval '0'
+                                                           ELSE interval '3 days' END AS changed_at
+                FROM application a
+                WHERE a.season = %(season)s AND a.entry_number LIKE %(students)s
+                UNION ALL
+                SELECT a.profile_code, a.entry_number, 'Applied',
+                       CASE a.status WHEN 'Accepted' THEN 'Selected' ELSE a.status END,
+                       p.recruiter_email,
+                       a.status_changed_at - CASE a.status WHEN 'Accepted' THEN interval '1 day'
+                                                           ELSE interval '0' END
+                FROM application a
+                JOIN profile p ON p.profile_code = a.profile_code
+                WHERE a.season = %(season)s AND a.entry_number LIKE %(students)s
+                  AND a.status <> 'Applied'
+                UNION ALL
+                SELECT a.profile_code, a.entry_number, 'Selected', 'Accepted',
+                       a.entry_number, a.status_changed_at
+                FROM application a
+                WHERE a.season = %(season)s AND a.entry_number LIKE %(students)s
+                  AND a.status = 'Accepted'
+            ) h
+            ORDER BY changed_at
+            """,
+            {'season': season, 'students': f"{prefix}s%"}
+        )
+        written['application_status_history'] = cursor.rowcount
+        cursor.execute("ALTER TABLE application_status_history ENABLE TRIGGER trg_application_status_notify")
+
+    # Fresh statistics, or the planner sees the tables as they were before
+    with transaction() as cursor:
+        cursor.execute("ANALYZE users, profile, application, application_view, application_status_history, student_attributes")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate and load a synthetic placement dataset')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies all four sizes')
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--recruiters', type=int, default=2000)
+    parser.add_argument('--profiles', type=int, default=10000)
+    parser.add_argument('--applications', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prefix', default='ds', help='prefix of every generated user id')
+    parser.add_argument('--dry-run', action='store_true', help='generate only, load nothing')
+    args = parser.parse_args()
+
+    students = max(1, math.ceil(args.students * args.scale))
+    recruiters = max(1, math.ceil(args.recruiters * args.scale))
+    profiles = max(1, math.ceil(args.profiles * args.scale))
+    applications = min(students * profiles, max(students, math.ceil(args.applications * args.scale)))
+
+    started = time.perf_counter()
+    cohort = plan(students, recruiters, profiles, applications, args.seed)
+    generated = time.perf_counter() - started
+
+    statuses = {}
+    for rows in cohort['applications']:
+        for _, status, _ in rows:
+            statuses[status] = statuses.get(status, 0) + 1
+    result = {
+        'seed': args.seed,
+        'students': students,
+        'recruiters': recruiters,
+        'profiles': profiles,
+        'applications': applications,
+        'statuses': statuses,
+        'generate_seconds': round(generated, 1)
+    }
+
+    if not args.dry_run:
+        started = time.perf_counter()
+        result['written'] = load(cohort, args.prefix)
+        result['load_seconds'] = round(time.perf_counter() - started, 1)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
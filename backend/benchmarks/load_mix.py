@@ -0,0 +1,187 @@
+"""
+Placement-day load generator
+Replays a weighted mix of student/recruiter/admin requests against a running
+server and reports throughput and latency percentiles per endpoint
+
+Usage (from backend/, server already running):
+    python benchmarks/load_mix.py --url http://localhost:3000 --clients 64 --duration 60
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import execute_query
+import sessions
+
+
+# (name, role, method, path, weight) -- roughly the traffic of a placement
+# morning: students refresh their dashboards, recruiters work their lists
+PLACEMENT_DAY_MIX = [
+    ('student_my_applications', 'student', 'GET', '/api/student/applications/mine', 30),
+    ('student_profiles', 'student', 'GET', '/api/student/profiles', 25),
+    ('student_autocomplete', 'student', 'GET', '/api/student/profiles/autocomplete?prefix={prefix}', 10),
+    ('student_apply', 'student', 'POST', '/api/student/apply', 10),
+    ('student_changes', 'student', 'GET', '/api/student/applications/changes?since=0&limit=50', 5),
+    ('recruiter_applications', 'recruiter', 'GET', '/api/recruiter/applications?per_page=100', 12),
+    ('recruiter_change_status', 'recruiter', 'POST', '/api/recruiter/application/change_status', 5),
+    ('admin_applications', 'admin', 'GET', '/api/admin/applications/changes?since=0&limit=500', 3),
+]
+
+
+def make_token(userid, role):
+    return sessions.issue_token(userid, role)
+
+
+def load_actors(sample_size):
+    """Sample real users, profiles and applications so requests hit real rows"""
+    actors = {}
+    for role in ('student', 'recruiter', 'admin'):
+        rows = execute_query(
+            "SELECT userid FROM users WHERE role = %s ORDER BY random() LIMIT %s",
+            (role, sample_size),
+            fetch_all=True
+        )
+        actors[role] = [(row['userid'], make_token(row['userid'], role)) for row in rows]
+
+    profiles = execute_query(
+        "SELECT profile_code, company_name FROM profile ORDER BY random() LIMIT %s",
+        (sample_size,),
+        fetch_all=True
+    )
+    applications = execute_query(
+        """
+        SELECT a.profile_code, a.entry_number, p.recruiter_email
+        FROM application a JOIN profile p ON a.profile_code = p.profile_code
+        ORDER BY random() LIMIT %s
+        """,
+        (sample_size,),
+        fetch_all=True
+    )
+    return actors, profiles, applications
+
+
+def build_request(base_url, entry, actors, profiles, applications, rng):
+    name, role, method, path, _ = entry
+    body = None
+
+    if name == 'recruiter_change_status' and applications:
+        app = rng.choice(applications)
+        userid = app['recruiter_email']
+        token = make_token(userid, 'recruiter')
+        body = {
+            'profile_code': app['profile_code'],
+            'entry_number': app['entry_number'],
+            'new_status': rng.choice(['Applied', 'Not Selected'])
+        }
+    else:
+        userid, token = rng.choice(actors[role])
+        if name == 'student_apply':
+            body = {'profile_code': rng.choice(profiles)['profile_code']}
+
+    if '{prefix}' in path:
+        company = rng.choice(profiles)['company_name'] if profiles else 'a'
+        path = path.replace('{prefix}', urllib.request.quote(company[:3].lower()))
+
+    request = urllib.request.Request(
+        base_url + path,
+        method=method,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip'
+        }
+    )
+    return name, request
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(base_url, clients, duration, seed, sample_size):
+    actors, profiles, applications = load_actors(sample_size)
+    mix = [entry for entry in PLACEMENT_DAY_MIX if actors.get(entry[1])]
+    weights = [entry[4] for entry in mix]
+
+    latencies = {entry[0]: [] for entry in mix}
+    errors = {entry[0]: 0 for entry in mix}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(client_id):
+        rng = random.Random(seed + client_id)
+        while time.monotonic() < deadline:
+            entry = rng.choices(mix, weights)[0]
+            name, request = build_request(base_url, entry, actors, profiles, applications, rng)
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                failed = False
+            except urllib.error.HTTPError as e:
+                e.read()
+                failed = e.code >= 500  # 4xx (already applied, locked) are expected outcomes
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - started
+
+            with lock:
+                latencies[name].append(elapsed)
+                if failed:
+                    errors[name] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = sum(len(v) for v in latencies.values())
+    return {
+        'clients': clients,
+        'duration_s': duration,
+        'requests': total,
+        'throughput_rps': round(total / duration, 1),
+        'errors': sum(errors.values()),
+        'endpoints': {
+            name: {
+                'requests': len(values),
+                'errors': errors[name],
+                'p50_ms': round(percentile(values, 50) * 1000, 1),
+                'p95_ms': round(percentile(values, 95) * 1000, 1),
+                'p99_ms': round(percentile(values, 99) * 1000, 1),
+            }
+            for name, values in latencies.items()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Placement-day load mix')
+    parser.add_argument('--url', default='http://localhost:3000')
+    parser.add_argument('--clients', type=int, default=32, help='concurrent client threads')
+    parser.add_argument('--duration', type=int, default=30, help='seconds')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sample-size', type=int, default=500,
+                        help='users/profiles/applications sampled from the database')
+    args = parser.parse_args()
+
+    result = run(args.url.rstrip('/'), args.clients, args.duration, args.seed, args.sample_size)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""
+Micro-benchmarks of the per-request hot paths
+Token verification, input validation, row materialization, JSON encoding
+and execute_query overhead, each timed in isolation; results can be saved
+as a baseline and later runs checked against it
+
+Usage (from backend/):
+    python benchmarks/micro.py                     # run and print
+    python benchmarks/micro.py --save              # record as the baseline
+    python benchmarks/micro.py --check             # exit 1 on a regression
+    python benchmarks/micro.py --check --filter token. --threshold 0.5
+
+Each benchmark is compared by its best run (min_us): noise only ever adds
+time, so the minimum is the most repeatable figure. A benchmark that looks
+slower is measured again (--retries) before it counts as regressed.
+
+The database benchmarks run against DATABASE_URL and are skipped when it
+cannot be reached. Baselines are only comparable on the machine (and
+Python) they were recorded on; re-record after changing either.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The session denylist is in memory on every backend; this keeps its
+# Postgres listener thread from competing with the timed code
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+import psycopg2.extensions
+from flask import Flask, jsonify
+from psycopg2.extras import RealDictCursor
+from database import execute_query, pooled_connection
+from middleware.auth_middleware import decode_token, token_required
+import sessions
+from utils import validators
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'micro.json')
+
+# 10,000 rows shaped like an application listing
+ROWS_QUERY = """
+    SELECT g AS profile_code,
+           'student' || g AS entry_number,
+           'Applied' AS status,
+           'Company ' || (g % 500) AS company_name,
+           'Software Engineer' AS designation,
+           now() AS status_changed_at
+    FROM generate_series(1, 10000) AS g
+"""
+
+BENCHMARKS = []  # (name, needs_database, setup() -> callable)
+
+
+def bench(name, database=False):
+    """Register setup(), which prepares the inputs and returns the callable to time"""
+    def register(setup):
+        BENCHMARKS.append((name, database, setup))
+        return setup
+    return register
+
+
+def application_rows(count):
+    return [
+        {
+            'profile_code': i,
+            'entry_number': f"2021CS{i:05d}",
+            'status': 'Applied',
+            'company_name': f"Company {i % 500}",
+            'designation': 'Software Engineer',
+            'status_changed_at': '2025-08-01T10:00:00+00:00'
+        }
+        for i in range(count)
+    ]
+
+
+# --- Authentication ---
+
+@bench('token.decode')
+def _token_decode():
+    token = sessions.issue_token('2021CS10001', 'student')
+    return lambda: decode_token(token)
+
+
+@bench('token.required')
+def _token_required():
+    # The whole decorator: header parsing, decode, denylist, renewal check
+    route = token_required(lambda current_user: current_user)
+    return route
+
+
+# --- Validators ---
+
+@bench('validators.login')
+def _validate_login():
+    data = {'userid': '2021CS10001', 'password_md5': 'aeddf07d1ab10bd6d8dde8b778368511'}
+    return lambda: validators.validate_login_input(data)
+
+
+@bench('validators.profile')
+def _validate_profile():
+    data = {
+        'company_name': 'Acme Corp', 'designation': 'Software Engineer', 'openings': 5,
+        'eligible_branches': ['CS', 'EE', 'MA'], 'eligible_degrees': ['BTECH'], 'min_cgpa': 7.5
+    }
+    return lambda: validators.validate_profile_input(data)
+
+
+@bench('validators.status_change')
+def _validate_status_change():
+    data = {'profile_code': 1001, 'entry_number': '2021CS10001', 'status': 'Selected'}
+    return lambda: validators.validate_status_change_input(data)
+
+
+@bench('validators.batch')
+def _validate_batch():
+    data = {'requests': [{'method': 'GET', 'path': f"/api/admin/users?page={i}"} for i in range(20)]}
+    return lambda: validators.validate_batch_input(data)
+
+
+@bench('validators.pagination')
+def _validate_pagination():
+    args = {'page': '3', 'per_page': '50'}
+    return lambda: validators.validate_pagination_input(args)
+
+
+# --- JSON responses ---
+
+def _jsonify(count):
+    rows = application_rows(count)
+    return lambda: jsonify({'success': True, 'applications': rows})
+
+
+bench('jsonify.1k')(lambda: _jsonify(1000))
+bench('jsonify.10k')(lambda: _jsonify(10000))
+bench('jsonify.100k')(lambda: _jsonify(100000))
+
+
+# --- Database ---
+
+def _fetch_rows(cursor_factory):
+    def fetch():
+        with pooled_connection() as connection:
+            cursor = connection.cursor(cursor_factory=cursor_factory)
+            try:
+                cursor.execute(ROWS_QUERY)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+                connection.rollback()
+    return fetch
+
+
+bench('rows.realdict.10k', database=True)(lambda: _fetch_rows(RealDictCursor))
+bench('rows.tuple.10k', database=True)(lambda: _fetch_rows(psycopg2.extensions.cursor))
+
+
+@bench('execute_query.select_1', database=True)
+def _execute_query():
+    return lambda: execute_query("SELECT 1 AS one", fetch_one=True, use_primary=True)
+
+
+def database_available():
+    try:
+        execute_query("SELECT 1", fetch_one=True, use_primary=True)
+        return True
+    except Exception as e:
+        print(f"Skipping database benchmarks: {e}", file=sys.stderr)
+        return False
+
+
+def measure(fn, repeat):
+    """Per-call time of fn in microseconds: min and median over repeat runs"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [seconds / number * 1e6 for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {'median_us': round(statistics.median(runs), 3), 'min_us': round(min(runs), 3), 'loops': number}
+
+
+def run(names, repeat):
+    """
+    Time the registered benchmarks accepted by names(name)
+
+    Returns:
+        dict: {name: {"min_us", "median_us", "loops"}}
+    """
+    app = Flask(__name__)
+    token = sessions.issue_token('2021CS10001', 'student')
+    has_database = None
+    results = {}
+
+    # One request context for all of them: jsonify and token_required need it
+    with app.test_request_context('/api/student/profiles', headers={'Authorization': f"Bearer {token}"}):
+        for name, needs_database, setup in BENCHMARKS:
+            if not names(name):
+                continue
+            if needs_database:
+                if has_database is None:
+                    has_database = database_available()
+                if not has_database:
+                    continue
+            results[name] = measure(setup(), repeat)
+            print(f"{name:<28} {results[name]['min_us']:>12.2f} us", file=sys.stderr)
+    return results
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'results': {}}
+
+
+def save_baseline(path, results):
+    """Merge results into the baseline (benchmarks not run keep their old entry)"""
+    baseline = load_baseline(path)
+    baseline.update({
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)"
+    })
+    baseline['results'] = {**baseline.get('results', {}), **results}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def check(results, baseline, threshold):
+    """
+    Compare best runs with the baseline
+
+    Returns:
+        dict: {name: {"baseline_us", "min_us", "ratio", "verdict"}};
+              verdict is "ok", "regressed", "improved" or "new"
+    """
+    report = {}
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            report[name] = {'min_us': result['min_us'], 'verdict': 'new'}
+            continue
+        ratio = result['min_us'] / previous['min_us']
+        if ratio > 1 + threshold:
+            verdict = 'regressed'
+        elif ratio < 1 / (1 + threshold):
+            verdict = 'improved'
+        else:
+            verdict = 'ok'
+        report[name] = {
+            'baseline_us': previous['min_us'],
+            'min_us': result['min_us'],
+            'ratio': round(ratio, 3),
+            'verdict': verdict
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of the request hot paths')
+    parser.add_argument('--filter', action='append', default=[],
+                        help='only benchmarks whose name contains this (repeatable)')
+    parser.add_argument('--repeat', type=int, default=7, help='timed runs per benchmark')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save', action='store_true', help='record the results as the baseline')
+    parser.add_argument('--check', action='store_true', help='exit 1 if a benchmark regressed')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown of the best run, as a fraction (default 0.25)')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='re-measure a regressed benchmark this many times before failing')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = run(lambda name: not args.filter or any(part in name for part in args.filter), args.repeat)
+
+    regressed = []
+    if args.check:
+        baseline = load_baseline(args.baseline)
+        report = check(results, baseline, args.threshold)
+        regressed = [name for name, entry in report.items() if entry['verdict'] == 'regressed']
+        for _ in range(args.retries):
+            if not regressed:
+                break
+            # Keep each benchmark's best result across attempts
+            for name, result in run(lambda name: name in regressed, args.repeat).items():
+                if result['min_us'] < results[name]['min_us']:
+                    results[name] = result
+            report = check(results, baseline, args.threshold)
+            regressed = [name for name, entry in report.items() if entry['verdict'] == 'regressed']
+
+    if args.save:
+        save_baseline(args.baseline, results)
+
+    output = {'seconds': round(time.perf_counter() - started, 1), 'results': results}
+    if args.check:
+        output['baseline'] = {key: baseline.get(key) for key in ('recorded_at', 'python', 'machine')}
+        output['check'] = report
+        output['regressed'] = regressed
+
+    print(json.dumps(output, indent=2))
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
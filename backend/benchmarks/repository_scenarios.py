@@ -0,0 +1,132 @@
+"""
+Repository scenario benchmark
+Runs randomized placement scenarios (apply, select, accept/reject, lock
+checks, dashboards, change feed) straight against a repository and checks
+the lock and uniqueness rules after every step
+
+Usage (from backend/):
+    python benchmarks/repository_scenarios.py --scenarios 5000
+    python benchmarks/repository_scenarios.py --backend postgres --scenarios 200
+
+The Postgres backend needs a scratch database whose students have no
+applications yet (load users with bulk_import.py first).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repositories import create_repository, IntegrityError
+
+
+def seed(repo, students, recruiters, profiles_per_recruiter, rng):
+    """
+    Create users (memory engine) or pick existing ones (Postgres), then profiles
+
+    Returns:
+        tuple: (student ids, [(profile_code, recruiter_email)])
+    """
+    if hasattr(repo, 'add_user'):
+        student_ids = [f"bench_s{i:05d}" for i in range(students)]
+        recruiter_ids = [f"bench_r{i:03d}@corp.com" for i in range(recruiters)]
+        for userid in student_ids:
+            repo.add_user(userid, 'x', 'student')
+        for userid in recruiter_ids:
+            repo.add_user(userid, 'x', 'recruiter')
+    else:
+        users = repo.list_users()
+        student_ids = [u['userid'] for u in users if u['role'] == 'student'][:students]
+        recruiter_ids = [u['userid'] for u in users if u['role'] == 'recruiter'][:recruiters]
+
+    codes = []
+    for recruiter in recruiter_ids:
+        for i in range(profiles_per_recruiter):
+            profile = repo.create_profile(recruiter, f"Company {rng.randrange(1000)}", f"Role {i}")
+            codes.append((profile['profile_code'], recruiter))
+    return student_ids, codes
+
+
+def run_scenario(repo, student, profiles, rng):
+    """
+    One student's placement round; returns the number of repository calls
+
+    Mirrors the checks the routes make, so a broken rule in an engine
+    shows up as an AssertionError.
+    """
+    calls = 0
+    applied = rng.sample(profiles, min(len(profiles), rng.randint(1, 5)))
+
+    for code, _ in applied:
+        calls += 2
+        if repo.find_locking_offer(student) or repo.get_application(code, student):
+            continue
+        calls += 1
+        repo.create_application(code, student, changed_by=student)
+
+        calls += 1
+        try:
+            repo.create_application(code, student, changed_by=student)
+            raise AssertionError("duplicate application accepted")
+        except IntegrityError:
+            pass
+
+    code, recruiter = rng.choice(applied)
+    calls += 3
+    repo.recruiter_applications(recruiter, limit=50)
+    if repo.get_application(code, student):
+        repo.change_status(code, student, 'Selected', changed_by=recruiter)
+
+    calls += 1
+    lock = repo.find_locking_offer(student)
+    assert lock is not None, "Selected offer does not lock the student"
+
+    decision = rng.choice(['Accepted', 'Not Selected'])
+    calls += 2
+    assert repo.change_status(code, student, decision, changed_by=student,
+                              expected_status='Selected') is not None
+    assert repo.change_status(code, student, decision, changed_by=student,
+                              expected_status='Selected') is None, "offer decided twice"
+
+    calls += 3
+    seq = repo.latest_seq(entry_number=student)
+    repo.list_student_applications(student)
+    changes = repo.fetch_changes(0, 100, entry_number=student)
+    assert changes and changes[-1]['seq'] == seq
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Repository scenario benchmark')
+    parser.add_argument('--backend', default='memory', help='memory | postgres')
+    parser.add_argument('--scenarios', type=int, default=2000)
+    parser.add_argument('--recruiters', type=int, default=20)
+    parser.add_argument('--profiles-per-recruiter', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    repo = create_repository(args.backend)
+    students, profiles = seed(repo, args.scenarios, args.recruiters,
+                              args.profiles_per_recruiter, rng)
+
+    started = time.perf_counter()
+    calls = sum(run_scenario(repo, student, profiles, rng) for student in students)
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        'backend': args.backend,
+        'scenarios': len(students),
+        'repository_calls': calls,
+        'seconds': round(elapsed, 3),
+        'scenarios_per_second': round(len(students) / elapsed, 1) if elapsed else None,
+        'calls_per_second': round(calls / elapsed, 1) if elapsed else None
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
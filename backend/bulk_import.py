@@ -0,0 +1,239 @@
+"""
+Bulk onboarding of users
+Streams a CSV roster into Postgres with COPY FROM STDIN, validates it in a
+staging table and upserts the valid rows into users in one statement
+
+CSV format (header required, column order free):
+    userid,password_md5,role
+    2021CS10001,5f4dcc3b5aa765d61d8327deb882cf99,student
+
+Usage:
+    python bulk_import.py roster.csv
+"""
+
+import csv
+import json
+import sys
+from database import get_db_connection
+from shared_cache import cache
+
+
+REQUIRED_COLUMNS = ('userid', 'password_md5', 'role')
+
+# Only this many rejected rows are returned in detail; the total is always reported
+MAX_REPORTED_REJECTS = 1000
+
+# Userids are shown in HTML and inline handlers on the admin pages, so only
+# characters that need no escaping are accepted (POSIX and Python syntax)
+USERID_PATTERN = r'^[A-Za-z0-9._@+-]{1,64}$'
+
+
+def _copy_escape(value):
+    return (value.replace('\\', '\\\\')
+                 .replace('\t', '\\t')
+                 .replace('\n', '\\n')
+                 .replace('\r', '\\r'))
+
+
+class CsvCopyStream:
+    """
+    File-like adapter turning a CSV text stream into COPY text format
+
+    Rows are converted lazily as psycopg2 calls read(), so the roster is
+    never held in memory. Each row is prefixed with its line number so
+    rejects can be reported per line; rows that cannot even be parsed
+    into the expected columns are rejected here.
+    """
+
+    def __init__(self, text_stream, columns=REQUIRED_COLUMNS):
+        self._reader = csv.reader(text_stream)
+        self._buffer = ''
+        self.rows = 0
+        self.rejects = []
+        self.rejected = 0
+
+        header = next(self._reader, None)
+        if header is None:
+            raise ValueError("CSV file is empty")
+
+        header = [name.strip().lower() for name in header]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+        self._indexes = [header.index(name) for name in columns]
+        self._width = len(header)
+        self._records = self.records()
+
+    def reject(self, line_no, reason):
+        self.rejected += 1
+        if len(self.rejects) < MAX_REPORTED_REJECTS:
+            self.rejects.append({'line': line_no, 'reason': reason})
+
+    def records(self):
+        """Yield (line_no, [values in column order]) for every well-formed row"""
+        for row in self._reader:
+            line_no = self._reader.line_num
+            if not any(cell.strip() for cell in row):
+                continue  # blank line
+
+            self.rows += 1
+            if len(row) != self._width:
+                self.reject(line_no, f"expected {self._width} columns, got {len(row)}")
+                continue
+
+            yield line_no, [row[i].strip() for i in self._indexes]
+
+    def _next_line(self):
+        record = next(self._records, None)
+        if record is None:
+            return None
+        line_no, values = record
+        return f"{line_no}\t" + '\t'.join(_copy_escape(value) for value in values) + '\n'
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = self._next_line()
+            if line is None:
+                break
+            self._buffer += line
+
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def import_users(text_stream):
+    """
+    Load a CSV roster of students/recruiters into users
+
+    New userids are inserted and existing ones get their password hash
+    updated. A row is rejected when a field is invalid, its userid
+    already appeared earlier in the file, or it would change an existing user's role.
+
+    Args:
+        text_stream: Text file object positioned at the CSV header
+
+    Returns:
+        dict: {"rows", "inserted", "updated", "rejected", "rejects": [...]}
+    """
+    stream = CsvCopyStream(text_stream)
+    connection = get_db_connection()
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TEMP TABLE users_import (
+                line_no       INTEGER,
+                userid        TEXT,
+                password_md5  TEXT,
+                role          TEXT,
+                reject_reason TEXT
+            ) ON COMMIT DROP
+            """
+        )
+
+        cursor.copy_expert(
+            "COPY users_import (line_no, userid, password_md5, role) FROM STDIN",
+            stream
+        )
+
+        # Temp tables are never auto-analyzed; give the planner real row counts
+        cursor.execute("ANALYZE users_import")
+
+        # Set-based validation, first failing rule wins
+        cursor.execute(
+            """
+            UPDATE users_import i
+            SET reject_reason = CASE
+                WHEN i.userid = '' THEN 'userid is required'
+                WHEN i.userid !~ %s THEN 'invalid userid'
+                WHEN i.password_md5 !~* '^[0-9a-f]{32}$' THEN 'Invalid password hash format'
+                WHEN i.role NOT IN ('student', 'recruiter') THEN 'role must be student or recruiter'
+                WHEN d.occurrence > 1 THEN 'duplicate userid in file'
+                WHEN d.existing_role <> i.role THEN 'userid already exists with a different role'
+            END
+            FROM (
+                SELECT s.line_no,
+                       row_number() OVER (PARTITION BY s.userid ORDER BY s.line_no) AS occurrence,
+                       u.role AS existing_role
+                FROM users_import s
+                LEFT JOIN users u ON u.userid = s.userid
+            ) d
+            WHERE d.line_no = i.line_no
+            """,
+            (USERID_PATTERN,)
+        )
+
+        cursor.execute(
+            """
+            WITH upserted AS (
+                INSERT INTO users (userid, password_hash, role)
+                SELECT userid, lower(password_md5), role
+                FROM users_import
+                WHERE reject_reason IS NULL
+                ON CONFLICT (userid) DO UPDATE
+                    SET password_hash = EXCLUDED.password_hash
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted) AS inserted,
+                   count(*) FILTER (WHERE NOT inserted) AS updated
+            FROM upserted
+            """
+        )
+        counts = cursor.fetchone()
+
+        cursor.execute(
+            """
+            SELECT line_no, reject_reason FROM users_import
+            WHERE reject_reason IS NOT NULL
+            ORDER BY line_no
+            LIMIT %s
+            """,
+            (MAX_REPORTED_REJECTS,)
+        )
+        rejects = stream.rejects + [
+            {'line': row['line_no'], 'reason': row['reject_reason']}
+            for row in cursor.fetchall()
+        ]
+
+        cursor.execute("SELECT count(*) AS n FROM users_import WHERE reject_reason IS NOT NULL")
+        rejected = stream.rejected + cursor.fetchone()['n']
+
+        connection.commit()
+        cursor.close()
+
+    except Exception:
+        connection.rollback()
+        raise
+
+    finally:
+        connection.close()
+
+    return {
+        'rows': stream.rows,
+        'inserted': counts['inserted'],
+        'updated': counts['updated'],
+        'rejected': rejected,
+        'rejects': sorted(rejects, key=lambda r: r['line'])[:MAX_REPORTED_REJECTS]
+    }
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python bulk_import.py <roster.csv>")
+        sys.exit(2)
+
+    with open(sys.argv[1], newline='', encoding='utf-8-sig') as roster:
+        result = import_users(roster)
+    cache.invalidate('stats')
+
+    print(json.dumps(result, indent=2))
+    print(f"✅ Imported {result['inserted']} new, {result['updated']} updated, "
+          f"{result['rejected']} rejected")
+
+
+if __name__ == '__main__':
+    main()
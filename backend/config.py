@@ -12,11 +12,25 @@ class Config:
 
     # Database Configuration
     DATABASE_URL = os.getenv('DATABASE_URL')
+    DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 1))
+    DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 10))  # per worker process
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+
+    # Storage backend: postgres (production) or memory (tests and benchmarks)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'postgres')
+
+    # Read Replica Configuration
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',')
+                             if url.strip()]
+    READ_YOUR_WRITES_SECONDS = int(os.getenv('READ_YOUR_WRITES_SECONDS', 10))  # reads stay on primary after a write
+    REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))  # after a replica failed
 
     # JWT Configuration
     JWT_SECRET = os.getenv('JWT_SECRET', 'default_secret_key_change_this')
     JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
     JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', 2))
+    JWT_RENEW_WITHIN_MINUTES = int(os.getenv('JWT_RENEW_WITHIN_MINUTES', 30))  # renew tokens this close to expiry
+    JWT_SESSION_MAX_HOURS = int(os.getenv('JWT_SESSION_MAX_HOURS', 12))  # renewals never extend a login past this
 
     # Flask Configuration
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
@@ -25,6 +39,61 @@ class Config:
     # CORS Configuration
     CORS_ORIGINS = ["*"]  # In production, specify exact origins
 
+    # Response Compression Configuration
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
+    # Batch Request Configuration
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))  # sub-requests per /api/batch call
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 4))  # concurrent GET sub-requests per worker process
+
+    # Server-Sent Events Configuration
+    SSE_HEARTBEAT_SECONDS = int(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+    SSE_MAX_STREAM_SECONDS = int(os.getenv('SSE_MAX_STREAM_SECONDS', 600))  # clients reconnect after
+    SSE_QUEUE_SIZE = int(os.getenv('SSE_QUEUE_SIZE', 100))  # per connection
+
+    # Offer Expiry Configuration
+    OFFER_EXPIRY_HOURS = int(os.getenv('OFFER_EXPIRY_HOURS', 72))
+    SWEEPER_INTERVAL_SECONDS = int(os.getenv('SWEEPER_INTERVAL_SECONDS', 60))
+    SWEEPER_BATCH_SIZE = int(os.getenv('SWEEPER_BATCH_SIZE', 5000))
+
+    # Placement Season Configuration
+    SEASON_LOCK_TIMEOUT_SECONDS = int(os.getenv('SEASON_LOCK_TIMEOUT_SECONDS', 5))  # wait for running queries
+    SEASON_ARCHIVE_DIR = os.getenv('SEASON_ARCHIVE_DIR', 'archive')  # where archived seasons are exported
+
+    # Batch Allocation Configuration
+    ALLOCATION_LOCK_TIMEOUT_SECONDS = int(os.getenv('ALLOCATION_LOCK_TIMEOUT_SECONDS', 5))  # wait for running writes
+    ALLOCATION_MAX_PREFERENCES = int(os.getenv('ALLOCATION_MAX_PREFERENCES', 200))  # per student list
+    ALLOCATION_MAX_RANKING = int(os.getenv('ALLOCATION_MAX_RANKING', 5000))  # per profile ranking
+
+    # Eligibility Configuration
+    ELIGIBILITY_MAX_CODES = int(os.getenv('ELIGIBILITY_MAX_CODES', 100))  # branches/degrees per profile
+    ELIGIBILITY_MAX_STUDENTS = int(os.getenv('ELIGIBILITY_MAX_STUDENTS', 20000))  # per attribute upload
+
+    # Profile Search Configuration
+    PREFIX_INDEX_REFRESH_SECONDS = int(os.getenv('PREFIX_INDEX_REFRESH_SECONDS', 5))
+    PREFIX_INDEX_REBUILD_SECONDS = int(os.getenv('PREFIX_INDEX_REBUILD_SECONDS', 600))
+
+    # Shared Cache Configuration
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'none')  # none | local | redis | postgres
+    CACHE_URL = os.getenv('CACHE_URL', 'redis://localhost:6379/0')
+    CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', 300))  # shared copy
+    CACHE_LOCAL_TTL_SECONDS = int(os.getenv('CACHE_LOCAL_TTL_SECONDS', 5))  # per-process copy
+
+    # Idempotency Configuration
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 3600))
+    IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', 10000))  # in-memory storage only
+    IDEMPOTENCY_WAIT_SECONDS = int(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 10))  # duplicate waits for first
+    IDEMPOTENCY_LEASE_SECONDS = int(os.getenv('IDEMPOTENCY_LEASE_SECONDS', 60))  # unfinished claim taken over after
+
+    # Logging Configuration
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # records waiting for the writer thread
+    LOG_SAMPLE_BURST = int(os.getenv('LOG_SAMPLE_BURST', 20))  # identical records per window...
+    LOG_SAMPLE_WINDOW_SECONDS = int(os.getenv('LOG_SAMPLE_WINDOW_SECONDS', 60))  # ...before sampling kicks in
+
     @staticmethod
     def validate():
 
@@ -1,11 +1,48 @@
 """
 Database connection and query execution utilities
-Handles PostgreSQL connection via psycopg2
+Handles PostgreSQL connection via psycopg2, with per-process connection pools
+for the primary and any read replicas
 """
 
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extras import RealDictCursor
 from config import config
+from utils import metrics
+from utils.log import get_logger, compact_query, redact
+
+
+log = get_logger(__name__)
+
+_pools = {}  # dsn -> (pool, slots)
+_pool_pid = None
+_pool_lock = threading.Lock()
+# Pools inherited across fork() are kept referenced, never closed: closing
+# (or garbage-collecting) them would terminate the parent's sessions
+_inherited_pools = []
+
+# Replica dsn -> time.time() before which it is not tried again
+_replica_down_until = {}
+
+# Read routing state of the current request (see middleware/read_routing.py).
+# Reads go to the primary until _sticky_until, which every write pushes
+# forward; _force_primary pins a whole request to the primary.
+_sticky_until = ContextVar('sticky_until', default=0.0)
+_force_primary = ContextVar('force_primary', default=False)
+
+_READ_STATEMENT = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+_WRITE_KEYWORDS = re.compile(
+    r'\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE'
+    r'|nextval|setval|pg_notify|txid_current)\b',
+    re.IGNORECASE
+)
 
 
 def get_db_connection():
@@ -24,12 +61,158 @@ def get_db_connection():
             cursor_factory=RealDictCursor  # Returns rows as dictionaries
         )
         return connection
-    except Exception as e:
-        print(f"❌ Database connection error: {e}")
+    except Exception:
+        log.exception("Database connection error")
         raise
 
 
-def execute_query(query, params=None, fetch_one=False, fetch_all=False):
+def init_pool():
+    """
+    (Re)create this process's connection pools (primary and replicas)
+
+    Connections must never be shared across fork(), so prefork servers call
+    this in every worker after forking (see gunicorn.conf.py). It is also
+    called lazily on first use, and again if the process id changed.
+    """
+    global _pool_pid
+
+    with _pool_lock:
+        for pool, _ in _pools.values():
+            if _pool_pid == os.getpid():
+                pool.closeall()
+            else:
+                _inherited_pools.append(pool)
+        _pools.clear()
+        _replica_down_until.clear()
+
+        _pools[config.DATABASE_URL] = _new_pool(config.DATABASE_URL, config.DB_POOL_MIN)
+        for dsn in config.DATABASE_REPLICA_URLS:
+            # No eager connections: a replica that is down must not stop startup
+            _pools[dsn] = _new_pool(dsn, 0)
+        _pool_pid = os.getpid()
+
+
+def _new_pool(dsn, minconn):
+    pool = ThreadedConnectionPool(
+        minconn,
+        config.DB_POOL_MAX,
+        dsn,
+        cursor_factory=RealDictCursor
+    )
+    # ThreadedConnectionPool raises when exhausted; callers wait on slots instead
+    return pool, threading.BoundedSemaphore(config.DB_POOL_MAX)
+
+
+def _get_pool(dsn):
+    if not _pools or _pool_pid != os.getpid():
+        init_pool()
+    return _pools[dsn]
+
+
+@contextmanager
+def pooled_connection(dsn=None):
+    """
+    Borrow a connection from a pool for the duration of a with-block
+
+    Connections that broke while borrowed are discarded instead of being
+    returned to the pool.
+
+    Args:
+        dsn (str): Primary (default) or one of DATABASE_REPLICA_URLS
+
+    Raises:
+        TimeoutError: If no connection frees up within DB_POOL_TIMEOUT seconds
+    """
+    pool, slots = _get_pool(dsn or config.DATABASE_URL)
+    if not slots.acquire(timeout=config.DB_POOL_TIMEOUT):
+        raise TimeoutError("Timed out waiting for a database connection")
+
+    connection = None
+    try:
+        connection = pool.getconn()
+        yield connection
+    finally:
+        if connection is not None:
+            pool.putconn(connection, close=bool(connection.closed))
+        slots.release()
+
+
+def is_read_only(query):
+    """True for a SELECT (or WITH ... SELECT) that neither writes nor locks rows"""
+    return bool(_READ_STATEMENT.match(query)) and not _WRITE_KEYWORDS.search(query)
+
+
+def begin_request(sticky_until=0.0, force_primary=False):
+    """
+    Reset read routing for a new request
+
+    Worker threads are reused across requests, so this must run at the
+    start of every request (middleware/read_routing.py does).
+
+    Args:
+        sticky_until (float): time.time() before which reads go to the primary
+        force_primary (bool): Send every query of this request to the primary
+    """
+    _sticky_until.set(sticky_until)
+    _force_primary.set(force_primary)
+
+
+def sticky_until():
+    """Deadline of the read-your-writes window of the current request"""
+    return _sticky_until.get()
+
+
+def extend_sticky(until):
+    """Keep the current request's reads on the primary until at least this time.time()"""
+    if until > _sticky_until.get():
+        _sticky_until.set(until)
+
+
+def _choose_replica():
+    now = time.time()
+    healthy = [dsn for dsn in config.DATABASE_REPLICA_URLS
+               if _replica_down_until.get(dsn, 0.0) <= now]
+    return random.choice(healthy) if healthy else None
+
+
+def _run(dsn, query, params, fetch_one, fetch_all):
+    with pooled_connection(dsn) as connection:
+        cursor = None
+
+        try:
+            cursor = connection.cursor()
+
+            # Execute query with parameters (prevents SQL injection)
+            cursor.execute(query, params or ())
+
+            # Fetch results if requested
+            if fetch_one:
+                result = cursor.fetchone()
+            elif fetch_all:
+                result = cursor.fetchall()
+            else:
+                result = None
+
+            # Commit changes for INSERT/UPDATE/DELETE
+            connection.commit()
+
+            return result
+
+        except Exception as e:
+            if not connection.closed:
+                connection.rollback()
+            # Parameter values (passwords, entry numbers) never reach the log
+            log.error("Query execution error", exc_info=e,
+                      extra={'query': compact_query(query), 'params': redact(params)})
+            raise
+
+        finally:
+            # Always close the cursor; the connection goes back to the pool
+            if cursor:
+                cursor.close()
+
+
+def execute_query(query, params=None, fetch_one=False, fetch_all=False, use_primary=False):
     """
     Execute a database query with automatic connection management
 
@@ -38,6 +221,11 @@ def execute_query(query, params=None, fetch_one=False, fetch_all=False):
         params (tuple/list): Query parameters to prevent SQL injection
         fetch_one (bool): Return single row
         fetch_all (bool): Return all rows
+        use_primary (bool): Never read this query from a replica
+
+    Read-only queries go to a replica when DATABASE_REPLICA_URLS is set,
+    unless the request is inside its read-your-writes window; everything
+    else runs on the primary.
 
     Returns:
         Result of query (dict, list of dicts, or None)
@@ -58,47 +246,71 @@ def execute_query(query, params=None, fetch_one=False, fetch_all=False):
 
         # Insert application
         execute_query(
-            "INSERT INTO application (profile_code, entry_number, status) VALUES (%s, %s, %s)",
-            (1001, 'student1', 'Applied')
+            "INSERT INTO application (season, profile_code, entry_number, status) VALUES (%s, %s, %s, %s)",
+            (2025, 1001, 'student1', 'Applied')
         )
     """
-    connection = None
-    cursor = None
+    read_only = is_read_only(query)
 
-    try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
+    if (read_only and config.DATABASE_REPLICA_URLS and not use_primary
+            and not _force_primary.get() and time.time() >= _sticky_until.get()):
+        replica = _choose_replica()
+        if replica is not None:
+            try:
+                result = _run(replica, query, params, fetch_one, fetch_all)
+                metrics.incr('db.replica_queries')
+                return result
+            except (psycopg2.OperationalError, TimeoutError) as e:
+                log.warning("Replica read failed, using primary", exc_info=e)
+                # Serve from the primary instead; a replica that is unreachable
+                # or saturated (no SQLSTATE) is rested, one that merely cancelled
+                # a query (e.g. a recovery conflict) is not
+                if getattr(e, 'pgcode', None) is None:
+                    _replica_down_until[replica] = time.time() + config.REPLICA_RETRY_SECONDS
+                metrics.incr('db.replica_fallbacks')
 
-        # Execute query with parameters (prevents SQL injection)
-        cursor.execute(query, params or ())
+    result = _run(config.DATABASE_URL, query, params, fetch_one, fetch_all)
+    metrics.incr('db.primary_queries')
 
-        # Fetch results if requested
-        if fetch_one:
-            result = cursor.fetchone()
-        elif fetch_all:
-            result = cursor.fetchall()
-        else:
-            result = None
+    if not read_only:
+        # Read-your-writes: this request's (and, via the cookie, this
+        # user's) next reads must not hit a replica that lags behind
+        _sticky_until.set(time.time() + config.READ_YOUR_WRITES_SECONDS)
 
-        # Commit changes for INSERT/UPDATE/DELETE
-        connection.commit()
+    return result
 
-        return result
 
-    except Exception as e:
-        if connection:
-            connection.rollback()
-        print(f"❌ Query execution error: {e}")
-        print(f"Query: {query}")
-        print(f"Params: {params}")
-        raise
+@contextmanager
+def transaction(cursor_factory=None):
+    """
+    Run several statements as one transaction on the primary
 
-    finally:
-        # Always close cursor and connection
-        if cursor:
+    Yields a cursor; the transaction commits when the with-block exits
+    normally and rolls back if it raises.
+
+    Args:
+        cursor_factory: Cursor class (default RealDictCursor); pass
+            psycopg2.extensions.cursor for plain tuples on large reads
+
+    Example:
+        with transaction() as cursor:
+            cursor.execute("DELETE FROM student_preference WHERE entry_number = %s", (userid,))
+            cursor.execute("INSERT INTO student_preference ...", (...))
+    """
+    with pooled_connection() as connection:
+        cursor = connection.cursor(cursor_factory=cursor_factory)
+        try:
+            yield cursor
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+        finally:
             cursor.close()
-        if connection:
-            connection.close()
+
+    metrics.incr('db.primary_queries')
+    _sticky_until.set(time.time() + config.READ_YOUR_WRITES_SECONDS)
 
 
 def test_connection():
@@ -110,6 +322,6 @@ def test_connection():
         cursor.close()
         connection.close()
         return True
-    except Exception as e:
-        print(f"❌ Connection test failed: {e}")
+    except Exception:
+        log.exception("Connection test failed")
         return False
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Eligibility criteria and per-student eligibility bitmaps in Postgres
+student_attributes.eligible_profiles holds one bit per restricted profile
+of the active season, counted from the season's first_profile_code
+(utils/eligibility.py). Changing one profile's criteria rewrites only that
+bit, and only for the students whose answer changed, in one UPDATE;
+uploading attributes recomputes those students' whole bitmaps from an
+EligibilityIndex, and starting a season recomputes everyone's.
+
+Both writers take the same transaction-scoped advisory lock, so a bitmap
+is never computed from criteria or attributes another writer is replacing.
+"""
+
+from database import execute_query, transaction
+from profile_search import PROFILE_COLUMNS
+from utils.eligibility import CRITERIA_FIELDS, EligibilityIndex, decode, encode, is_restricted
+
+
+def _lock(cursor):
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext('eligibility'))")
+
+
+def _first_code(cursor):
+    cursor.execute("SELECT first_profile_code FROM placement_season WHERE active")
+    return cursor.fetchone()['first_profile_code']
+
+
+def _update_profile_bit(cursor, profile):
+    """Set or clear one profile's bit wherever the student's answer changed"""
+    position = profile['profile_code'] - _first_code(cursor)
+    if position < 0:
+        return 0  # a profile of an earlier season has no bit
+
+    # Rows whose bit already matches are filtered out in the database;
+    # bitmaps shorter than the position are padded with zeros first
+    want = """(%(restricted)s
+              AND (%(branches)s::text[] IS NULL OR s.branch = ANY(%(branches)s::text[]))
+              AND (%(degrees)s::text[] IS NULL OR s.degree = ANY(%(degrees)s::text[]))
+              AND (%(min_cgpa)s::numeric IS NULL OR s.cgpa >= %(min_cgpa)s::numeric))"""
+    cursor.execute(
+        f"""
+        UPDATE student_attributes s
+        SET eligible_profiles = set_bit(
+                s.eligible_profiles
+                    || repeat('0', greatest(%(position)s + 1 - length(s.eligible_profiles), 0))::varbit,
+                %(position)s, {want}::int)
+        WHERE {want} <> (length(s.eligible_profiles) > %(position)s
+                         AND get_bit(s.eligible_profiles, %(position)s) = 1)
+        """,
+        {
+            'position': position,
+            'restricted': is_restricted(profile),
+            'branches': profile.get('eligible_branches'),
+            'degrees': profile.get('eligible_degrees'),
+            'min_cgpa': profile.get('min_cgpa')
+        }
+    )
+    return cursor.rowcount
+
+
+def _season_index(cursor):
+    """(first_profile_code, EligibilityIndex, any restricted?) for the active season's profiles"""
+    cursor.execute(
+        f"""
+        SELECT {PROFILE_COLUMNS}
+        FROM profile
+        WHERE season = active_season()
+          AND (eligible_branches IS NOT NULL
+               OR eligible_degrees IS NOT NULL
+               OR min_cgpa IS NOT NULL)
+        """
+    )
+    profiles = cursor.fetchall()
+    return _first_code(cursor), EligibilityIndex(profiles), bool(profiles)
+
+
+def create_profile(recruiter_email, company_name, designation, openings, criteria):
+    """Insert a profile; a restricted one also gets its bit in every bitmap"""
+    with transaction() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO profile (recruiter_email, company_name, designation, openings,
+                                 eligible_branches, eligible_degrees, min_cgpa)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING profile_code, company_name, designation
+            """,
+            (recruiter_email, company_name, designation, openings,
+             *(criteria.get(field) for field in CRITERIA_FIELDS))
+        )
+        new_profile = cursor.fetchone()
+        if is_restricted(criteria):
+            _lock(cursor)
+            _update_profile_bit(cursor, {'profile_code': new_profile['profile_code'], **criteria})
+    return new_profile
+
+
+def set_criteria(profile_code, criteria):
+    """Replace a profile's criteria and update its bit; None if there is no such profile"""
+    with transaction() as cursor:
+        _lock(cursor)
+        cursor.execute(
+            """
+            UPDATE profile
+            SET eligible_branches = %s, eligible_degrees = %s, min_cgpa = %s
+            WHERE profile_code = %s
+            RETURNING profile_code, eligible_branches, eligible_degrees, min_cgpa::float8 AS min_cgpa
+            """,
+            (*(criteria.get(field) for field in CRITERIA_FIELDS), profile_code)
+        )
+        profile = cursor.fetchone()
+        if profile is not None:
+            _update_profile_bit(cursor, profile)
+    return profile
+
+
+def get_student_attributes(entry_number):
+    return execute_query(
+        """
+        SELECT entry_number, branch, degree, cgpa::float8 AS cgpa
+        FROM student_attributes
+        WHERE entry_number = %s
+        """,
+        (entry_number,),
+        fetch_one=True
+    )
+
+
+def set_student_attributes(students):
+    """
+    Upsert attributes and recomputed bitmaps for student accounts
+
+    Returns:
+        list: Entry numbers written (rows for non-students are skipped)
+    """
+    with transaction() as cursor:
+        _lock(cursor)
+        first_code, index, _ = _season_index(cursor)
+        cursor.execute(
+            """
+            INSERT INTO student_attributes (entry_number, branch, degree, cgpa, eligible_profiles)
+            SELECT t.entry_number, t.branch, t.degree, t.cgpa, t.bits::varbit
+            FROM unnest(%s::text[], %s::text[], %s::text[], %s::numeric[], %s::text[])
+                AS t(entry_number, branch, degree, cgpa, bits)
+            JOIN users u ON u.userid = t.entry_number AND u.role = 'student'
+            ON CONFLICT (entry_number) DO UPDATE
+            SET branch = EXCLUDED.branch,
+                degree = EXCLUDED.degree,
+                cgpa = EXCLUDED.cgpa,
+                eligible_profiles = EXCLUDED.eligible_profiles
+            RETURNING entry_number
+            """,
+            (
+                [s['entry_number'] for s in students],
+                [s['branch'] for s in students],
+                [s['degree'] for s in students],
+                [s['cgpa'] for s in students],
+                [encode(index.bitmap(s), first_code) for s in students]
+            )
+        )
+        return [row['entry_number'] for row in cursor.fetchall()]
+
+
+def rebuild_bitmaps(cursor):
+    """
+    Recompute every student's bitmap against the active season's profiles
+
+    Run by seasons.start_season in its transaction: bit positions are
+    relative to the season's first profile code, so the previous season's
+    bits mean nothing once it changes.
+
+    Returns:
+        int: Number of bitmaps rewritten
+    """
+    _lock(cursor)
+    first_code, index, any_restricted = _season_index(cursor)
+    if not any_restricted:
+        cursor.execute("UPDATE student_attributes SET eligible_profiles = B'' WHERE eligible_profiles <> B''")
+        return cursor.rowcount
+
+    cursor.execute("SELECT entry_number, branch, degree, cgpa::float8 AS cgpa FROM student_attributes")
+    students = cursor.fetchall()
+    cursor.execute(
+        """
+        UPDATE student_attributes s
+        SET eligible_profiles = t.bits::varbit
+        FROM unnest(%s::text[], %s::text[]) AS t(entry_number, bits)
+        WHERE s.entry_number = t.entry_number
+          AND s.eligible_profiles <> t.bits::varbit
+        """,
+        (
+            [student['entry_number'] for student in students],
+            [encode(index.bitmap(student), first_code) for student in students]
+        )
+    )
+    return cursor.rowcount
+
+
+def eligibility(entry_number):
+    row = execute_query(
+        """
+        SELECT s.eligible_profiles::text AS bits, p.first_profile_code
+        FROM student_attributes s, placement_season p
+        WHERE s.entry_number = %s AND p.active
+        """,
+        (entry_number,),
+        fetch_one=True
+    )
+    return decode(row['bits'], row['first_profile_code']) if row else 0
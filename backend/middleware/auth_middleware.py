@@ -5,14 +5,44 @@ Verifies JWT tokens and extracts user information
 
 import jwt
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, make_response
 from config import config
+import sessions
+
+
+# WSGI environ key under which /api/batch hands its sub-requests the user it
+# already verified (environ keys cannot be set by HTTP clients)
+VERIFIED_USER_ENVIRON = 'ocs.verified_user'
+
+
+class TokenRevokedError(jwt.InvalidTokenError):
+    """The token's session was logged out"""
+
+
+def decode_token(token):
+    """
+    Verify and decode a JWT
+
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired
+        TokenRevokedError: If its session was logged out
+        jwt.InvalidTokenError: If the token is malformed or tampered with
+    """
+    decoded = jwt.decode(
+        token,
+        config.JWT_SECRET,
+        algorithms=[config.JWT_ALGORITHM]
+    )
+    if sessions.session_id(decoded) in sessions.denylist:
+        raise TokenRevokedError('Session was logged out')
+    return decoded
 
 
 def token_required(f):
     """
     Decorator to protect routes that require authentication
-    Extracts and verifies JWT token from Authorization header
+    Extracts and verifies JWT token from Authorization header; a token
+    close to expiry is renewed in the X-Refreshed-Token response header
 
     Usage:
         @app.route('/api/protected')
@@ -24,6 +54,11 @@ def token_required(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
+        # Sub-request of a batch whose token was verified once for all of them
+        verified_user = request.environ.get(VERIFIED_USER_ENVIRON)
+        if verified_user is not None:
+            return f(verified_user, *args, **kwargs)
+
         token = None
 
         # Get token from Authorization header
@@ -41,11 +76,7 @@ def token_required(f):
 
         try:
             # Verify and decode token
-            decoded = jwt.decode(
-                token,
-                config.JWT_SECRET,
-                algorithms=[config.JWT_ALGORITHM]
-            )
+            decoded = decode_token(token)
 
             # Pass decoded token data to the route
             current_user = decoded
@@ -53,11 +84,20 @@ def token_required(f):
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token has expired', 'expired': True}), 401
 
+        except TokenRevokedError:
+            return jsonify({'error': 'Token has been revoked', 'expired': True}), 401
+
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Invalid token'}), 401
 
         # Call the actual route with current_user
-        return f(current_user, *args, **kwargs)
+        renewed = sessions.renew(current_user)
+        if renewed is None:
+            return f(current_user, *args, **kwargs)
+
+        response = make_response(f(current_user, *args, **kwargs))
+        response.headers.setdefault(sessions.REFRESHED_TOKEN_HEADER, renewed)
+        return response
 
     return decorated
 
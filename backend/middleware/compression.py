@@ -0,0 +1,120 @@
+"""
+Response compression middleware
+Compresses JSON/text responses with brotli or gzip based on Accept-Encoding
+"""
+
+import time
+import zlib
+from flask import request
+from config import config
+from utils import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+}
+
+SKIP_STATUS_CODES = {204, 206, 304}
+
+
+def choose_encoding(accept_encodings):
+    """
+    Pick the best supported encoding from the client's Accept-Encoding
+
+    Args:
+        accept_encodings: werkzeug Accept object (request.accept_encodings)
+
+    Returns:
+        str or None: 'br', 'gzip' or None when nothing acceptable
+    """
+    br_quality = accept_encodings.quality('br') if brotli else 0
+    gzip_quality = accept_encodings.quality('gzip')
+
+    if br_quality > 0 and br_quality >= gzip_quality:
+        return 'br'
+    if gzip_quality > 0:
+        return 'gzip'
+    return None
+
+
+def _gzip_compressor(level):
+    # wbits=31 -> gzip container
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def compress_bytes(data, encoding):
+    """Compress a complete payload with the configured level"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.COMPRESSION_BROTLI_QUALITY)
+
+    compressor = _gzip_compressor(config.COMPRESSION_GZIP_LEVEL)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _record(encoding, bytes_in, bytes_out, cpu):
+    prefix = f'compression.{encoding}'
+    metrics.incr(f'{prefix}.responses')
+    metrics.incr(f'{prefix}.bytes_in', bytes_in)
+    metrics.incr(f'{prefix}.bytes_out', bytes_out)
+    metrics.incr(f'{prefix}.bytes_saved', bytes_in - bytes_out)
+    metrics.incr(f'{prefix}.cpu_seconds', cpu)
+
+
+def _is_compressible(response):
+    if response.status_code < 200 or response.status_code in SKIP_STATUS_CODES:
+        return False
+    if response.direct_passthrough:  # send_file() and friends
+        return False
+    if response.is_streamed:  # event streams; buffering them would never finish
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    return response.mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def init_compression(app):
+    """
+    Register the compression hook on a Flask app
+
+    Usage:
+        app = Flask(__name__)
+        init_compression(app)
+    """
+    if not config.COMPRESSION_ENABLED:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if not _is_compressible(response):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < config.COMPRESSION_MIN_SIZE:
+            metrics.incr('compression.skipped_below_threshold')
+            return response
+
+        started = time.thread_time()
+        compressed = compress_bytes(data, encoding)
+        cpu = time.thread_time() - started
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        _record(encoding, len(data), len(compressed), cpu)
+
+        return response
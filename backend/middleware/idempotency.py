@@ -0,0 +1,127 @@
+"""
+Idempotency-Key support for mutating endpoints
+Retries of a request that carries the same key are answered from a stored
+response instead of running the database work again
+"""
+
+import hashlib
+import time
+import uuid
+from functools import wraps
+from flask import request, jsonify, make_response
+from config import config
+from repositories import repo, IdempotencyStoreFullError
+from utils import metrics
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# How often a duplicate checks whether the first attempt has finished
+POLL_SECONDS = 0.1
+
+
+def _replay(response):
+    body, status, mimetype = response
+    replayed = make_response(body, status)
+    replayed.mimetype = mimetype
+    replayed.headers['Idempotent-Replayed'] = 'true'
+    return replayed
+
+
+def idempotent(f):
+    """
+    Decorator making a POST route safe to retry with an Idempotency-Key
+
+    Goes below token_required/role_required, since keys are scoped per user.
+    Requests without the header are unaffected. A repeated key returns the
+    first response; a duplicate that arrives while the first is still
+    running waits for it. Server errors are not stored, so they can be retried.
+
+    Keys are claimed through the repository (the idempotency_key table in
+    Postgres), so a retry gets the stored response whichever worker or
+    instance it reaches.
+
+    Usage:
+        @student_bp.route('/apply', methods=['POST'])
+        @token_required
+        @role_required(['student'])
+        @idempotent
+        def apply_to_profile(current_user):
+            ...
+    """
+
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return f(current_user, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({
+                'success': False,
+                'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'
+            }), 400
+
+        userid = current_user['userid']
+        fingerprint = hashlib.sha256(
+            request.method.encode() + request.path.encode() + b'\0' + request.get_data()
+        ).hexdigest()
+        owner = uuid.uuid4().hex
+
+        deadline = time.monotonic() + config.IDEMPOTENCY_WAIT_SECONDS
+        waited = False
+        while True:
+            try:
+                claim = repo.claim_idempotency_key(
+                    userid, key, fingerprint, owner,
+                    config.IDEMPOTENCY_TTL_SECONDS, config.IDEMPOTENCY_LEASE_SECONDS
+                )
+            except IdempotencyStoreFullError:
+                metrics.incr('idempotency.store_full')
+                return jsonify({
+                    'success': False,
+                    'error': 'Too many requests in progress, please retry shortly'
+                }), 503
+            if claim is None:
+                break
+
+            if claim['fingerprint'] != fingerprint:
+                return jsonify({
+                    'success': False,
+                    'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'
+                }), 422
+
+            if not waited:
+                metrics.incr('idempotency.duplicates')
+                waited = True
+
+            # Poll until the first attempt stores its response, or releases
+            # the key after failing (then claim it again)
+            while claim is not None and claim['response'] is None:
+                if time.monotonic() >= deadline:
+                    return jsonify({
+                        'success': False,
+                        'error': 'A request with this Idempotency-Key is still in progress'
+                    }), 409
+                time.sleep(POLL_SECONDS)
+                claim = repo.get_idempotency_key(userid, key)
+
+            if claim is not None:
+                metrics.incr('idempotency.replays')
+                return _replay(claim['response'])
+
+        try:
+            response = make_response(f(current_user, *args, **kwargs))
+        except Exception:
+            repo.release_idempotency_key(userid, key, owner)
+            raise
+
+        if response.status_code >= 500 or response.is_streamed:
+            repo.release_idempotency_key(userid, key, owner)
+        else:
+            repo.complete_idempotency_key(userid, key, owner,
+                                          (response.get_data(), response.status_code, response.mimetype))
+        return response
+
+    return decorated
@@ -0,0 +1,61 @@
+"""
+Read-your-writes middleware
+Keeps a user's reads on the primary database for a short window after they
+wrote, so replica lag never hides their own apply/accept/status change
+"""
+
+import time
+from flask import request
+from config import config
+import database
+
+
+STICKY_COOKIE = 'ocs_primary_until'
+
+MUTATING_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+def _cookie_deadline():
+    """The primary-until deadline sent back by the browser, if still plausible"""
+    try:
+        until = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return 0.0
+    # A forged far-future value must not pin a client to the primary forever
+    return min(until, time.time() + config.READ_YOUR_WRITES_SECONDS)
+
+
+def init_read_routing(app):
+    """
+    Register the request hooks that drive replica routing in database.py
+
+    Mutating requests run entirely on the primary (their checks must see
+    the latest state). A request that wrote sets a cookie so the same
+    browser's following requests, on any worker, also read from the
+    primary until the window expires.
+    """
+
+    @app.before_request
+    def _begin_read_routing():
+        database.begin_request(
+            sticky_until=_cookie_deadline(),
+            force_primary=request.method in MUTATING_METHODS
+        )
+
+    @app.after_request
+    def _remember_writes(response):
+        if not config.DATABASE_REPLICA_URLS:
+            return response
+
+        until = database.sticky_until()
+        if until > time.time() and until > _cookie_deadline():
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{until:.3f}",
+                max_age=config.READ_YOUR_WRITES_SECONDS,
+                path='/api',
+                secure=request.is_secure,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -0,0 +1,36 @@
+"""
+Request id middleware
+Tags every request with an id that is attached to its log records and
+returned in the X-Request-ID response header, so a user's error report can
+be matched to the server's logs
+"""
+
+import re
+import uuid
+from flask import request
+from utils.log import request_id
+
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Ids forwarded by a proxy are kept only if they look harmless in a log line
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def init_request_id(app):
+    """Register the request hooks that set and return the request id"""
+
+    @app.before_request
+    def _assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        request_id.set(incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex)
+
+    @app.after_request
+    def _return_request_id(response):
+        if request_id.get():
+            response.headers[REQUEST_ID_HEADER] = request_id.get()
+        return response
+
+    @app.teardown_request
+    def _clear_request_id(exc):
+        request_id.set(None)
@@ -0,0 +1,160 @@
+"""
+Job profile search
+Ranked full-text/trigram search in Postgres, plus an in-process prefix
+index for typeahead that is updated incrementally as profiles are created
+"""
+
+import re
+import threading
+import time
+from database import execute_query
+from config import config
+from utils.prefix_index import PrefixIndex
+from shared_cache import cache
+
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+# Profile fields every listing carries (NUMERIC cast so rows are JSON-ready)
+PROFILE_COLUMNS = """profile_code, recruiter_email, company_name, designation,
+           eligible_branches, eligible_degrees, min_cgpa::float8 AS min_cgpa"""
+
+# The active season's catalog, cached under 'catalog' by the listing and the typeahead index
+CATALOG_QUERY = f"""
+    SELECT {PROFILE_COLUMNS}
+    FROM profile
+    WHERE season = active_season()
+    ORDER BY profile_code
+"""
+
+
+def search_profiles(query, limit):
+    """
+    Ranked search over company_name and designation of the active season's profiles
+
+    Every word is matched as a prefix against the tsvector index; trigram
+    similarity additionally catches typos ("gogle") and ranks close
+    spellings higher.
+
+    Returns:
+        list: profile rows with a "rank" field, best first
+    """
+    words = _WORD.findall(query.lower())
+    if not words:
+        return []
+    tsquery = ' & '.join(f"{word}:*" for word in words)
+
+    return execute_query(
+        f"""
+        SELECT {PROFILE_COLUMNS},
+               ts_rank(search_vector, to_tsquery('simple', %s))
+                 + greatest(similarity(company_name, %s), similarity(designation, %s)) AS rank
+        FROM profile
+        WHERE season = active_season()
+          AND (search_vector @@ to_tsquery('simple', %s)
+               OR company_name %% %s
+               OR designation %% %s)
+        ORDER BY rank DESC, profile_code
+        LIMIT %s
+        """,
+        (tsquery, query, query, tsquery, query, query, limit),
+        fetch_all=True
+    )
+
+
+class ProfileCatalogIndex:
+    """
+    Typeahead index over all profiles of this worker process
+
+    Profiles created by this worker are added immediately; ones created
+    by other workers are picked up by a cheap incremental refresh
+    (profile_code > highest seen). A periodic full rebuild catches any
+    profile whose code was committed out of order, and a change of the
+    active season (seasons.start_season) forces one at the next refresh.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = PrefixIndex()
+        self._profiles = {}
+        self._max_code = 0
+        self._season = None
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+
+    def add(self, profile):
+        """Index one profile row (profile_code, company_name, designation)"""
+        self.add_many([profile])
+
+    def add_many(self, profiles):
+        fresh = []
+        for profile in profiles:
+            code = profile['profile_code']
+            if code in self._profiles:
+                continue
+            self._profiles[code] = {
+                'profile_code': code,
+                'company_name': profile['company_name'],
+                'designation': profile['designation']
+            }
+            self._max_code = max(self._max_code, code)
+            fresh.append((code, profile['company_name'], profile['designation']))
+
+        if len(fresh) == 1:
+            self._index.add(*fresh[0])
+        elif fresh:
+            self._index.add_many(fresh)
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self._refreshed_at < config.PREFIX_INDEX_REFRESH_SECONDS:
+            return
+
+        with self._lock:
+            if now - self._refreshed_at < config.PREFIX_INDEX_REFRESH_SECONDS:
+                return
+
+            # Always one row, so the active season is known even with no new profiles
+            rows = execute_query(
+                """
+                SELECT s.season, p.profile_code, p.company_name, p.designation
+                FROM (SELECT active_season() AS season) s
+                LEFT JOIN profile p ON p.season = s.season AND p.profile_code > %s
+                ORDER BY p.profile_code
+                """,
+                (self._max_code,),
+                fetch_all=True
+            )
+            season = rows[0]['season']
+            if season != self._season:
+                # The cached catalog may still be the previous season's
+                self._rebuild(cached=self._season is None)
+                self._season = season
+                self._built_at = now
+            elif now - self._built_at >= config.PREFIX_INDEX_REBUILD_SECONDS:
+                self._rebuild()
+                self._built_at = now
+            else:
+                self.add_many(row for row in rows if row['profile_code'] is not None)
+
+            self._refreshed_at = now
+
+    def _rebuild(self, cached=True):
+        # Same rows (and cache key) as the profile listing, so a fresh
+        # worker warms its index from the shared cache
+        load = lambda: execute_query(CATALOG_QUERY, fetch_all=True)
+        rows = cache.get_or_load('catalog', load) if cached else load()
+        fresh = ProfileCatalogIndex()
+        fresh.add_many(rows)
+        # Swap in one step so concurrent lookups never see a half-built index
+        self._index, self._profiles, self._max_code = fresh._index, fresh._profiles, fresh._max_code
+
+    def suggest(self, prefix, limit):
+        """Profiles whose company or designation starts with prefix"""
+        self.refresh()
+        profiles = self._profiles
+        return [profiles[code] for code in self._index.search(prefix, limit) if code in profiles]
+
+
+# One typeahead index per worker process
+catalog = ProfileCatalogIndex()
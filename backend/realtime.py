@@ -0,0 +1,200 @@
+"""
+Real-time status events
+One LISTEN connection per worker process receives application_status
+notifications and fans them out to the SSE connections they concern;
+other modules can hook further channels into the same connection
+"""
+
+import json
+import os
+import queue
+import select
+import threading
+import time
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from database import get_db_connection
+from config import config
+from utils.log import get_logger
+
+
+log = get_logger(__name__)
+
+CHANNEL = 'application_status'
+
+# Seconds between reconnect attempts after the listener connection drops
+RECONNECT_DELAY = 5
+
+
+class Subscription:
+    """Bounded event queue for one SSE connection"""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.events = queue.Queue(maxsize=config.SSE_QUEUE_SIZE)
+        # Set when the client fell too far behind; the stream then ends and
+        # the browser reconnects, replaying from its Last-Event-ID
+        self.overflowed = False
+
+    def push(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+
+class EventHub:
+    """
+    Per-process fan-out of Postgres notifications
+
+    The listener thread is started lazily on first subscribe, and again
+    if the process forked since (prefork servers preload the app).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # key -> set of Subscription
+        self._handlers = {}     # channel -> [handler(payloads)]
+        self._pid = None
+
+    def add_handler(self, channel, handler):
+        """
+        Also LISTEN on channel and pass each batch of its payloads to handler
+
+        Handlers run on the listener thread and get a list of payload
+        strings, so bursts (e.g. a sweeper batch) arrive together.
+        """
+        with self._lock:
+            self._handlers.setdefault(channel, []).append(handler)
+
+    def start(self):
+        """Start the listener without subscribing (for channel handlers)"""
+        with self._lock:
+            self._ensure_listener()
+
+    def subscribe(self, keys):
+        """
+        Register interest in one or more routing keys
+
+        Args:
+            keys (list): e.g. ['student:2021CS10001'], ['recruiter:hr@corp.com'], ['admin']
+
+        Returns:
+            Subscription
+        """
+        subscription = Subscription(keys)
+        with self._lock:
+            self._ensure_listener()
+            for key in keys:
+                self._subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[key]
+
+    def publish(self, event):
+        """Deliver one event to everyone it concerns"""
+        keys = ['admin', f"student:{event.get('entry_number')}"]
+        if event.get('recruiter_email'):
+            keys.append(f"recruiter:{event['recruiter_email']}")
+
+        with self._lock:
+            targets = set()
+            for key in keys:
+                targets.update(self._subscribers.get(key, ()))
+
+        for subscription in targets:
+            subscription.push(event)
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._subscribers = {}
+        thread = threading.Thread(target=self._listen_forever, name='status-listener', daemon=True)
+        thread.start()
+
+    def _listen_forever(self):
+        while True:
+            connection = None
+            try:
+                connection = get_db_connection()
+                connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = connection.cursor()
+                cursor.execute(f"LISTEN {CHANNEL}")
+                listening = {CHANNEL}
+
+                while True:
+                    # Pick up channels whose handlers were added after start
+                    for channel in set(self._handlers) - listening:
+                        cursor.execute(f"LISTEN {channel}")
+                        listening.add(channel)
+
+                    ready, _, _ = select.select([connection], [], [], config.SSE_HEARTBEAT_SECONDS)
+                    if not ready:
+                        continue
+                    connection.poll()
+
+                    batches = {}
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        batches.setdefault(notification.channel, []).append(notification.payload)
+
+                    for payload in batches.get(CHANNEL, ()):
+                        try:
+                            self.publish(json.loads(payload))
+                        except ValueError:
+                            log.warning("Bad notification payload", extra={'payload': payload[:200]})
+
+                    for channel, payloads in batches.items():
+                        for handler in self._handlers.get(channel, ()):
+                            try:
+                                handler(payloads)
+                            except Exception:
+                                log.exception("Notification handler error", extra={'channel': channel})
+
+            except Exception:
+                log.exception("Status listener error")
+                time.sleep(RECONNECT_DELAY)
+
+            finally:
+                if connection:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+
+# One hub per worker process
+hub = EventHub()
+
+
+def subscription_keys(current_user):
+    """Routing keys for the events a user is allowed to see"""
+    role = current_user['role']
+    if role == 'admin':
+        return ['admin']
+    return [f"{role}:{current_user['userid']}"]
+
+
+def format_event(event, event_id):
+    """Serialize one status event in SSE wire format, under a resume id"""
+    return (
+        f"id: {event_id}\n"
+        f"event: status\n"
+        f"data: {json.dumps(event, default=str)}\n\n"
+    )
+
+
+def format_checkpoint(event_id):
+    """An event that only moves the client's resume id forward"""
+    return (
+        f"id: {event_id}\n"
+        f"event: checkpoint\n"
+        f"data: {event_id}\n\n"
+    )
@@ -0,0 +1,45 @@
+"""
+Storage repositories
+Blueprints import `repo` and call it instead of writing SQL; the engine
+behind it is chosen by STORAGE_BACKEND (postgres | memory)
+"""
+
+from config import config
+from repositories.base import Repository, IntegrityError, OpeningsFilledError, IdempotencyStoreFullError
+from repositories.postgres import PostgresRepository
+from repositories.memory import MemoryRepository
+
+
+BACKENDS = {
+    'postgres': PostgresRepository,
+    'memory': MemoryRepository,
+}
+
+_active = None
+
+
+def create_repository(backend=None):
+    """Instantiate a repository by backend name (default: STORAGE_BACKEND)"""
+    name = (backend or config.STORAGE_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STORAGE_BACKEND '{name}', expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def use(repository):
+    """Make `repo` forward to this repository (tests and benchmarks swap engines here)"""
+    global _active
+    _active = repository
+    return repository
+
+
+class _ActiveRepository:
+    """Forwards every call to the repository selected by use() or STORAGE_BACKEND"""
+
+    def __getattr__(self, name):
+        if _active is None:
+            use(create_repository())
+        return getattr(_active, name)
+
+
+repo = _ActiveRepository()
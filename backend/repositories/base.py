@@ -0,0 +1,355 @@
+"""
+Repository interface
+Every data access made by the blueprints goes through one of these methods,
+so the storage engine behind them can be swapped
+"""
+
+
+APPLICATION_STATUSES = ('Applied', 'Selected', 'Accepted', 'Not Selected')
+
+# Statuses that lock a student out of browsing and applying elsewhere;
+# an application in one of them also holds one of its profile's openings
+LOCKING_STATUSES = ('Selected', 'Accepted')
+
+
+class IntegrityError(Exception):
+    """A write violated a uniqueness or reference constraint"""
+
+
+class OpeningsFilledError(Exception):
+    """A status change needed a seat but every opening of the profile is taken"""
+
+
+class IdempotencyStoreFullError(Exception):
+    """No room for another idempotency key: every stored one is still in flight"""
+
+
+class Repository:
+    """
+    Storage operations used by the routes
+
+    Rows are returned as plain dicts with the same keys in every
+    implementation. Methods that are not implemented raise
+    NotImplementedError.
+
+    Profiles, applications and allocation lists are those of the active
+    placement season (seasons.py); earlier seasons are not visible here.
+    """
+
+    # --- Users ---
+
+    def authenticate(self, userid, password_md5):
+        """Return {"userid", "role"} if the credentials match, else None"""
+        raise NotImplementedError
+
+    def get_user(self, userid, role=None):
+        """Return {"userid", "role"} (optionally only with that role), else None"""
+        raise NotImplementedError
+
+    def list_users(self):
+        """All users as {"userid", "role"}, ordered by role, userid"""
+        raise NotImplementedError
+
+    def users_page(self, limit, offset):
+        """
+        One page of list_users()
+
+        Returns:
+            dict: {"users": [...], "total": <number of users>}
+        """
+        raise NotImplementedError
+
+    def import_users(self, text_stream):
+        """
+        Upsert a CSV roster (userid,password_md5,role), see bulk_import.py
+
+        Returns:
+            dict: {"rows", "inserted", "updated", "rejected", "rejects": [...]}
+        """
+        raise NotImplementedError
+
+    # --- Sessions ---
+
+    def revoke_session(self, session_id, expires_at):
+        """
+        Record a logged-out session until it could no longer be renewed
+
+        Args:
+            session_id (str): The tokens' "sid" claim
+            expires_at (float): time.time() after which the entry can be dropped
+        """
+        raise NotImplementedError
+
+    def revoked_sessions(self):
+        """Unexpired revocations as {session_id: expires_at}"""
+        raise NotImplementedError
+
+    # --- Idempotency keys ---
+
+    def claim_idempotency_key(self, userid, key, fingerprint, owner, ttl_seconds, lease_seconds):
+        """
+        Claim a key for a new request, unless a live claim already holds it
+
+        A claim expires after ttl_seconds; one still without a response
+        after lease_seconds is taken to have died with its worker.
+
+        Args:
+            owner (str): Identifies this claim to complete/release
+        Returns:
+            dict: None if the caller now owns the key, else the current
+            claim {"fingerprint", "response"} (see get_idempotency_key)
+        Raises:
+            IdempotencyStoreFullError: A bounded store has no room left
+        """
+        raise NotImplementedError
+
+    def get_idempotency_key(self, userid, key):
+        """
+        The live claim of a key, or None
+
+        Returns:
+            dict: {"fingerprint", "response"}; response is (body, status,
+            mimetype) once completed, None while still running
+        """
+        raise NotImplementedError
+
+    def complete_idempotency_key(self, userid, key, owner, response):
+        """Store the (body, status, mimetype) answered to the owning request"""
+        raise NotImplementedError
+
+    def release_idempotency_key(self, userid, key, owner):
+        """Forget a failed attempt so the next retry runs the request again"""
+        raise NotImplementedError
+
+    # --- Profiles ---
+
+    def list_profiles(self, recruiter_email=None):
+        """
+        All profiles (or one recruiter's), ordered by profile_code
+
+        Rows carry the eligibility criteria (eligible_branches,
+        eligible_degrees, min_cgpa). A recruiter's own list also carries
+        openings and seats_filled; the full catalog does not, so seat
+        changes never make it stale.
+        """
+        raise NotImplementedError
+
+    def get_profile(self, profile_code, recruiter_email=None):
+        """One profile, optionally only if owned by recruiter_email"""
+        raise NotImplementedError
+
+    def create_profile(self, recruiter_email, company_name, designation, openings=None,
+                       criteria=None):
+        """
+        Args:
+            openings (int): Seats on offer; None means unlimited
+            criteria (dict): eligible_branches, eligible_degrees, min_cgpa
+                (each optional, None = no restriction)
+
+        Returns:
+            dict: {"profile_code", "company_name", "designation"}
+
+        Raises:
+            IntegrityError: If the recruiter does not exist
+        """
+        raise NotImplementedError
+
+    def set_openings(self, profile_code, openings):
+        """
+        Change a profile's openings (None = unlimited)
+
+        Returns:
+            dict or None: {"profile_code", "openings", "seats_filled"}, or None
+            when more seats than that are already filled
+        """
+        raise NotImplementedError
+
+    def set_criteria(self, profile_code, criteria):
+        """
+        Replace a profile's eligibility criteria and update every
+        student's bit for it
+
+        Returns:
+            dict or None: {"profile_code", "eligible_branches",
+            "eligible_degrees", "min_cgpa"}, None if the profile does not exist
+        """
+        raise NotImplementedError
+
+    def search_profiles(self, query, limit):
+        """Ranked search over company_name/designation, rows carry a "rank" field"""
+        raise NotImplementedError
+
+    def suggest_profiles(self, prefix, limit):
+        """Typeahead: {"profile_code", "company_name", "designation"} rows"""
+        raise NotImplementedError
+
+    # --- Eligibility ---
+
+    def get_student_attributes(self, entry_number):
+        """Return {"entry_number", "branch", "degree", "cgpa"}, else None"""
+        raise NotImplementedError
+
+    def set_student_attributes(self, students):
+        """
+        Upsert students' branch, degree and cgpa and recompute their bitmaps
+
+        Args:
+            students (list): {"entry_number", "branch", "degree", "cgpa"} dicts
+
+        Returns:
+            list: entry numbers written; the others are not student accounts
+        """
+        raise NotImplementedError
+
+    def eligibility(self, entry_number):
+        """
+        The student's eligibility bitmap (utils/eligibility.py) as an int;
+        0 for a student without attributes, who only qualifies for
+        unrestricted profiles
+        """
+        raise NotImplementedError
+
+    # --- Applications ---
+
+    def find_locking_offer(self, entry_number):
+        """Return {"status"} of a 'Selected'/'Accepted' application, else None"""
+        raise NotImplementedError
+
+    def get_application(self, profile_code, entry_number):
+        """Application joined with company_name, designation, recruiter_email"""
+        raise NotImplementedError
+
+    def list_student_applications(self, entry_number):
+        """One student's applications with profile fields, by profile_code"""
+        raise NotImplementedError
+
+    def list_all_applications(self):
+        """Every application with profile fields, by profile_code, entry_number"""
+        raise NotImplementedError
+
+    def recruiter_applications(self, recruiter_email, profile_code=None, status=None,
+                               sort='profile_code', order='asc', limit=100, offset=0):
+        """
+        One page of a recruiter's applications plus facet counts
+
+        Per-profile counts honour the status filter, per-status counts
+        honour the profile filter. recruiter_email=None pages over every
+        recruiter's applications (admin dashboard).
+
+        Returns:
+            dict: {"applications", "total", "profile_facets", "status_facets"}
+        """
+        raise NotImplementedError
+
+    def create_application(self, profile_code, entry_number, changed_by, status='Applied'):
+        """
+        Insert an application and its first history entry atomically
+
+        Returns:
+            dict: {"seq": <history sequence number>}
+
+        Raises:
+            IntegrityError: On a duplicate application or unknown profile/student
+        """
+        raise NotImplementedError
+
+    def change_status(self, profile_code, entry_number, new_status, changed_by,
+                      expected_status=None):
+        """
+        Update a status and record the transition atomically
+
+        Moving into a LOCKING_STATUSES status takes one of the profile's
+        openings in the same transaction, moving out of one frees it.
+
+        Returns:
+            dict or None: {"seq", "old_status"}, or None when nothing changed
+
+        Raises:
+            OpeningsFilledError: If a seat was needed and none is free
+        """
+        raise NotImplementedError
+
+    def expire_offers(self, expiry_hours, batch_size):
+        """Move overdue 'Selected' offers to 'Not Selected' (freeing their seats); returns the count"""
+        raise NotImplementedError
+
+    # --- Batch allocation ---
+
+    def get_preferences(self, entry_number):
+        """A student's preference list as profile codes, most wanted first"""
+        raise NotImplementedError
+
+    def set_preferences(self, entry_number, profile_codes):
+        """
+        Replace a student's preference list
+
+        Raises:
+            IntegrityError: If the student has not applied to one of the profiles
+        """
+        raise NotImplementedError
+
+    def get_ranking(self, profile_code):
+        """A profile's ranking of its applicants as entry numbers, best first"""
+        raise NotImplementedError
+
+    def set_ranking(self, profile_code, entry_numbers):
+        """
+        Replace a profile's ranking
+
+        Raises:
+            IntegrityError: If one of the students has not applied to the profile
+        """
+        raise NotImplementedError
+
+    def run_allocation(self, changed_by, dry_run=False):
+        """
+        Offer every eligible student a stable assignment in one transaction,
+        see allocation.py
+
+        Returns:
+            dict: {"dry_run", "students", "profiles", "pairs", "placed",
+                   "unplaced", "offers": [...], "timings_ms": {...}}
+
+        Raises:
+            TimeoutError: If running writes kept the run from starting
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Counts for the admin dashboard
+
+        Returns:
+            dict: {"season", "users": {role: n}, "profiles": n,
+                   "applications": {status: n}} (profiles and
+                   applications of the active season)
+        """
+        raise NotImplementedError
+
+    # --- Change feed ---
+
+    def latest_seq(self, entry_number=None, recruiter_email=None):
+        """Highest change sequence number visible to the given scope"""
+        raise NotImplementedError
+
+    def fetch_changes(self, since, limit, entry_number=None, recruiter_email=None):
+        """Status changes after since, oldest first, joined with profile fields"""
+        raise NotImplementedError
+
+    def changes_response(self, since, limit, entry_number=None, recruiter_email=None):
+        """
+        Build the JSON body shared by the per-role /changes endpoints
+
+        Returns:
+            dict: {"success", "changes": [...], "last_seq": int, "has_more": bool}
+        """
+        rows = self.fetch_changes(since, limit + 1, entry_number, recruiter_email)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return {
+            'success': True,
+            'changes': rows,
+            'last_seq': rows[-1]['seq'] if rows else since,
+            'has_more': has_more
+        }
@@ -0,0 +1,684 @@
+"""
+In-memory repository
+An indexed, thread-safe engine with the same semantics as the Postgres
+schema, for unit tests and micro-benchmarks that must not need a database
+"""
+
+import bisect
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from config import config
+from repositories.base import (Repository, IntegrityError, OpeningsFilledError,
+                               IdempotencyStoreFullError, LOCKING_STATUSES)
+from allocation import summarize
+from seasons import default_season
+from bulk_import import CsvCopyStream, MAX_REPORTED_REJECTS, USERID_PATTERN
+from status_history import OFFER_EXPIRY_ACTOR
+from utils.eligibility import CRITERIA_FIELDS, EligibilityIndex, admits, is_restricted, with_bit
+from utils.prefix_index import PrefixIndex
+from utils.stable_matching import Proposals, deferred_acceptance, assigned_pairs
+
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_MD5 = re.compile(r'^[0-9a-f]{32}$', re.IGNORECASE)
+_USERID = re.compile(USERID_PATTERN)
+
+# pg_trgm's default similarity threshold for the % operator
+SIMILARITY_THRESHOLD = 0.3
+
+# Columns of the full catalog (list_profiles() without a recruiter)
+_CATALOG_COLUMNS = ('profile_code', 'recruiter_email', 'company_name', 'designation') + CRITERIA_FIELDS
+
+# Tuple positions of the sortable columns in recruiter_applications()
+_SORT_COLUMNS = {'profile_code': 0, 'entry_number': 1, 'status': 2}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _trigrams(text):
+    """pg_trgm's trigram set: each word padded with two spaces front, one back"""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """Same measure as pg_trgm's similarity(): shared / total distinct trigrams"""
+    a, b = _trigrams(a), _trigrams(b)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MemoryRepository(Repository):
+    """
+    Dict-and-index storage mirroring the Postgres tables
+
+    Enforces what the database enforces: unique userids and applications,
+    and that applications and profiles reference existing rows. Every
+    operation holds one lock, so each behaves like a single statement.
+
+    Seed it with add_user(), then use it like the Postgres repository.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._users = {}                    # userid -> row
+        self._profiles = {}                 # profile_code -> row
+        self._profiles_by_recruiter = {}    # recruiter_email -> [profile_code], ascending
+        self._next_profile_code = 1
+        self._applications = {}             # (profile_code, entry_number) -> row
+        self._applications_by_student = {}  # entry_number -> {profile_code}
+        self._applications_by_profile = {}  # profile_code -> {entry_number}
+        self._applications_by_status = {}   # status -> {(profile_code, entry_number)}
+        self._history = []                  # change rows; seq == index + 1
+        self._history_by_student = {}       # entry_number -> [seq], ascending
+        self._history_by_recruiter = {}     # recruiter_email -> [seq], ascending
+        self._catalog = PrefixIndex()
+        self._preferences = {}              # entry_number -> [profile_code], most wanted first
+        self._rankings = {}                 # profile_code -> {entry_number: rank}, best first
+        self._attributes = {}               # entry_number -> branch, degree, cgpa, bitmap (int)
+        self._season = default_season()     # one season: there is nothing to roll over
+        self._revoked = {}                  # session_id -> expires_at (time.time())
+        self._idempotency = OrderedDict()   # (userid, key) -> claim, in expiry order
+        self._idempotency_max_keys = config.IDEMPOTENCY_MAX_KEYS
+
+    # --- Users ---
+
+    def add_user(self, userid, password_hash, role):
+        """Insert a user (seeding helper; raises IntegrityError on duplicates)"""
+        with self._lock:
+            if userid in self._users:
+                raise IntegrityError(f"duplicate userid {userid!r}")
+            self._users[userid] = {'userid': userid, 'password_hash': password_hash, 'role': role}
+
+    def authenticate(self, userid, password_md5):
+        user = self._users.get(userid)
+        if user is None or user['password_hash'] != password_md5:
+            return None
+        return {'userid': user['userid'], 'role': user['role']}
+
+    def get_user(self, userid, role=None):
+        user = self._users.get(userid)
+        if user is None or (role is not None and user['role'] != role):
+            return None
+        return {'userid': user['userid'], 'role': user['role']}
+
+    def list_users(self):
+        with self._lock:
+            users = [{'userid': u['userid'], 'role': u['role']} for u in self._users.values()]
+        return sorted(users, key=lambda u: (u['role'], u['userid']))
+
+    def users_page(self, limit, offset):
+        users = self.list_users()
+        return {'users': users[offset:offset + limit], 'total': len(users)}
+
+    def import_users(self, text_stream):
+        stream = CsvCopyStream(text_stream)
+        records = list(stream.records())
+        rejects = list(stream.rejects)
+        rejected = stream.rejected
+        inserted = updated = 0
+
+        with self._lock:
+            seen = set()
+            for line_no, (userid, password_md5, role) in records:
+                existing = self._users.get(userid)
+                first = userid not in seen
+                seen.add(userid)
+
+                # Same rules, in the same order, as the staging-table UPDATE
+                if userid == '':
+                    reason = 'userid is required'
+                elif not _USERID.fullmatch(userid):
+                    reason = 'invalid userid'
+                elif not _MD5.match(password_md5):
+                    reason = 'Invalid password hash format'
+                elif role not in ('student', 'recruiter'):
+                    reason = 'role must be student or recruiter'
+                elif not first:
+                    reason = 'duplicate userid in file'
+                elif existing is not None and existing['role'] != role:
+                    reason = 'userid already exists with a different role'
+                else:
+                    reason = None
+
+                if reason is not None:
+                    rejected += 1
+                    if len(rejects) < MAX_REPORTED_REJECTS:
+                        rejects.append({'line': line_no, 'reason': reason})
+                elif existing is None:
+                    self._users[userid] = {
+                        'userid': userid, 'password_hash': password_md5.lower(), 'role': role
+                    }
+                    inserted += 1
+                else:
+                    existing['password_hash'] = password_md5.lower()
+                    updated += 1
+
+        return {
+            'rows': stream.rows,
+            'inserted': inserted,
+            'updated': updated,
+            'rejected': rejected,
+            'rejects': sorted(rejects, key=lambda r: r['line'])[:MAX_REPORTED_REJECTS]
+        }
+
+    # --- Sessions ---
+
+    def revoke_session(self, session_id, expires_at):
+        with self._lock:
+            now = time.time()
+            self._revoked = {sid: until for sid, until in self._revoked.items() if until > now}
+            self._revoked.setdefault(session_id, expires_at)
+
+    def revoked_sessions(self):
+        now = time.time()
+        with self._lock:
+            return {sid: until for sid, until in self._revoked.items() if until > now}
+
+    # --- Idempotency keys ---
+
+    @staticmethod
+    def _idempotency_claim(claim):
+        return {'fingerprint': claim['fingerprint'], 'response': claim['response']}
+
+    def claim_idempotency_key(self, userid, key, fingerprint, owner, ttl_seconds, lease_seconds):
+        # Bounded: expired claims go from the front; when full, the oldest
+        # completed one makes room. A claim in flight is never dropped,
+        # since its duplicates would run the request again.
+        now = time.monotonic()
+        scope = (userid, key)
+        with self._lock:
+            while self._idempotency:
+                oldest = next(iter(self._idempotency.values()))
+                if oldest['expires_at'] > now:
+                    break
+                self._idempotency.popitem(last=False)
+
+            claim = self._idempotency.get(scope)
+            if claim is not None:
+                live = claim['response'] is not None or claim['claimed_at'] + lease_seconds > now
+                if live and claim['expires_at'] > now:
+                    return self._idempotency_claim(claim)
+                del self._idempotency[scope]
+
+            if len(self._idempotency) >= self._idempotency_max_keys:
+                completed = next((k for k, c in self._idempotency.items()
+                                  if c['response'] is not None), None)
+                if completed is None:
+                    raise IdempotencyStoreFullError()
+                del self._idempotency[completed]
+
+            self._idempotency[scope] = {
+                'fingerprint': fingerprint,
+                'owner': owner,
+                'claimed_at': now,
+                'expires_at': now + ttl_seconds,
+                'response': None
+            }
+            return None
+
+    def get_idempotency_key(self, userid, key):
+        with self._lock:
+            claim = self._idempotency.get((userid, key))
+            if claim is None or claim['expires_at'] <= time.monotonic():
+                return None
+            return self._idempotency_claim(claim)
+
+    def complete_idempotency_key(self, userid, key, owner, response):
+        with self._lock:
+            claim = self._idempotency.get((userid, key))
+            if claim is not None and claim['owner'] == owner:
+                claim['response'] = response
+
+    def release_idempotency_key(self, userid, key, owner):
+        with self._lock:
+            claim = self._idempotency.get((userid, key))
+            if claim is not None and claim['owner'] == owner:
+                del self._idempotency[(userid, key)]
+
+    # --- Profiles ---
+
+    def list_profiles(self, recruiter_email=None):
+        with self._lock:
+            if recruiter_email is None:
+                return [{column: self._profiles[code][column] for column in _CATALOG_COLUMNS}
+                        for code in sorted(self._profiles)]
+            codes = self._profiles_by_recruiter.get(recruiter_email, [])
+            return [dict(self._profiles[code]) for code in codes]
+
+    def get_profile(self, profile_code, recruiter_email=None):
+        profile = self._profiles.get(profile_code)
+        if profile is None or (recruiter_email is not None
+                               and profile['recruiter_email'] != recruiter_email):
+            return None
+        return dict(profile)
+
+    def create_profile(self, recruiter_email, company_name, designation, openings=None,
+                       criteria=None):
+        criteria = criteria or {}
+        with self._lock:
+            if recruiter_email not in self._users:
+                raise IntegrityError(f"recruiter {recruiter_email!r} does not exist")
+
+            code = self._next_profile_code
+            self._next_profile_code += 1
+            self._profiles[code] = {
+                'profile_code': code,
+                'recruiter_email': recruiter_email,
+                'company_name': company_name,
+                'designation': designation,
+                'openings': openings,
+                'seats_filled': 0,
+                **self._criteria(criteria)
+            }
+            self._profiles_by_recruiter.setdefault(recruiter_email, []).append(code)
+            self._catalog.add(code, company_name, designation)
+            if is_restricted(criteria):
+                self._update_profile_bit(self._profiles[code])
+
+        return {'profile_code': code, 'company_name': company_name, 'designation': designation}
+
+    def set_openings(self, profile_code, openings):
+        with self._lock:
+            profile = self._profiles.get(profile_code)
+            if profile is None or (openings is not None and profile['seats_filled'] > openings):
+                return None
+            profile['openings'] = openings
+            return {'profile_code': profile_code, 'openings': openings,
+                    'seats_filled': profile['seats_filled']}
+
+    @staticmethod
+    def _criteria(criteria):
+        return {field: (list(criteria[field]) if isinstance(criteria.get(field), list)
+                        else criteria.get(field))
+                for field in CRITERIA_FIELDS}
+
+    def _update_profile_bit(self, profile):
+        code = profile['profile_code']
+        restricted = is_restricted(profile)
+        for attributes in self._attributes.values():
+            attributes['bitmap'] = with_bit(attributes['bitmap'], code,
+                                            restricted and admits(profile, attributes))
+
+    def set_criteria(self, profile_code, criteria):
+        with self._lock:
+            profile = self._profiles.get(profile_code)
+            if profile is None:
+                return None
+            profile.update(self._criteria(criteria))
+            self._update_profile_bit(profile)
+            return {'profile_code': profile_code, **self._criteria(profile)}
+
+    def search_profiles(self, query, limit):
+        """
+        Word-prefix match plus trigram similarity, as in profile_search
+
+        The prefix part of the rank is a constant instead of ts_rank, so
+        absolute ranks differ from Postgres; matches are the same.
+        """
+        words = _WORD.findall(query.lower())
+        if not words:
+            return []
+
+        results = []
+        with self._lock:
+            profiles = list(self._profiles.values())
+
+        for profile in profiles:
+            fields = (profile['company_name'].lower(), profile['designation'].lower())
+            tokens = _WORD.findall(' '.join(fields))
+            matched = all(any(token.startswith(word) for token in tokens) for word in words)
+            score = max(similarity(query, field) for field in fields)
+            if matched or score >= SIMILARITY_THRESHOLD:
+                row = {column: profile[column] for column in _CATALOG_COLUMNS}
+                row['rank'] = (0.1 if matched else 0.0) + score
+                results.append(row)
+
+        results.sort(key=lambda row: (-row['rank'], row['profile_code']))
+        return results[:limit]
+
+    def suggest_profiles(self, prefix, limit):
+        codes = self._catalog.search(prefix, limit)
+        return [
+            {
+                'profile_code': code,
+                'company_name': self._profiles[code]['company_name'],
+                'designation': self._profiles[code]['designation']
+            }
+            for code in codes
+        ]
+
+    # --- Eligibility ---
+
+    def get_student_attributes(self, entry_number):
+        attributes = self._attributes.get(entry_number)
+        if attributes is None:
+            return None
+        return {'entry_number': entry_number, 'branch': attributes['branch'],
+                'degree': attributes['degree'], 'cgpa': attributes['cgpa']}
+
+    def set_student_attributes(self, students):
+        written = []
+        with self._lock:
+            index = EligibilityIndex(self._profiles.values())
+            for student in students:
+                user = self._users.get(student['entry_number'])
+                if user is None or user['role'] != 'student':
+                    continue
+                self._attributes[student['entry_number']] = {
+                    'branch': student['branch'],
+                    'degree': student['degree'],
+                    'cgpa': student['cgpa'],
+                    'bitmap': index.bitmap(student)
+                }
+                written.append(student['entry_number'])
+        return written
+
+    def eligibility(self, entry_number):
+        attributes = self._attributes.get(entry_number)
+        return attributes['bitmap'] if attributes else 0
+
+    # --- Applications ---
+
+    def _joined(self, application):
+        profile = self._profiles[application['profile_code']]
+        row = dict(application)
+        row['company_name'] = profile['company_name']
+        row['designation'] = profile['designation']
+        row['recruiter_email'] = profile['recruiter_email']
+        return row
+
+    def find_locking_offer(self, entry_number):
+        with self._lock:
+            for code in self._applications_by_student.get(entry_number, ()):
+                status = self._applications[(code, entry_number)]['status']
+                if status in LOCKING_STATUSES:
+                    return {'status': status}
+        return None
+
+    def get_application(self, profile_code, entry_number):
+        with self._lock:
+            application = self._applications.get((profile_code, entry_number))
+            return self._joined(application) if application else None
+
+    def list_student_applications(self, entry_number):
+        with self._lock:
+            codes = sorted(self._applications_by_student.get(entry_number, ()))
+            return [self._public(self._joined(self._applications[(code, entry_number)]))
+                    for code in codes]
+
+    def list_all_applications(self):
+        with self._lock:
+            return [self._public(self._joined(self._applications[key]))
+                    for key in sorted(self._applications)]
+
+    @staticmethod
+    def _public(row):
+        row.pop('status_changed_at', None)
+        return row
+
+    def recruiter_applications(self, recruiter_email, profile_code=None, status=None,
+                               sort='profile_code', order='asc', limit=100, offset=0):
+        with self._lock:
+            if recruiter_email is None:
+                profiles = dict(self._profiles)
+            else:
+                profiles = {code: self._profiles[code]
+                            for code in self._profiles_by_recruiter.get(recruiter_email, ())}
+            base = [
+                (code, entry_number, self._applications[(code, entry_number)]['status'])
+                for code in profiles
+                for entry_number in self._applications_by_profile.get(code, ())
+            ]
+
+        profile_counts = {}
+        status_counts = {}
+        matches = []
+        for row in base:
+            profile_ok = profile_code is None or row[0] == profile_code
+            status_ok = status is None or row[2] == status
+            profile_counts[row[0]] = profile_counts.get(row[0], 0) + status_ok
+            status_counts[row[2]] = status_counts.get(row[2], 0) + profile_ok
+            if profile_ok and status_ok:
+                matches.append(row)
+
+        # Same ordering as ORDER BY {sort} {order}, profile_code, entry_number:
+        # tuples sort by (profile_code, entry_number), the stable second sort
+        # then orders by the requested column
+        matches.sort()
+        if sort != 'profile_code' or order == 'desc':
+            column = _SORT_COLUMNS[sort]
+            matches.sort(key=lambda row: row[column], reverse=(order == 'desc'))
+
+        return {
+            'applications': [
+                {
+                    'profile_code': code,
+                    'entry_number': entry_number,
+                    'status': app_status,
+                    'company_name': profiles[code]['company_name'],
+                    'designation': profiles[code]['designation']
+                }
+                for code, entry_number, app_status in matches[offset:offset + limit]
+            ],
+            'total': len(matches),
+            'profile_facets': [
+                {
+                    'profile_code': code,
+                    'company_name': profiles[code]['company_name'],
+                    'designation': profiles[code]['designation'],
+                    'count': profile_counts[code]
+                }
+                for code in sorted(profile_counts)
+            ],
+            'status_facets': [{'status': name, 'count': status_counts[name]}
+                              for name in sorted(status_counts)]
+        }
+
+    def _record(self, profile_code, entry_number, old_status, new_status, changed_by):
+        seq = len(self._history) + 1
+        self._history.append({
+            'seq': seq,
+            'profile_code': profile_code,
+            'entry_number': entry_number,
+            'old_status': old_status,
+            'new_status': new_status,
+            'changed_by': changed_by,
+            'changed_at': _now()
+        })
+        recruiter_email = self._profiles[profile_code]['recruiter_email']
+        self._history_by_student.setdefault(entry_number, []).append(seq)
+        self._history_by_recruiter.setdefault(recruiter_email, []).append(seq)
+        return seq
+
+    def _set_status(self, key, application, new_status):
+        seat_delta = (new_status in LOCKING_STATUSES) - (application['status'] in LOCKING_STATUSES)
+        if seat_delta:
+            profile = self._profiles[key[0]]
+            profile['seats_filled'] = max(profile['seats_filled'] + seat_delta, 0)
+        self._applications_by_status[application['status']].discard(key)
+        self._applications_by_status.setdefault(new_status, set()).add(key)
+        application['status'] = new_status
+        application['status_changed_at'] = _now()
+
+    def create_application(self, profile_code, entry_number, changed_by, status='Applied'):
+        key = (profile_code, entry_number)
+        with self._lock:
+            if key in self._applications:
+                raise IntegrityError(f"duplicate application {key!r}")
+            if profile_code not in self._profiles:
+                raise IntegrityError(f"profile {profile_code!r} does not exist")
+            if entry_number not in self._users:
+                raise IntegrityError(f"user {entry_number!r} does not exist")
+
+            self._applications[key] = {
+                'profile_code': profile_code,
+                'entry_number': entry_number,
+                'status': status,
+                'status_changed_at': _now()
+            }
+            self._applications_by_student.setdefault(entry_number, set()).add(profile_code)
+            self._applications_by_profile.setdefault(profile_code, set()).add(entry_number)
+            self._applications_by_status.setdefault(status, set()).add(key)
+            return {'seq': self._record(profile_code, entry_number, None, status, changed_by)}
+
+    def change_status(self, profile_code, entry_number, new_status, changed_by,
+                      expected_status=None):
+        key = (profile_code, entry_number)
+        with self._lock:
+            application = self._applications.get(key)
+            if application is None:
+                return None
+            old_status = application['status']
+            if old_status == new_status:
+                return None
+            if expected_status is not None and old_status != expected_status:
+                return None
+            if new_status in LOCKING_STATUSES and old_status not in LOCKING_STATUSES:
+                profile = self._profiles[profile_code]
+                if profile['openings'] is not None and profile['seats_filled'] >= profile['openings']:
+                    raise OpeningsFilledError(f"no free opening on profile {profile_code}")
+
+            self._set_status(key, application, new_status)
+            seq = self._record(profile_code, entry_number, old_status, new_status, changed_by)
+            return {'seq': seq, 'old_status': old_status}
+
+    def expire_offers(self, expiry_hours, batch_size):
+        cutoff = _now() - timedelta(hours=expiry_hours)
+        with self._lock:
+            overdue = sorted(
+                (self._applications[key]['status_changed_at'], key)
+                for key in self._applications_by_status.get('Selected', ())
+                if self._applications[key]['status_changed_at'] < cutoff
+            )[:batch_size]
+
+            for _, key in overdue:
+                self._set_status(key, self._applications[key], 'Not Selected')
+                self._record(key[0], key[1], 'Selected', 'Not Selected', OFFER_EXPIRY_ACTOR)
+        return len(overdue)
+
+    # --- Batch allocation ---
+
+    def get_preferences(self, entry_number):
+        with self._lock:
+            return list(self._preferences.get(entry_number, ()))
+
+    def set_preferences(self, entry_number, profile_codes):
+        codes = list(profile_codes)
+        with self._lock:
+            applied = self._applications_by_student.get(entry_number, set())
+            if len(set(codes)) != len(codes) or not applied.issuperset(codes):
+                raise IntegrityError(f"preferences of {entry_number!r} must be distinct applied profiles")
+            self._preferences[entry_number] = codes
+
+    def get_ranking(self, profile_code):
+        with self._lock:
+            return list(self._rankings.get(profile_code, ()))
+
+    def set_ranking(self, profile_code, entry_numbers):
+        entries = list(entry_numbers)
+        with self._lock:
+            applicants = self._applications_by_profile.get(profile_code, set())
+            if len(set(entries)) != len(entries) or not applicants.issuperset(entries):
+                raise IntegrityError(f"ranking of profile {profile_code!r} must list distinct applicants")
+            self._rankings[profile_code] = {entry: rank for rank, entry in enumerate(entries, 1)}
+
+    def run_allocation(self, changed_by, dry_run=False):
+        timings = {}
+        with self._lock:
+            started = time.perf_counter()
+            locked = {entry for status in LOCKING_STATUSES
+                      for _, entry in self._applications_by_status.get(status, ())}
+            # Same eligibility as allocation._load()
+            rows = (
+                (entry, code, self._rankings[code][entry])
+                for entry in sorted(self._preferences) if entry not in locked
+                for code in self._preferences[entry]
+                if entry in self._rankings.get(code, ())
+                and self._applications[(code, entry)]['status'] == 'Applied'
+            )
+            proposals = Proposals.from_rows(rows)
+            free_seats = {}
+            for code in proposals.profiles:
+                profile = self._profiles[code]
+                free_seats[code] = (None if profile['openings'] is None
+                                    else profile['openings'] - profile['seats_filled'])
+            timings['load'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            assignment = deferred_acceptance(proposals, proposals.capacities(free_seats))
+            pairs = assigned_pairs(proposals, assignment)
+            timings['match'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            if not dry_run:
+                for key in pairs:
+                    self._set_status(key, self._applications[key], 'Selected')
+                    self._record(key[0], key[1], 'Applied', 'Selected', changed_by)
+            timings['write'] = time.perf_counter() - started
+
+        return summarize(proposals, pairs, len(pairs), dry_run, timings)
+
+    def stats(self):
+        with self._lock:
+            users = {}
+            for user in self._users.values():
+                users[user['role']] = users.get(user['role'], 0) + 1
+            return {
+                'season': self._season,
+                'users': users,
+                'profiles': len(self._profiles),
+                'applications': {status: len(keys)
+                                 for status, keys in self._applications_by_status.items() if keys}
+            }
+
+    # --- Change feed ---
+
+    def _scoped_seqs(self, entry_number=None, recruiter_email=None):
+        if entry_number is not None:
+            return self._history_by_student.get(entry_number, [])
+        if recruiter_email is not None:
+            return self._history_by_recruiter.get(recruiter_email, [])
+        return None
+
+    def latest_seq(self, entry_number=None, recruiter_email=None):
+        with self._lock:
+            seqs = self._scoped_seqs(entry_number, recruiter_email)
+            if seqs is None:
+                return len(self._history)
+            return seqs[-1] if seqs else 0
+
+    def fetch_changes(self, since, limit, entry_number=None, recruiter_email=None):
+        with self._lock:
+            seqs = self._scoped_seqs(entry_number, recruiter_email)
+            if seqs is None:
+                seqs = range(max(since, 0) + 1, min(len(self._history), since + limit) + 1)
+            else:
+                start = bisect.bisect_right(seqs, since)
+                seqs = seqs[start:start + limit]
+
+            changes = []
+            for seq in seqs:
+                change = self._history[seq - 1]
+                profile = self._profiles[change['profile_code']]
+                changes.append({
+                    'seq': change['seq'],
+                    'profile_code': change['profile_code'],
+                    'entry_number': change['entry_number'],
+                    'old_status': change['old_status'],
+                    'new_status': change['new_status'],
+                    'changed_at': change['changed_at'],
+                    'company_name': profile['company_name'],
+                    'designation': profile['designation'],
+                    'recruiter_email': profile['recruiter_email']
+                })
+            return changes
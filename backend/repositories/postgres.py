@@ -0,0 +1,414 @@
+"""
+Postgres repository
+The SQL behind the blueprints, executed through database.execute_query
+"""
+
+import psycopg2
+from database import execute_query, transaction
+from repositories.base import Repository, IntegrityError, OpeningsFilledError
+import allocation
+import bulk_import
+import eligibility
+import profile_search
+import status_history
+
+
+class PostgresRepository(Repository):
+    """Production storage: the Supabase/Postgres database in DATABASE_URL"""
+
+    # --- Users ---
+
+    def authenticate(self, userid, password_md5):
+        return execute_query(
+            "SELECT userid, role FROM users WHERE userid = %s AND password_hash = %s",
+            (userid, password_md5),
+            fetch_one=True
+        )
+
+    def get_user(self, userid, role=None):
+        if role is None:
+            return execute_query(
+                "SELECT userid, role FROM users WHERE userid = %s",
+                (userid,),
+                fetch_one=True
+            )
+        return execute_query(
+            "SELECT userid, role FROM users WHERE userid = %s AND role = %s",
+            (userid, role),
+            fetch_one=True
+        )
+
+    def list_users(self):
+        return execute_query(
+            "SELECT userid, role FROM users ORDER BY role, userid",
+            fetch_all=True
+        )
+
+    def users_page(self, limit, offset):
+        return execute_query(
+            """
+            SELECT
+                (SELECT coalesce(json_agg(json_build_object(
+                    'userid', userid, 'role', role) ORDER BY role, userid), '[]')
+                 FROM (SELECT userid, role FROM users
+                       ORDER BY role, userid
+                       LIMIT %s OFFSET %s) page) AS users,
+                (SELECT count(*) FROM users) AS total
+            """,
+            (limit, offset),
+            fetch_one=True
+        )
+
+    def import_users(self, text_stream):
+        return bulk_import.import_users(text_stream)
+
+    # --- Sessions ---
+
+    def revoke_session(self, session_id, expires_at):
+        # Inserting notifies every worker (trg_session_revoked_notify)
+        with transaction() as cursor:
+            cursor.execute("DELETE FROM revoked_session WHERE expires_at < now()")
+            cursor.execute(
+                """
+                INSERT INTO revoked_session (session_id, expires_at)
+                VALUES (%s, to_timestamp(%s))
+                ON CONFLICT (session_id) DO NOTHING
+                """,
+                (session_id, expires_at)
+            )
+
+    def revoked_sessions(self):
+        rows = execute_query(
+            """
+            SELECT session_id, extract(epoch FROM expires_at)::float8 AS expires_at
+            FROM revoked_session
+            WHERE expires_at > now()
+            """,
+            fetch_all=True,
+            use_primary=True
+        )
+        return {row['session_id']: row['expires_at'] for row in rows}
+
+    # --- Idempotency keys ---
+
+    @staticmethod
+    def _idempotency_claim(row):
+        if row is None:
+            return None
+        response = None
+        if row['status_code'] is not None:
+            response = (bytes(row['body']), row['status_code'], row['mimetype'])
+        return {'fingerprint': row['fingerprint'], 'response': response}
+
+    def claim_idempotency_key(self, userid, key, fingerprint, owner, ttl_seconds, lease_seconds):
+        with transaction() as cursor:
+            cursor.execute(
+                "DELETE FROM idempotency_key WHERE userid = %s AND expires_at <= now()",
+                (userid,)
+            )
+            # The conflicting row stays locked when it is not taken over,
+            # so the SELECT below reads its latest committed version
+            cursor.execute(
+                """
+                INSERT INTO idempotency_key (userid, key, fingerprint, owner, expires_at)
+                VALUES (%s, %s, %s, %s, now() + make_interval(secs => %s))
+                ON CONFLICT (userid, key) DO UPDATE
+                    SET fingerprint = EXCLUDED.fingerprint, owner = EXCLUDED.owner,
+                        claimed_at = now(), expires_at = EXCLUDED.expires_at,
+                        status_code = NULL, body = NULL, mimetype = NULL
+                    WHERE idempotency_key.expires_at <= now()
+                       OR (idempotency_key.status_code IS NULL
+                           AND idempotency_key.claimed_at <= now() - make_interval(secs => %s))
+                RETURNING owner
+                """,
+                (userid, key, fingerprint, owner, ttl_seconds, lease_seconds)
+            )
+            if cursor.fetchone() is not None:
+                return None
+            cursor.execute(
+                """
+                SELECT fingerprint, status_code, body, mimetype
+                FROM idempotency_key
+                WHERE userid = %s AND key = %s
+                """,
+                (userid, key)
+            )
+            return self._idempotency_claim(cursor.fetchone())
+
+    def get_idempotency_key(self, userid, key):
+        return self._idempotency_claim(execute_query(
+            """
+            SELECT fingerprint, status_code, body, mimetype
+            FROM idempotency_key
+            WHERE userid = %s AND key = %s AND expires_at > now()
+            """,
+            (userid, key),
+            fetch_one=True,
+            use_primary=True
+        ))
+
+    def complete_idempotency_key(self, userid, key, owner, response):
+        body, status_code, mimetype = response
+        execute_query(
+            """
+            UPDATE idempotency_key
+            SET status_code = %s, body = %s, mimetype = %s
+            WHERE userid = %s AND key = %s AND owner = %s
+            """,
+            (status_code, psycopg2.Binary(body), mimetype, userid, key, owner)
+        )
+
+    def release_idempotency_key(self, userid, key, owner):
+        execute_query(
+            "DELETE FROM idempotency_key WHERE userid = %s AND key = %s AND owner = %s",
+            (userid, key, owner)
+        )
+
+    # --- Profiles ---
+
+    def list_profiles(self, recruiter_email=None):
+        if recruiter_email is None:
+            return execute_query(profile_search.CATALOG_QUERY, fetch_all=True)
+        return execute_query(
+            f"""
+            SELECT {profile_search.PROFILE_COLUMNS},
+                   openings, seats_filled
+            FROM profile
+            WHERE season = active_season() AND recruiter_email = %s
+            ORDER BY profile_code
+            """,
+            (recruiter_email,),
+            fetch_all=True
+        )
+
+    def get_profile(self, profile_code, recruiter_email=None):
+        if recruiter_email is None:
+            return execute_query(
+                "SELECT * FROM profile WHERE profile_code = %s AND season = active_season()",
+                (profile_code,),
+                fetch_one=True
+            )
+        return execute_query(
+            """
+            SELECT * FROM profile
+            WHERE profile_code = %s AND season = active_season() AND recruiter_email = %s
+            """,
+            (profile_code, recruiter_email),
+            fetch_one=True
+        )
+
+    def create_profile(self, recruiter_email, company_name, designation, openings=None,
+                       criteria=None):
+        try:
+            new_profile = eligibility.create_profile(
+                recruiter_email, company_name, designation, openings, criteria or {}
+            )
+        except psycopg2.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+
+        # Make it searchable in this worker's typeahead right away
+        profile_search.catalog.add(new_profile)
+        return new_profile
+
+    def set_openings(self, profile_code, openings):
+        return execute_query(
+            """
+            UPDATE profile
+            SET openings = %s
+            WHERE profile_code = %s AND (%s::int IS NULL OR seats_filled <= %s)
+            RETURNING profile_code, openings, seats_filled
+            """,
+            (openings, profile_code, openings, openings),
+            fetch_one=True
+        )
+
+    def set_criteria(self, profile_code, criteria):
+        return eligibility.set_criteria(profile_code, criteria)
+
+    def search_profiles(self, query, limit):
+        return profile_search.search_profiles(query, limit)
+
+    def suggest_profiles(self, prefix, limit):
+        return profile_search.catalog.suggest(prefix, limit)
+
+    # --- Eligibility ---
+
+    def get_student_attributes(self, entry_number):
+        return eligibility.get_student_attributes(entry_number)
+
+    def set_student_attributes(self, students):
+        return eligibility.set_student_attributes(students)
+
+    def eligibility(self, entry_number):
+        return eligibility.eligibility(entry_number)
+
+    # --- Applications ---
+
+    def find_locking_offer(self, entry_number):
+        return execute_query(
+            """
+            SELECT status FROM application
+            WHERE season = active_season() AND entry_number = %s AND status IN ('Selected', 'Accepted')
+            """,
+            (entry_number,),
+            fetch_one=True
+        )
+
+    def get_application(self, profile_code, entry_number):
+        return execute_query(
+            """
+            SELECT a.*, p.company_name, p.designation, p.recruiter_email
+            FROM application a
+            JOIN profile p ON a.profile_code = p.profile_code
+            WHERE a.season = active_season() AND a.profile_code = %s AND a.entry_number = %s
+            """,
+            (profile_code, entry_number),
+            fetch_one=True
+        )
+
+    # The listings read application_view (schema.sql, "Application read
+    # model"): application rows that already carry their profile's columns
+
+    def list_student_applications(self, entry_number):
+        return execute_query(
+            """
+            SELECT profile_code, entry_number, status, company_name, designation, recruiter_email
+            FROM application_view
+            WHERE season = active_season() AND entry_number = %s
+            ORDER BY profile_code
+            """,
+            (entry_number,),
+            fetch_all=True
+        )
+
+    def list_all_applications(self):
+        return execute_query(
+            """
+            SELECT profile_code, entry_number, status, company_name, designation, recruiter_email
+            FROM application_view
+            WHERE season = active_season()
+            ORDER BY profile_code, entry_number
+            """,
+            fetch_all=True
+        )
+
+    def recruiter_applications(self, recruiter_email, profile_code=None, status=None,
+                               sort='profile_code', order='asc', limit=100, offset=0):
+        # sort/order must come from validators.APPLICATION_SORT_FIELDS / asc|desc
+        return execute_query(
+            f"""
+            WITH base AS (
+                SELECT profile_code, entry_number, status, company_name, designation,
+                       (%(profile_code)s::int IS NULL OR profile_code = %(profile_code)s) AS profile_ok,
+                       (%(status)s::text IS NULL OR status = %(status)s) AS status_ok
+                FROM application_view
+                WHERE season = active_season()
+                  AND (%(recruiter)s::text IS NULL OR recruiter_email = %(recruiter)s)
+            ), facets AS (
+                SELECT GROUPING(profile_code, status) AS grouping_id,
+                       profile_code, status,
+                       min(company_name) AS company_name,
+                       min(designation) AS designation,
+                       count(*) FILTER (WHERE status_ok) AS profile_count,
+                       count(*) FILTER (WHERE profile_ok) AS status_count,
+                       count(*) FILTER (WHERE profile_ok AND status_ok) AS total
+                FROM base
+                GROUP BY GROUPING SETS ((profile_code), (status), ())
+            ), page AS (
+                SELECT profile_code, entry_number, status, company_name, designation,
+                       row_number() OVER (ORDER BY {sort} {order}, profile_code, entry_number) AS rn
+                FROM base
+                WHERE profile_ok AND status_ok
+                ORDER BY rn
+                LIMIT %(limit)s OFFSET %(offset)s
+            )
+            SELECT
+                (SELECT coalesce(json_agg(json_build_object(
+                    'profile_code', profile_code, 'entry_number', entry_number, 'status', status,
+                    'company_name', company_name, 'designation', designation) ORDER BY rn), '[]')
+                 FROM page) AS applications,
+                (SELECT coalesce(json_agg(json_build_object(
+                    'profile_code', profile_code, 'company_name', company_name,
+                    'designation', designation, 'count', profile_count) ORDER BY profile_code), '[]')
+                 FROM facets WHERE grouping_id = 1) AS profile_facets,
+                (SELECT coalesce(json_agg(json_build_object(
+                    'status', status, 'count', status_count) ORDER BY status), '[]')
+                 FROM facets WHERE grouping_id = 2) AS status_facets,
+                (SELECT coalesce(max(total), 0) FROM facets WHERE grouping_id = 3) AS total
+            """,
+            {
+                'recruiter': recruiter_email,
+                'profile_code': profile_code,
+                'status': status,
+                'limit': limit,
+                'offset': offset
+            },
+            fetch_one=True
+        )
+
+    def create_application(self, profile_code, entry_number, changed_by, status='Applied'):
+        try:
+            return status_history.create_application(profile_code, entry_number, changed_by, status)
+        except psycopg2.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+
+    def change_status(self, profile_code, entry_number, new_status, changed_by,
+                      expected_status=None):
+        result = status_history.change_status(
+            profile_code, entry_number, new_status, changed_by, expected_status
+        )
+        if result['seq'] is None:
+            if result['openings_filled']:
+                raise OpeningsFilledError(f"no free opening on profile {profile_code}")
+            return None
+        return {'seq': result['seq'], 'old_status': result['old_status']}
+
+    def expire_offers(self, expiry_hours, batch_size):
+        return status_history.expire_offers(expiry_hours, batch_size)
+
+    def get_preferences(self, entry_number):
+        return allocation.get_preferences(entry_number)
+
+    def set_preferences(self, entry_number, profile_codes):
+        try:
+            allocation.set_preferences(entry_number, profile_codes)
+        except psycopg2.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+
+    def get_ranking(self, profile_code):
+        return allocation.get_ranking(profile_code)
+
+    def set_ranking(self, profile_code, entry_numbers):
+        try:
+            allocation.set_ranking(profile_code, entry_numbers)
+        except psycopg2.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+
+    def run_allocation(self, changed_by, dry_run=False):
+        try:
+            return allocation.run_allocation(changed_by, dry_run)
+        except psycopg2.errors.LockNotAvailable as e:
+            raise TimeoutError("status changes in progress, allocation not started") from e
+
+    def stats(self):
+        return execute_query(
+            """
+            SELECT
+                active_season() AS season,
+                (SELECT coalesce(json_object_agg(role, n), '{}')
+                 FROM (SELECT role, count(*) AS n FROM users GROUP BY role) r) AS users,
+                (SELECT count(*) FROM profile WHERE season = active_season()) AS profiles,
+                (SELECT coalesce(json_object_agg(status, n), '{}')
+                 FROM (SELECT status, count(*) AS n FROM application
+                       WHERE season = active_season() GROUP BY status) s) AS applications
+            """,
+            fetch_one=True
+        )
+
+    # --- Change feed ---
+
+    def latest_seq(self, entry_number=None, recruiter_email=None):
+        return status_history.latest_seq(entry_number, recruiter_email)
+
+    def fetch_changes(self, since, limit, entry_number=None, recruiter_email=None):
+        return status_history.fetch_changes(since, limit, entry_number, recruiter_email)
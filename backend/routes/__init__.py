@@ -7,5 +7,7 @@ from .auth import auth_bp
 from .student import student_bp
 from .recruiter import recruiter_bp
 from .admin import admin_bp
+from .events import events_bp
+from .batch import batch_bp
 
-__all__ = ['auth_bp', 'student_bp', 'recruiter_bp', 'admin_bp']
\ No newline at end of file
+__all__ = ['auth_bp', 'student_bp', 'recruiter_bp', 'admin_bp', 'events_bp', 'batch_bp']
\ No newline at end of file
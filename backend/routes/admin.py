@@ -3,12 +3,22 @@ Admin Routes
 Handles admin-specific operations
 """
 
-from flask import Blueprint, jsonify
-from database import execute_query
+import io
+from flask import Blueprint, request, jsonify
 from middleware.auth_middleware import token_required, role_required
+from utils import metrics
+from utils.validators import (
+    validate_changes_input, validate_pagination_input, validate_application_filter_input,
+    validate_student_attributes_input
+)
+from repositories import repo
+from shared_cache import cache
+from utils.eligibility import normalize_code
+from utils.log import get_logger
 
 # Create blueprint
 admin_bp = Blueprint('admin', __name__)
+log = get_logger(__name__)
 
 
 @admin_bp.route('/users', methods=['GET'])
@@ -16,9 +26,13 @@ admin_bp = Blueprint('admin', __name__)
 @role_required(['admin'])
 def get_all_users(current_user):
     """
-    Get all users (excluding password hashes)
+    Get one page of users (excluding password hashes), ordered by role, userid
     Admin only
 
+    Query params:
+        page: 1-based page number (default 1)
+        per_page: page size (default 100, max 500)
+
     Response:
     {
         "success": true,
@@ -28,22 +42,32 @@ def get_all_users(current_user):
                 "role": "admin"
             },
             ...
-        ]
+        ],
+        "total": 1922,
+        "page": 1,
+        "per_page": 100
     }
     """
     try:
-        users = execute_query(
-            "SELECT userid, role FROM users ORDER BY role, userid",
-            fetch_all=True
-        )
+        is_valid, error_message = validate_pagination_input(request.args)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 100))
+
+        result = repo.users_page(per_page, (page - 1) * per_page)
 
         return jsonify({
             'success': True,
-            'users': users
+            'users': result['users'],
+            'total': result['total'],
+            'page': page,
+            'per_page': per_page
         }), 200
 
-    except Exception as e:
-        print(f"Get all users error: {e}")
+    except Exception:
+        log.exception("Get all users error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -65,18 +89,15 @@ def get_all_profiles_admin(current_user):
     }
     """
     try:
-        profiles = execute_query(
-            "SELECT * FROM profile ORDER BY profile_code",
-            fetch_all=True
-        )
+        profiles = cache.get_or_load('catalog', repo.list_profiles)
 
         return jsonify({
             'success': True,
             'profiles': profiles
         }), 200
 
-    except Exception as e:
-        print(f"Get all profiles error: {e}")
+    except Exception:
+        log.exception("Get all profiles error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -88,35 +109,324 @@ def get_all_profiles_admin(current_user):
 @role_required(['admin'])
 def get_all_applications(current_user):
     """
-    Get all applications
+    Get applications across all recruiters, filtered, sorted and paginated
     Admin only
 
+    Query params (all optional): profile_code, status, sort, order, page,
+    per_page - as for GET /api/recruiter/applications
+
     Response:
     {
         "success": true,
-        "applications": [...]
+        "applications": [...],
+        "total": 48213,
+        "page": 1,
+        "per_page": 100,
+        "facets": {"profiles": [...], "statuses": [...]},
+        "last_seq": 1234
     }
     """
     try:
-        applications = execute_query(
-            """
-            SELECT a.profile_code, a.entry_number, a.status,
-                   p.company_name, p.designation, p.recruiter_email
-            FROM application a
-            JOIN profile p ON a.profile_code = p.profile_code
-            ORDER BY a.profile_code, a.entry_number
-            """,
-            fetch_all=True
+        is_valid, error_message = validate_application_filter_input(request.args)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        profile_code = request.args.get('profile_code')
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 100))
+
+        # Read the feed position first so no change can fall between the two
+        last_seq = repo.latest_seq()
+
+        # sort/order are whitelisted by the validator above
+        result = repo.recruiter_applications(
+            None,
+            profile_code=int(profile_code) if profile_code else None,
+            status=request.args.get('status') or None,
+            sort=request.args.get('sort', 'profile_code'),
+            order=request.args.get('order', 'asc'),
+            limit=per_page,
+            offset=(page - 1) * per_page
         )
 
         return jsonify({
             'success': True,
-            'applications': applications
+            'applications': result['applications'],
+            'total': result['total'],
+            'page': page,
+            'per_page': per_page,
+            'facets': {
+                'profiles': result['profile_facets'],
+                'statuses': result['status_facets']
+            },
+            'last_seq': last_seq
         }), 200
 
-    except Exception as e:
-        print(f"Get all applications error: {e}")
+    except Exception:
+        log.exception("Get all applications error")
         return jsonify({
             'success': False,
             'error': 'Server error'
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@admin_bp.route('/applications/changes', methods=['GET'])
+@token_required
+@role_required(['admin'])
+def get_all_application_changes(current_user):
+    """
+    Get status changes across all applications since a sequence number
+    Admin only
+
+    Query params:
+        since: last_seq from a previous list or changes response (default 0)
+        limit: maximum number of changes (default 500, max 1000)
+
+    Response:
+    {
+        "success": true,
+        "changes": [...],
+        "last_seq": 1250,
+        "has_more": false
+    }
+    """
+    try:
+        is_valid, error_message = validate_changes_input(request.args)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        return jsonify(repo.changes_response(
+            int(request.args.get('since', 0)),
+            int(request.args.get('limit', 500))
+        )), 200
+
+    except Exception:
+        log.exception("Get application changes error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@admin_bp.route('/users/import', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def import_users_csv(current_user):
+    """
+    Bulk import students/recruiters from a CSV roster
+    Admin only
+
+    The upload is streamed into Postgres with COPY, either as a multipart
+    form field named "file" or as a raw text/csv request body.
+
+    CSV:
+        userid,password_md5,role
+        2021CS10001,5f4dcc3b5aa765d61d8327deb882cf99,student
+
+    Response:
+    {
+        "success": true,
+        "rows": 20000,
+        "inserted": 19950,
+        "updated": 40,
+        "rejected": 10,
+        "rejects": [{"line": 17, "reason": "Invalid password hash format"}, ...]
+    }
+    """
+    try:
+        upload = request.files.get('file')
+        raw = upload.stream if upload else request.stream
+        text_stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+
+        try:
+            result = repo.import_users(text_stream)
+            cache.invalidate('stats')
+        except UnicodeDecodeError:
+            return jsonify({'success': False, 'error': 'CSV must be UTF-8 encoded'}), 400
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify({'success': True, **result}), 200
+
+    except Exception:
+        log.exception("Import users error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@admin_bp.route('/students/attributes', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def set_student_attributes(current_user):
+    """
+    Upload students' branch, degree and CGPA (upsert)
+    Admin only
+
+    Each student's eligibility bitmap is recomputed against the current
+    criteria of every restricted profile in the same transaction.
+
+    Request body:
+    {
+        "students": [
+            {"entry_number": "2021CS10001", "branch": "CS", "degree": "BTech", "cgpa": 8.42},
+            ...
+        ]
+    }
+
+    Response:
+    {
+        "success": true,
+        "written": 1,
+        "unknown": []  (entry numbers that are not student accounts)
+    }
+    """
+    try:
+        data = request.get_json()
+
+        is_valid, error_message = validate_student_attributes_input(data)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        students = [
+            {
+                'entry_number': student['entry_number'],
+                'branch': normalize_code(student['branch']),
+                'degree': normalize_code(student['degree']),
+                # As stored (NUMERIC(4,2)), so the bitmap matches the column
+                'cgpa': round(float(student['cgpa']), 2)
+            }
+            for student in data['students']
+        ]
+        written = set(repo.set_student_attributes(students))
+
+        return jsonify({
+            'success': True,
+            'written': len(written),
+            'unknown': [s['entry_number'] for s in students if s['entry_number'] not in written]
+        }), 200
+
+    except Exception:
+        log.exception("Set student attributes error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@admin_bp.route('/allocation/run', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def run_allocation(current_user):
+    """
+    Run batch allocation: offer every eligible student a stable assignment
+    Admin only
+
+    Takes part: applications still 'Applied', listed in the student's
+    preferences and in the profile's ranking, of students without a
+    'Selected'/'Accepted' offer. All offers are written in one transaction;
+    status changes wait for it to finish.
+
+    Request body (optional):
+    {
+        "dry_run": true  (compute and report, write nothing)
+    }
+
+    Response:
+    {
+        "success": true,
+        "dry_run": false,
+        "students": 9874,
+        "profiles": 1996,
+        "pairs": 197480,
+        "placed": 7310,
+        "unplaced": 2564,
+        "offers": [{"profile_code": 1001, "entry_number": "2021CS10001"}, ...],
+        "timings_ms": {"load": 812.4, "match": 301.7, "write": 644.0}
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        dry_run = data.get('dry_run', False)
+        if not isinstance(dry_run, bool):
+            return jsonify({'success': False, 'error': 'dry_run must be true or false'}), 400
+
+        try:
+            result = repo.run_allocation(changed_by=current_user['userid'], dry_run=dry_run)
+        except TimeoutError:
+            return jsonify({
+                'success': False,
+                'error': 'Status changes are in progress; try again in a moment'
+            }), 503
+
+        if not dry_run and result['placed']:
+            cache.invalidate('stats', *(f"lock:{offer['entry_number']}" for offer in result['offers']))
+
+        return jsonify({'success': True, **result}), 200
+
+    except Exception:
+        log.exception("Run allocation error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@admin_bp.route('/stats', methods=['GET'])
+@token_required
+@role_required(['admin'])
+def get_stats(current_user):
+    """
+    Get dashboard counts, served from the shared cache
+    Admin only
+
+    Response:
+    {
+        "success": true,
+        "stats": {
+            "season": 2025,
+            "users": {"student": 1800, "recruiter": 120, "admin": 2},
+            "profiles": 340,  (profiles and applications of the active season)
+            "applications": {"Applied": 15230, "Selected": 410, ...}
+        }
+    }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'stats': cache.get_or_load('stats', repo.stats)
+        }), 200
+
+    except Exception:
+        log.exception("Get stats error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+@token_required
+@role_required(['admin'])
+def get_metrics(current_user):
+    """
+    Get in-process metrics of the worker serving this request
+    Admin only
+
+    Query params:
+        prefix: optional metric name prefix, e.g. "compression."
+
+    Response:
+    {
+        "success": true,
+        "metrics": {
+            "counters": {"compression.gzip.bytes_saved": 182734, ...},
+            "timers": {...}
+        }
+    }
+    """
+    return jsonify({
+        'success': True,
+        'metrics': metrics.snapshot(request.args.get('prefix'))
+    }), 200
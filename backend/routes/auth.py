@@ -1,17 +1,18 @@
 """
 Authentication Routes
-Handles user login and authentication
+Handles user login, token renewal and logout
 """
 
 from flask import Blueprint, request, jsonify
-import jwt
-from datetime import datetime, timedelta
-from database import execute_query
-from config import config
+from repositories import repo
+from middleware.auth_middleware import token_required
+import sessions
 from utils.validators import validate_login_input
+from utils.log import get_logger
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__)
+log = get_logger(__name__)
 
 
 @auth_bp.route('/login', methods=['POST'])
@@ -46,11 +47,7 @@ def login():
         password_md5 = data.get('password_md5')
 
         # Query database for user
-        user = execute_query(
-            "SELECT userid, role FROM users WHERE userid = %s AND password_hash = %s",
-            (userid, password_md5),
-            fetch_one=True
-        )
+        user = repo.authenticate(userid, password_md5)
 
         # Check if user exists and password matches
         if not user:
@@ -59,19 +56,8 @@ def login():
                 'error': 'Invalid credentials'
             }), 401
 
-        # Create JWT token
-        token_payload = {
-            'userid': user['userid'],
-            'role': user['role'],
-            'iat': datetime.utcnow(),
-            'exp': datetime.utcnow() + timedelta(hours=config.JWT_EXPIRATION_HOURS)
-        }
-
-        token = jwt.encode(
-            token_payload,
-            config.JWT_SECRET,
-            algorithm=config.JWT_ALGORITHM
-        )
+        # Create JWT token (starts a new session)
+        token = sessions.issue_token(user['userid'], user['role'])
 
         # Return success response
         return jsonify({
@@ -81,8 +67,8 @@ def login():
             'userid': user['userid']
         }), 200
 
-    except Exception as e:
-        print(f"Login error: {e}")
+    except Exception:
+        log.exception("Login error")
         return jsonify({
             'success': False,
             'error': 'Server error during login'
@@ -107,17 +93,11 @@ def get_current_user():
         }
     }
     """
-    from middleware.auth_middleware import token_required
-
     @token_required
     def _get_current_user(current_user):
         try:
             # Fetch user details (excluding password hash)
-            user = execute_query(
-                "SELECT userid, role FROM users WHERE userid = %s",
-                (current_user['userid'],),
-                fetch_one=True
-            )
+            user = repo.get_user(current_user['userid'])
 
             if not user:
                 return jsonify({
@@ -130,11 +110,75 @@ def get_current_user():
                 'user': user
             }), 200
 
-        except Exception as e:
-            print(f"Get current user error: {e}")
+        except Exception:
+            log.exception("Get current user error")
             return jsonify({
                 'success': False,
                 'error': 'Server error'
             }), 500
 
-    return _get_current_user()
\ No newline at end of file
+    return _get_current_user()
+
+
+@auth_bp.route('/token/refresh', methods=['POST'])
+@token_required
+def refresh_token(current_user):
+    """
+    Renew the current token now, without logging in again
+    Any request renews a token close to expiry (X-Refreshed-Token header);
+    this is for pages that sit idle on the event stream
+
+    Headers:
+        Authorization: Bearer <token>
+
+    Response:
+    {
+        "success": true,
+        "token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
+    }
+    """
+    try:
+        token = sessions.renew(current_user, force=True)
+        if token is None:
+            return jsonify({
+                'success': False,
+                'error': 'Session has reached its maximum length, please log in again'
+            }), 401
+
+        response = jsonify({'success': True, 'token': token})
+        response.headers[sessions.REFRESHED_TOKEN_HEADER] = token
+        return response, 200
+
+    except Exception:
+        log.exception("Refresh token error")
+        return jsonify({'success': False, 'error': 'Server error'}), 500
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@token_required
+def logout(current_user):
+    """
+    End the current session
+    Its token, and every token renewed from it, is rejected from now on.
+    A token from before sessions existed is revoked on its own; one that
+    names no session at all cannot be revoked (400).
+
+    Headers:
+        Authorization: Bearer <token>
+
+    Response:
+    {
+        "success": true
+    }
+    """
+    try:
+        if not sessions.revoke(current_user):
+            return jsonify({
+                'success': False,
+                'error': 'This token cannot be logged out; log in again to get one that can'
+            }), 400
+        return jsonify({'success': True}), 200
+
+    except Exception:
+        log.exception("Logout error")
+        return jsonify({'success': False, 'error': 'Server error'}), 500
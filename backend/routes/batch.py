@@ -0,0 +1,196 @@
+"""
+Batch Routes
+Runs several API calls in one round trip, for pages that need many of them
+on load: the token is verified once, independent reads run concurrently,
+and all responses come back in one payload
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, current_app, request, jsonify
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from config import config
+import database
+from middleware.auth_middleware import token_required, VERIFIED_USER_ENVIRON
+from middleware.read_routing import STICKY_COOKIE
+from middleware.request_id import REQUEST_ID_HEADER
+from utils import metrics
+from utils.log import get_logger, request_id
+from utils.validators import validate_batch_input, BATCH_METHODS
+
+log = get_logger(__name__)
+
+# Create blueprint
+batch_bp = Blueprint('batch', __name__)
+
+# Blueprints never dispatched inside a batch: nesting, and streams that do not end
+EXCLUDED_BLUEPRINTS = ('batch', 'events')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Per-process pool for concurrent GETs, created on first use (after fork)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.BATCH_WORKERS,
+                                           thread_name_prefix='batch')
+        return _executor
+
+
+def _environ(sub, current_user):
+    """WSGI environ of one sub-request, carrying the batch's user and request id"""
+    headers = {'Authorization': request.headers.get('Authorization', '')}
+    headers.update(sub.get('headers') or {})
+    if request_id.get():
+        headers[REQUEST_ID_HEADER] = request_id.get()
+
+    until = database.sticky_until()
+    if until:
+        headers['Cookie'] = f"{STICKY_COOKIE}={until:.3f}"
+
+    builder = EnvironBuilder(
+        path=sub['path'],
+        method=sub.get('method', 'GET'),
+        json=sub.get('body'),
+        headers=headers,
+        environ_base={'REMOTE_ADDR': request.remote_addr}
+    )
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+    environ[VERIFIED_USER_ENVIRON] = current_user
+    return environ
+
+
+def _excluded(app, sub):
+    """
+    Whether a sub-request's path routes to an excluded blueprint
+
+    Matched the way the app will route it, after percent-decoding, so
+    /api/%62atch is caught as well as /api/batch, and under every batch
+    method, so a method the route does not allow is refused the same way
+    """
+    builder = EnvironBuilder(path=sub['path'])
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+    adapter = app.url_map.bind_to_environ(environ)
+    for method in BATCH_METHODS:
+        try:
+            endpoint, _ = adapter.match(method=method)
+        except HTTPException:
+            # 404, 405 or a redirect: answered without reaching a view
+            continue
+        if endpoint.partition('.')[0] in EXCLUDED_BLUEPRINTS:
+            return True
+    return False
+
+
+def _dispatch(app, environ):
+    """Run one sub-request through the app; returns (result, its primary-until deadline)"""
+    try:
+        with app.request_context(environ):
+            response = app.full_dispatch_request()
+            until = database.sticky_until()
+    except Exception:
+        log.exception("Batch sub-request error")
+        return {'status': 500, 'body': {'success': False, 'error': 'Server error'}}, 0.0
+
+    try:
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+        return {'status': response.status_code, 'body': body}, until
+    finally:
+        response.close()
+
+
+def _run(app, environ):
+    # Each sub-request gets its own copy of the context variables (request
+    # id, read routing), so concurrent ones cannot overwrite each other's
+    return contextvars.copy_context().run(_dispatch, app, environ)
+
+
+@batch_bp.route('/batch', methods=['POST'])
+@token_required
+def batch(current_user):
+    """
+    Run several API calls in one request
+
+    Consecutive GETs run concurrently; a POST waits for everything before
+    it and runs alone, so writes happen in the order given and later
+    sub-requests see them. Responses are returned in request order.
+
+    Request:
+        {
+            "requests": [
+                {"method": "GET", "path": "/api/admin/stats"},
+                {"method": "GET", "path": "/api/admin/users?limit=50"},
+                {"method": "POST", "path": "/api/student/apply",
+                 "body": {"profile_code": 1001},
+                 "headers": {"Idempotency-Key": "..."}}
+            ]
+        }
+
+    Response:
+        {
+            "success": true,
+            "responses": [
+                {"status": 200, "body": {"success": true, ...}},
+                ...
+            ]
+        }
+    """
+    try:
+        data = request.get_json(silent=True)
+
+        is_valid, error_msg = validate_batch_input(data)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_msg}), 400
+
+        app = current_app._get_current_object()
+        subs = data['requests']
+        for position, sub in enumerate(subs):
+            if _excluded(app, sub):
+                return jsonify({
+                    'success': False,
+                    'error': f"requests[{position}].path cannot be used in a batch"
+                }), 400
+
+        results = [None] * len(subs)
+
+        position = 0
+        while position < len(subs):
+            # A run of consecutive GETs, or a single POST
+            end = position + 1
+            if subs[position].get('method', 'GET') == 'GET':
+                while end < len(subs) and subs[end].get('method', 'GET') == 'GET':
+                    end += 1
+
+            environs = [_environ(sub, current_user) for sub in subs[position:end]]
+            if len(environs) == 1:
+                outcomes = [_run(app, environs[0])]
+            else:
+                outcomes = list(_get_executor().map(lambda environ: _run(app, environ), environs))
+
+            for offset, (result, until) in enumerate(outcomes):
+                results[position + offset] = result
+                # A write keeps the following sub-requests, and this browser, on the primary
+                database.extend_sticky(until)
+            position = end
+
+        metrics.incr('batch.requests')
+        metrics.incr('batch.subrequests', len(subs))
+
+        return jsonify({'success': True, 'responses': results}), 200
+
+    except Exception:
+        log.exception("Batch error")
+        return jsonify({'success': False, 'error': 'Server error'}), 500
@@ -0,0 +1,140 @@
+"""
+Event Stream Routes
+Pushes application status changes to browsers over Server-Sent Events
+"""
+
+import queue
+import time
+import jwt
+from flask import Blueprint, Response, request, jsonify
+from config import config
+from middleware.auth_middleware import decode_token
+import realtime
+from repositories import repo
+
+# Create blueprint
+events_bp = Blueprint('events', __name__)
+
+# Changes replayed per query when a client reconnects with Last-Event-ID
+REPLAY_BATCH = 500
+
+
+def _replay_scope(current_user):
+    if current_user['role'] == 'student':
+        return {'entry_number': current_user['userid']}
+    if current_user['role'] == 'recruiter':
+        return {'recruiter_email': current_user['userid']}
+    return {}
+
+
+@events_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """
+    Stream status changes relevant to the current user
+
+    EventSource cannot set headers, so the token may also be passed as
+    a query parameter. Browsers reconnect automatically and send the
+    Last-Event-ID header; missed changes are replayed from the history.
+    Event ids are a watermark rather than the event's own seq, so a change
+    sent again after a reconnect is possible; apply changes by seq.
+
+    Query params:
+        token: JWT (alternative to the Authorization header)
+        last_event_id: resume point for the first connection (optional)
+
+    Stream:
+        retry: 5000
+        id: 41
+        event: status
+        data: {"seq": 42, "profile_code": 1001, "entry_number": "student1",
+               "old_status": "Applied", "new_status": "Selected", ...}
+
+        id: 42
+        event: checkpoint
+        data: 42
+
+        : heartbeat
+    """
+    token = request.args.get('token')
+    auth_header = request.headers.get('Authorization')
+    if auth_header and ' ' in auth_header:
+        token = auth_header.split(' ')[1]
+
+    if not token:
+        return jsonify({'error': 'Token is missing'}), 401
+
+    try:
+        current_user = decode_token(token)
+    except jwt.ExpiredSignatureError:
+        return jsonify({'error': 'Token has expired', 'expired': True}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({'error': 'Invalid token'}), 401
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    keys = realtime.subscription_keys(current_user)
+    scope = _replay_scope(current_user)
+
+    def generate():
+        # Subscribe before reading the watermark so nothing falls between the two
+        subscription = realtime.hub.subscribe(keys)
+        try:
+            yield "retry: 5000\n\n"
+
+            # The watermark is the highest seq below which every change has
+            # been sent: live events arrive in commit order, which is not seq
+            # order, so it only moves on once the change feed (xmin-safe, as
+            # the /changes endpoints) confirms nothing below it can appear.
+            # It is the SSE id of every event, so a reconnect replays from it.
+            watermark = last_event_id if last_event_id is not None else repo.latest_seq(**scope)
+            announced = watermark
+            sent = set()  # seqs above the watermark already sent live
+
+            def catch_up():
+                nonlocal watermark, announced, sent
+                while True:
+                    changes = repo.fetch_changes(watermark, REPLAY_BATCH, **scope)
+                    for change in changes:
+                        watermark = change['seq']
+                        if change['seq'] not in sent:
+                            announced = watermark
+                            yield realtime.format_event(change, watermark)
+                    if len(changes) < REPLAY_BATCH:
+                        break
+                sent = {seq for seq in sent if seq > watermark}
+                if announced != watermark:
+                    announced = watermark
+                    yield realtime.format_checkpoint(watermark)
+
+            if last_event_id is not None:
+                yield from catch_up()
+
+            deadline = time.monotonic() + config.SSE_MAX_STREAM_SECONDS
+            next_catch_up = time.monotonic() + config.SSE_HEARTBEAT_SECONDS
+            while time.monotonic() < deadline and not subscription.overflowed:
+                try:
+                    event = subscription.events.get(timeout=config.SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    event = None
+                    yield ": heartbeat\n\n"
+
+                if event is not None and event['seq'] > watermark and event['seq'] not in sent:
+                    sent.add(event['seq'])
+                    yield realtime.format_event(event, watermark)
+
+                # Confirm what was sent live (idle streams have nothing to confirm)
+                if sent and time.monotonic() >= next_catch_up:
+                    yield from catch_up()
+                    next_catch_up = time.monotonic() + config.SSE_HEARTBEAT_SECONDS
+
+        finally:
+            realtime.hub.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -4,17 +4,27 @@ Handles recruiter-specific operations
 """
 
 from flask import Blueprint, request, jsonify
-from database import execute_query
 from middleware.auth_middleware import token_required, role_required
-from utils.validators import validate_profile_input, validate_status_change_input
+from middleware.idempotency import idempotent
+from utils.validators import (
+    validate_profile_input, validate_status_change_input, validate_changes_input,
+    validate_application_filter_input, validate_set_openings_input, validate_ranking_input,
+    validate_set_criteria_input
+)
+from repositories import repo, IntegrityError, OpeningsFilledError
+from shared_cache import cache
+from utils.eligibility import criteria_from
+from utils.log import get_logger
 
 # Create blueprint
 recruiter_bp = Blueprint('recruiter', __name__)
+log = get_logger(__name__)
 
 
 @recruiter_bp.route('/create_profile', methods=['POST'])
 @token_required
 @role_required(['recruiter', 'admin'])
+@idempotent
 def create_profile(current_user):
     """
     Create a new job profile
@@ -25,6 +35,10 @@ def create_profile(current_user):
     {
         "company_name": "TechCorp",
         "designation": "Backend Intern",
+        "openings": 5,  (optional, default unlimited)
+        "eligible_branches": ["CS", "EE"],  (optional, default any)
+        "eligible_degrees": ["BTech"],  (optional, default any)
+        "min_cgpa": 7.5,  (optional, default none)
         "recruiter_email": "recruiter1@techcorp.com"  (optional, admin only)
     }
 
@@ -57,11 +71,7 @@ def create_profile(current_user):
                 }), 400
 
             # Verify recruiter exists
-            recruiter = execute_query(
-                "SELECT userid FROM users WHERE userid = %s AND role = %s",
-                (recruiter_email, 'recruiter'),
-                fetch_one=True
-            )
+            recruiter = repo.get_user(recruiter_email, role='recruiter')
             if not recruiter:
                 return jsonify({
                     'success': False,
@@ -71,18 +81,11 @@ def create_profile(current_user):
             # Recruiter creates for themselves
             recruiter_email = current_user['userid']
 
-        # Insert profile
-        execute_query(
-            "INSERT INTO profile (recruiter_email, company_name, designation) VALUES (%s, %s, %s)",
-            (recruiter_email, company_name, designation)
-        )
-
-        # Get the created profile code
-        new_profile = execute_query(
-            "SELECT profile_code FROM profile WHERE recruiter_email = %s AND company_name = %s AND designation = %s ORDER BY profile_code DESC LIMIT 1",
-            (recruiter_email, company_name, designation),
-            fetch_one=True
-        )
+        # Insert profile (also makes it searchable in the typeahead)
+        new_profile = repo.create_profile(recruiter_email, company_name, designation,
+                                          openings=data.get('openings'),
+                                          criteria=criteria_from(data))
+        cache.invalidate('catalog', 'stats')
 
         return jsonify({
             'success': True,
@@ -90,8 +93,8 @@ def create_profile(current_user):
             'profile_code': new_profile['profile_code']
         }), 201
 
-    except Exception as e:
-        print(f"Create profile error: {e}")
+    except Exception:
+        log.exception("Create profile error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -108,23 +111,260 @@ def get_my_profiles(current_user):
     Response:
     {
         "success": true,
-        "profiles": [...]
+        "profiles": [
+            {
+                "profile_code": 1001,
+                "company_name": "TechCorp",
+                "designation": "Backend Intern",
+                "openings": 5,
+                "seats_filled": 3,
+                "eligible_branches": ["CS", "EE"],
+                "eligible_degrees": null,
+                "min_cgpa": 7.5
+            },
+            ...
+        ]
     }
     """
     try:
-        profiles = execute_query(
-            "SELECT * FROM profile WHERE recruiter_email = %s ORDER BY profile_code",
-            (current_user['userid'],),
-            fetch_all=True
-        )
+        profiles = repo.list_profiles(recruiter_email=current_user['userid'])
 
         return jsonify({
             'success': True,
             'profiles': profiles
         }), 200
 
-    except Exception as e:
-        print(f"Get my profiles error: {e}")
+    except Exception:
+        log.exception("Get my profiles error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@recruiter_bp.route('/profile/openings', methods=['POST'])
+@token_required
+@role_required(['recruiter', 'admin'])
+def set_profile_openings(current_user):
+    """
+    Set how many applicants a profile may hold as Selected/Accepted at once
+    Recruiters can only change their own profiles
+
+    Request body:
+    {
+        "profile_code": 1001,
+        "openings": 5  (null = unlimited)
+    }
+
+    Response:
+    {
+        "success": true,
+        "profile_code": 1001,
+        "openings": 5,
+        "seats_filled": 3
+    }
+    """
+    try:
+        data = request.get_json()
+
+        is_valid, error_message = validate_set_openings_input(data)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        profile_code = int(data.get('profile_code'))
+        openings = data.get('openings')
+
+        profile = repo.get_profile(
+            profile_code,
+            recruiter_email=current_user['userid'] if current_user['role'] == 'recruiter' else None
+        )
+        if not profile:
+            return jsonify({
+                'success': False,
+                'error': 'Profile not found or you do not have permission'
+            }), 403
+
+        updated = repo.set_openings(profile_code, openings)
+        if not updated:
+            return jsonify({
+                'success': False,
+                'error': 'More seats than that are already filled; release some offers first'
+            }), 409
+
+        return jsonify({'success': True, **updated}), 200
+
+    except Exception:
+        log.exception("Set openings error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@recruiter_bp.route('/profile/criteria', methods=['POST'])
+@token_required
+@role_required(['recruiter', 'admin'])
+def set_profile_criteria(current_user):
+    """
+    Replace the eligibility criteria of a profile
+    Students who no longer qualify stop seeing it and cannot apply;
+    existing applications are kept
+
+    Request body:
+    {
+        "profile_code": 1001,
+        "eligible_branches": ["CS", "EE"],  (null = any)
+        "eligible_degrees": null,  (null = any)
+        "min_cgpa": 7.5  (null = none)
+    }
+
+    Response:
+    {
+        "success": true,
+        "profile_code": 1001,
+        "eligible_branches": ["CS", "EE"],
+        "eligible_degrees": null,
+        "min_cgpa": 7.5
+    }
+    """
+    try:
+        data = request.get_json()
+
+        is_valid, error_message = validate_set_criteria_input(data)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        profile_code = int(data.get('profile_code'))
+
+        profile = repo.get_profile(
+            profile_code,
+            recruiter_email=current_user['userid'] if current_user['role'] == 'recruiter' else None
+        )
+        if not profile:
+            return jsonify({
+                'success': False,
+                'error': 'Profile not found or you do not have permission'
+            }), 403
+
+        updated = repo.set_criteria(profile_code, criteria_from(data))
+        cache.invalidate('catalog')
+
+        return jsonify({'success': True, **updated}), 200
+
+    except Exception:
+        log.exception("Set criteria error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@recruiter_bp.route('/profile/ranking', methods=['GET'])
+@token_required
+@role_required(['recruiter', 'admin'])
+def get_profile_ranking(current_user):
+    """
+    Get a profile's ranking of its applicants for batch allocation
+    Recruiters can only read their own profiles
+
+    Query params:
+        profile_code: the profile
+
+    Response:
+    {
+        "success": true,
+        "profile_code": 1001,
+        "entry_numbers": ["2021CS10001", "2021EE10234"]
+    }
+    """
+    try:
+        try:
+            profile_code = int(request.args.get('profile_code'))
+        except (ValueError, TypeError):
+            return jsonify({'success': False, 'error': 'profile_code must be a number'}), 400
+
+        profile = repo.get_profile(
+            profile_code,
+            recruiter_email=current_user['userid'] if current_user['role'] == 'recruiter' else None
+        )
+        if not profile:
+            return jsonify({
+                'success': False,
+                'error': 'Profile not found or you do not have permission'
+            }), 403
+
+        return jsonify({
+            'success': True,
+            'profile_code': profile_code,
+            'entry_numbers': repo.get_ranking(profile_code)
+        }), 200
+
+    except Exception:
+        log.exception("Get ranking error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@recruiter_bp.route('/profile/ranking', methods=['POST'])
+@token_required
+@role_required(['recruiter', 'admin'])
+def set_profile_ranking(current_user):
+    """
+    Replace a profile's ranking of its applicants for batch allocation
+    Only applicants of the profile can be listed; unranked ones are never
+    offered this profile by an allocation run
+
+    Request body:
+    {
+        "profile_code": 1001,
+        "entry_numbers": ["2021CS10001", "2021EE10234"]  (best first)
+    }
+
+    Response:
+    {
+        "success": true,
+        "profile_code": 1001,
+        "ranked": 2
+    }
+    """
+    try:
+        data = request.get_json()
+
+        is_valid, error_message = validate_ranking_input(data)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        profile_code = int(data.get('profile_code'))
+        entry_numbers = data.get('entry_numbers')
+
+        profile = repo.get_profile(
+            profile_code,
+            recruiter_email=current_user['userid'] if current_user['role'] == 'recruiter' else None
+        )
+        if not profile:
+            return jsonify({
+                'success': False,
+                'error': 'Profile not found or you do not have permission'
+            }), 403
+
+        try:
+            repo.set_ranking(profile_code, entry_numbers)
+        except IntegrityError:
+            return jsonify({
+                'success': False,
+                'error': 'Only applicants of this profile can be ranked'
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'profile_code': profile_code,
+            'ranked': len(entry_numbers)
+        }), 200
+
+    except Exception:
+        log.exception("Set ranking error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -136,7 +376,17 @@ def get_my_profiles(current_user):
 @role_required(['recruiter'])
 def get_recruiter_applications(current_user):
     """
-    Get all applications to recruiter's profiles
+    Get applications to recruiter's profiles, filtered, sorted and paginated
+    Facet counts are computed in the same query: per-profile counts honour
+    the status filter, per-status counts honour the profile filter
+
+    Query params (all optional):
+        profile_code: only this profile
+        status: only this status
+        sort: profile_code | entry_number | status (default profile_code)
+        order: asc | desc (default asc)
+        page: 1-based page number (default 1)
+        per_page: page size (default 100, max 500)
 
     Response:
     {
@@ -150,30 +400,58 @@ def get_recruiter_applications(current_user):
                 "designation": "Backend Intern"
             },
             ...
-        ]
+        ],
+        "total": 1834,
+        "page": 1,
+        "per_page": 100,
+        "facets": {
+            "profiles": [{"profile_code": 1001, "company_name": "TechCorp",
+                          "designation": "Backend Intern", "count": 912}, ...],
+            "statuses": [{"status": "Applied", "count": 1700}, ...]
+        },
+        "last_seq": 42
     }
     """
     try:
-        applications = execute_query(
-            """
-            SELECT a.profile_code, a.entry_number, a.status,
-                   p.company_name, p.designation
-            FROM application a
-            JOIN profile p ON a.profile_code = p.profile_code
-            WHERE p.recruiter_email = %s
-            ORDER BY a.profile_code, a.entry_number
-            """,
-            (current_user['userid'],),
-            fetch_all=True
+        is_valid, error_message = validate_application_filter_input(request.args)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        profile_code = request.args.get('profile_code')
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 100))
+        sort = request.args.get('sort', 'profile_code')
+        order = request.args.get('order', 'asc')
+
+        # Read the feed position first so no change can fall between the two
+        last_seq = repo.latest_seq(recruiter_email=current_user['userid'])
+
+        # sort/order are whitelisted by the validator above
+        result = repo.recruiter_applications(
+            current_user['userid'],
+            profile_code=int(profile_code) if profile_code else None,
+            status=request.args.get('status') or None,
+            sort=sort,
+            order=order,
+            limit=per_page,
+            offset=(page - 1) * per_page
         )
 
         return jsonify({
             'success': True,
-            'applications': applications
+            'applications': result['applications'],
+            'total': result['total'],
+            'page': page,
+            'per_page': per_page,
+            'facets': {
+                'profiles': result['profile_facets'],
+                'statuses': result['status_facets']
+            },
+            'last_seq': last_seq
         }), 200
 
-    except Exception as e:
-        print(f"Get recruiter applications error: {e}")
+    except Exception:
+        log.exception("Get recruiter applications error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -183,6 +461,7 @@ def get_recruiter_applications(current_user):
 @recruiter_bp.route('/application/change_status', methods=['POST'])
 @token_required
 @role_required(['recruiter', 'admin'])
+@idempotent
 def change_application_status(current_user):
     """
     Change application status
@@ -216,11 +495,7 @@ def change_application_status(current_user):
 
         # If recruiter, verify they own this profile
         if current_user['role'] == 'recruiter':
-            profile = execute_query(
-                "SELECT * FROM profile WHERE profile_code = %s AND recruiter_email = %s",
-                (profile_code, current_user['userid']),
-                fetch_one=True
-            )
+            profile = repo.get_profile(profile_code, recruiter_email=current_user['userid'])
 
             if not profile:
                 return jsonify({
@@ -229,11 +504,7 @@ def change_application_status(current_user):
                 }), 403
 
         # Check if application exists
-        application = execute_query(
-            "SELECT * FROM application WHERE profile_code = %s AND entry_number = %s",
-            (profile_code, entry_number),
-            fetch_one=True
-        )
+        application = repo.get_application(profile_code, entry_number)
 
         if not application:
             return jsonify({
@@ -241,20 +512,67 @@ def change_application_status(current_user):
                 'error': 'Application not found'
             }), 404
 
-        # Update status
-        execute_query(
-            "UPDATE application SET status = %s WHERE profile_code = %s AND entry_number = %s",
-            (new_status, profile_code, entry_number)
-        )
+        # Update status (no-op if unchanged, otherwise recorded in history);
+        # selecting takes one of the profile's openings
+        try:
+            if repo.change_status(
+                profile_code, entry_number, new_status,
+                changed_by=current_user['userid']
+            ):
+                cache.invalidate(f"lock:{entry_number}", 'stats')
+        except OpeningsFilledError:
+            return jsonify({
+                'success': False,
+                'error': 'All openings for this profile are filled'
+            }), 409
 
         return jsonify({
             'success': True,
             'message': 'Application status updated successfully'
         }), 200
 
-    except Exception as e:
-        print(f"Change status error: {e}")
+    except Exception:
+        log.exception("Change status error")
         return jsonify({
             'success': False,
             'error': 'Server error'
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@recruiter_bp.route('/applications/changes', methods=['GET'])
+@token_required
+@role_required(['recruiter'])
+def get_recruiter_application_changes(current_user):
+    """
+    Get status changes on the recruiter's profiles since a sequence number
+    New applications appear as changes with old_status null
+
+    Query params:
+        since: last_seq from a previous list or changes response (default 0)
+        limit: maximum number of changes (default 500, max 1000)
+
+    Response:
+    {
+        "success": true,
+        "changes": [...],
+        "last_seq": 57,
+        "has_more": false
+    }
+    """
+    try:
+        is_valid, error_message = validate_changes_input(request.args)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        return jsonify(repo.changes_response(
+            int(request.args.get('since', 0)),
+            int(request.args.get('limit', 500)),
+            recruiter_email=current_user['userid']
+        )), 200
+
+    except Exception:
+        log.exception("Get recruiter application changes error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
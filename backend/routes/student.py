@@ -3,12 +3,62 @@ Student Routes
 Handles student-specific operations
 """
 from flask import Blueprint, request, jsonify
-from database import execute_query
 from middleware.auth_middleware import token_required, role_required
-from utils.validators import validate_apply_input
+from middleware.idempotency import idempotent
+from utils.validators import (
+    validate_apply_input, validate_changes_input, validate_search_input, validate_preferences_input
+)
+from repositories import repo, IntegrityError
+from shared_cache import cache
+from utils.eligibility import eligible_filter, is_eligible
+from utils.log import get_logger
 
 # Create blueprint
 student_bp = Blueprint('student', __name__)
+log = get_logger(__name__)
+
+LOCKED_RESPONSE = {
+    'success': False,
+    'error': 'Access denied: You have a pending or accepted offer.',
+    'code': 'LOCKED_BY_OFFER'
+}
+
+NOT_ELIGIBLE_RESPONSE = {
+    'success': False,
+    'error': 'You do not meet the eligibility criteria of this profile.',
+    'code': 'NOT_ELIGIBLE'
+}
+
+# Search results fetched before the eligibility filter trims them to limit
+SEARCH_FETCH_LIMIT = 50
+
+
+def find_locking_offer(userid, fresh=False):
+    """
+    Return the 'Selected'/'Accepted' application that locks a student, if any
+    A locked student may not browse or apply to other profiles
+
+    Browsing reads the lock state through the shared cache; decisions that
+    must never act on a stale answer (applying) pass fresh=True.
+    """
+    if fresh:
+        return repo.find_locking_offer(userid)
+    return cache.get_or_load(f"lock:{userid}", lambda: repo.find_locking_offer(userid))
+
+
+def only_eligible(current_user, profiles, limit=None, catalog=None):
+    """
+    Drop the restricted profiles a student does not qualify for
+
+    One bitmap read per call: the student's precomputed bits are matched
+    against the cached catalog's criteria. Other roles see every profile.
+    """
+    if current_user['role'] == 'student':
+        if catalog is None:
+            catalog = cache.get_or_load('catalog', repo.list_profiles)
+        allowed = eligible_filter(catalog, repo.eligibility(current_user['userid']))
+        profiles = [profile for profile in profiles if allowed(profile['profile_code'])]
+    return profiles[:limit]
 
 
 @student_bp.route('/profiles', methods=['GET'])
@@ -16,34 +66,66 @@ student_bp = Blueprint('student', __name__)
 def get_all_profiles(current_user):
     """
     Get all available job profiles
+    Students only see the restricted profiles whose criteria they meet
     CONSTRAINT: Returns 403 if student has a 'Selected' or 'Accepted' status
     """
     try:
         userid = current_user['userid']
 
         # 1. LOGIC FIX: Check if student is "locked" by a Selected/Accepted offer
-        lock_check = execute_query(
-            "SELECT status FROM application WHERE entry_number = %s AND status IN ('Selected', 'Accepted')",
-            (userid,),
-            fetch_one=True
-        )
-
-        if lock_check:
+        if find_locking_offer(userid):
             # If locked, deny access to the profiles list
-            return jsonify({
-                'success': False,
-                'error': 'Access denied: You have a pending or accepted offer.',
-                'code': 'LOCKED_BY_OFFER'
-            }), 403
-
-        # 2. If not locked, fetch profiles
-        profiles = execute_query(
-            """
-            SELECT profile_code, recruiter_email, company_name, designation 
-            FROM profile 
-            ORDER BY profile_code
-            """,
-            fetch_all=True
+            return jsonify(LOCKED_RESPONSE), 403
+
+        # 2. If not locked, fetch the profiles the student qualifies for
+        catalog = cache.get_or_load('catalog', repo.list_profiles)
+        profiles = only_eligible(current_user, catalog, catalog=catalog)
+
+        return jsonify({
+            'success': True,
+            'profiles': profiles
+        }), 200
+
+    except Exception:
+        log.exception("Get profiles error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@student_bp.route('/profiles/search', methods=['GET'])
+@token_required
+def search_profiles(current_user):
+    """
+    Ranked search over company name and designation
+    CONSTRAINT: Returns 403 if student has a 'Selected' or 'Accepted' status
+
+    Query params:
+        q: search text, every word is matched as a prefix ("soft eng")
+        limit: maximum results (default 20, max 50)
+
+    Response:
+    {
+        "success": true,
+        "profiles": [
+            {"profile_code": 1001, "company_name": "TechCorp",
+             "designation": "Software Engineer", "recruiter_email": "...", "rank": 0.91}
+        ]
+    }
+    """
+    try:
+        is_valid, error_message = validate_search_input(request.args, 'q')
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        if find_locking_offer(current_user['userid']):
+            return jsonify(LOCKED_RESPONSE), 403
+
+        profiles = only_eligible(
+            current_user,
+            repo.search_profiles(request.args['q'].strip(), SEARCH_FETCH_LIMIT),
+            limit=int(request.args.get('limit', 20))
         )
 
         return jsonify({
@@ -51,8 +133,54 @@ def get_all_profiles(current_user):
             'profiles': profiles
         }), 200
 
-    except Exception as e:
-        print(f"Get profiles error: {e}")
+    except Exception:
+        log.exception("Search profiles error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@student_bp.route('/profiles/autocomplete', methods=['GET'])
+@token_required
+def autocomplete_profiles(current_user):
+    """
+    Typeahead suggestions served from the in-process prefix index
+    CONSTRAINT: Returns 403 if student has a 'Selected' or 'Accepted' status
+
+    Query params:
+        prefix: what the user has typed so far
+        limit: maximum suggestions (default 10, max 50)
+
+    Response:
+    {
+        "success": true,
+        "suggestions": [
+            {"profile_code": 1001, "company_name": "TechCorp", "designation": "Software Engineer"}
+        ]
+    }
+    """
+    try:
+        is_valid, error_message = validate_search_input(request.args, 'prefix')
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        if find_locking_offer(current_user['userid']):
+            return jsonify(LOCKED_RESPONSE), 403
+
+        suggestions = only_eligible(
+            current_user,
+            repo.suggest_profiles(request.args['prefix'], SEARCH_FETCH_LIMIT),
+            limit=int(request.args.get('limit', 10))
+        )
+
+        return jsonify({
+            'success': True,
+            'suggestions': suggestions
+        }), 200
+
+    except Exception:
+        log.exception("Autocomplete error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -68,26 +196,60 @@ def get_my_applications(current_user):
     Used by Frontend to check if they have a 'Selected' offer to display
     """
     try:
-        applications = execute_query(
-            """
-            SELECT a.profile_code, a.entry_number, a.status,
-                   p.company_name, p.designation, p.recruiter_email
-            FROM application a
-            JOIN profile p ON a.profile_code = p.profile_code
-            WHERE a.entry_number = %s
-            ORDER BY a.profile_code
-            """,
-            (current_user['userid'],),
-            fetch_all=True
-        )
+        # Read the feed position first so no change can fall between the two
+        last_seq = repo.latest_seq(entry_number=current_user['userid'])
+
+        applications = repo.list_student_applications(current_user['userid'])
 
         return jsonify({
             'success': True,
-            'applications': applications
+            'applications': applications,
+            'last_seq': last_seq
         }), 200
 
-    except Exception as e:
-        print(f"Get applications error: {e}")
+    except Exception:
+        log.exception("Get applications error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@student_bp.route('/applications/changes', methods=['GET'])
+@token_required
+@role_required(['student'])
+def get_my_application_changes(current_user):
+    """
+    Get status changes of the current student's applications since a sequence number
+
+    Query params:
+        since: last_seq from a previous list or changes response (default 0)
+        limit: maximum number of changes (default 500, max 1000)
+
+    Response:
+    {
+        "success": true,
+        "changes": [
+            {"seq": 42, "profile_code": 1001, "entry_number": "student1",
+             "old_status": "Applied", "new_status": "Selected", ...}
+        ],
+        "last_seq": 42,
+        "has_more": false
+    }
+    """
+    try:
+        is_valid, error_message = validate_changes_input(request.args)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        return jsonify(repo.changes_response(
+            int(request.args.get('since', 0)),
+            int(request.args.get('limit', 500)),
+            entry_number=current_user['userid']
+        )), 200
+
+    except Exception:
+        log.exception("Get application changes error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -97,10 +259,12 @@ def get_my_applications(current_user):
 @student_bp.route('/apply', methods=['POST'])
 @token_required
 @role_required(['student'])
+@idempotent
 def apply_to_profile(current_user):
     """
     Apply to a job profile
     CONSTRAINT: Blocks application if status is 'Selected' or 'Accepted'
+    CONSTRAINT: Returns 403 (NOT_ELIGIBLE) if the profile's criteria exclude the student
     """
     try:
         data = request.get_json()
@@ -115,11 +279,7 @@ def apply_to_profile(current_user):
 
         # LOGIC FIX: Check if student has ANY 'Accepted' OR 'Selected' offer
         # The original code only checked 'Accepted'. We must add 'Selected'.
-        lock_check = execute_query(
-            "SELECT status FROM application WHERE entry_number = %s AND status IN ('Accepted', 'Selected')",
-            (userid,),
-            fetch_one=True
-        )
+        lock_check = find_locking_offer(userid, fresh=True)
 
         if lock_check:
             return jsonify({
@@ -128,11 +288,7 @@ def apply_to_profile(current_user):
             }), 400
 
         # Check if student already applied to this specific profile
-        existing_application = execute_query(
-            "SELECT * FROM application WHERE profile_code = %s AND entry_number = %s",
-            (profile_code, userid),
-            fetch_one=True
-        )
+        existing_application = repo.get_application(profile_code, userid)
 
         if existing_application:
             return jsonify({
@@ -141,11 +297,7 @@ def apply_to_profile(current_user):
             }), 400
 
         # Check if profile exists
-        profile = execute_query(
-            "SELECT * FROM profile WHERE profile_code = %s",
-            (profile_code,),
-            fetch_one=True
-        )
+        profile = repo.get_profile(profile_code)
 
         if not profile:
             return jsonify({
@@ -153,19 +305,20 @@ def apply_to_profile(current_user):
                 'error': 'Profile not found'
             }), 404
 
-        # Create application
-        execute_query(
-            "INSERT INTO application (profile_code, entry_number, status) VALUES (%s, %s, %s)",
-            (profile_code, userid, 'Applied')
-        )
+        if not is_eligible(profile, repo.eligibility(userid)):
+            return jsonify(NOT_ELIGIBLE_RESPONSE), 403
+
+        # Create application (and its history entry)
+        repo.create_application(profile_code, userid, changed_by=userid)
+        cache.invalidate('stats')
 
         return jsonify({
             'success': True,
             'message': 'Application submitted successfully'
         }), 201
 
-    except Exception as e:
-        print(f"Apply error: {e}")
+    except Exception:
+        log.exception("Apply error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -175,6 +328,7 @@ def apply_to_profile(current_user):
 @student_bp.route('/application/accept', methods=['POST'])
 @token_required
 @role_required(['student'])
+@idempotent
 def accept_offer(current_user):
     """
     Accept a selected offer
@@ -192,16 +346,7 @@ def accept_offer(current_user):
             }), 400
 
         # Check if application exists and is in 'Selected' status
-        application = execute_query(
-            """
-            SELECT a.*, p.company_name, p.designation 
-            FROM application a
-            JOIN profile p ON a.profile_code = p.profile_code
-            WHERE a.profile_code = %s AND a.entry_number = %s
-            """,
-            (profile_code, userid),
-            fetch_one=True
-        )
+        application = repo.get_application(profile_code, userid)
 
         if not application:
             return jsonify({
@@ -216,11 +361,18 @@ def accept_offer(current_user):
             }), 400
 
         # Update status to Accepted
-        execute_query(
-            "UPDATE application SET status = %s WHERE profile_code = %s AND entry_number = %s",
-            ('Accepted', profile_code, userid)
+        updated = repo.change_status(
+            profile_code, userid, 'Accepted',
+            changed_by=userid, expected_status='Selected'
         )
 
+        if not updated:
+            return jsonify({
+                'success': False,
+                'error': 'Can only accept applications with Selected status'
+            }), 400
+        cache.invalidate(f"lock:{userid}", 'stats')
+
         return jsonify({
             'success': True,
             'message': 'Offer accepted successfully',
@@ -228,8 +380,8 @@ def accept_offer(current_user):
             'designation': application['designation']
         }), 200
 
-    except Exception as e:
-        print(f"Accept offer error: {e}")
+    except Exception:
+        log.exception("Accept offer error")
         return jsonify({
             'success': False,
             'error': 'Server error'
@@ -239,6 +391,7 @@ def accept_offer(current_user):
 @student_bp.route('/application/reject', methods=['POST'])
 @token_required
 @role_required(['student'])
+@idempotent
 def reject_offer(current_user):
     """
     Reject a selected offer
@@ -256,11 +409,7 @@ def reject_offer(current_user):
             }), 400
 
         # Check if application exists and is in 'Selected' status
-        application = execute_query(
-            "SELECT * FROM application WHERE profile_code = %s AND entry_number = %s",
-            (profile_code, userid),
-            fetch_one=True
-        )
+        application = repo.get_application(profile_code, userid)
 
         if not application:
             return jsonify({
@@ -275,19 +424,128 @@ def reject_offer(current_user):
             }), 400
 
         # Update status to Not Selected
-        execute_query(
-            "UPDATE application SET status = %s WHERE profile_code = %s AND entry_number = %s",
-            ('Not Selected', profile_code, userid)
+        updated = repo.change_status(
+            profile_code, userid, 'Not Selected',
+            changed_by=userid, expected_status='Selected'
         )
 
+        if not updated:
+            return jsonify({
+                'success': False,
+                'error': 'Can only reject applications with Selected status'
+            }), 400
+        cache.invalidate(f"lock:{userid}", 'stats')
+
         return jsonify({
             'success': True,
             'message': 'Offer rejected'
         }), 200
 
-    except Exception as e:
-        print(f"Reject offer error: {e}")
+    except Exception:
+        log.exception("Reject offer error")
         return jsonify({
             'success': False,
             'error': 'Server error'
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@student_bp.route('/attributes', methods=['GET'])
+@token_required
+@role_required(['student'])
+def get_my_attributes(current_user):
+    """
+    Get the branch, degree and CGPA that eligibility is checked against
+
+    Response:
+    {
+        "success": true,
+        "attributes": {"entry_number": "2021CS10001", "branch": "CS",
+                       "degree": "BTECH", "cgpa": 8.42}  (null if not uploaded yet)
+    }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'attributes': repo.get_student_attributes(current_user['userid'])
+        }), 200
+
+    except Exception:
+        log.exception("Get attributes error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@student_bp.route('/preferences', methods=['GET'])
+@token_required
+@role_required(['student'])
+def get_preferences(current_user):
+    """
+    Get the current student's preference order for batch allocation
+
+    Response:
+    {
+        "success": true,
+        "profile_codes": [1004, 1001, 1007]
+    }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'profile_codes': repo.get_preferences(current_user['userid'])
+        }), 200
+
+    except Exception:
+        log.exception("Get preferences error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
+
+
+@student_bp.route('/preferences', methods=['POST'])
+@token_required
+@role_required(['student'])
+def set_preferences(current_user):
+    """
+    Replace the current student's preference order for batch allocation
+    Only profiles the student applied to can be listed; unlisted ones are
+    never offered by an allocation run
+
+    Request body:
+    {
+        "profile_codes": [1004, 1001, 1007]  (most wanted first)
+    }
+
+    Response:
+    {
+        "success": true,
+        "profile_codes": [1004, 1001, 1007]
+    }
+    """
+    try:
+        data = request.get_json()
+
+        is_valid, error_message = validate_preferences_input(data)
+        if not is_valid:
+            return jsonify({'success': False, 'error': error_message}), 400
+
+        profile_codes = data.get('profile_codes')
+
+        try:
+            repo.set_preferences(current_user['userid'], profile_codes)
+        except IntegrityError:
+            return jsonify({
+                'success': False,
+                'error': 'You can only list profiles you have applied to'
+            }), 400
+
+        return jsonify({'success': True, 'profile_codes': profile_codes}), 200
+
+    except Exception:
+        log.exception("Set preferences error")
+        return jsonify({
+            'success': False,
+            'error': 'Server error'
+        }), 500
@@ -0,0 +1,239 @@
+"""
+Placement seasons
+application is partitioned by season (schema.sql, "Placement seasons") and
+the blueprints only read and write the active one, so the hot tables and
+their indexes hold one season. This command rolls over to a new season
+and archives old ones: the season's partition, status history and
+allocation lists are exported to gzip-compressed CSV, then removed.
+
+Usage:
+    python seasons.py                        # seasons and partition sizes
+    python seasons.py start 2026             # create the 2026 partition, make it active
+    python seasons.py archive 2024           # export to SEASON_ARCHIVE_DIR, detach, drop
+    python seasons.py archive 2024 --out /backups/ocs --keep-table
+"""
+
+import argparse
+import gzip
+import json
+import os
+from datetime import date
+from psycopg2 import sql
+from config import config
+from database import execute_query, transaction
+from shared_cache import cache
+from utils.log import get_logger
+import eligibility
+
+
+log = get_logger(__name__)
+
+# Seasons are named by the year they start in; a season starts in July
+SEASON_START_MONTH = 7
+
+
+def default_season(today=None):
+    """The season running on a date: 2025 from July 2025 to June 2026"""
+    today = today or date.today()
+    return today.year if today.month >= SEASON_START_MONTH else today.year - 1
+
+
+def partition_name(season):
+    return f"application_{season}"
+
+
+def view_partition_name(season):
+    """The season's partition of application_view, the read model kept by triggers"""
+    return f"application_view_{season}"
+
+
+def list_seasons():
+    """Every season with its state and the on-disk size of its partition"""
+    return execute_query(
+        """
+        SELECT season, active, started_at, archived_at,
+               coalesce(pg_total_relation_size(to_regclass('application_' || season)), 0) AS bytes
+        FROM placement_season
+        ORDER BY season
+        """,
+        fetch_all=True
+    )
+
+
+def start_season(season):
+    """
+    Create the season's partitions (application, application_view) if needed
+    and make it the active season, recomputing the eligibility bitmaps
+
+    From the next statement on, new profiles and applications go to it
+    and the previous season's rows are out of every blueprint's sight.
+    Creating the partition briefly locks application; if running queries
+    do not finish within SEASON_LOCK_TIMEOUT_SECONDS nothing changes.
+
+    Raises:
+        ValueError: If the season has already been archived
+    """
+    with transaction() as cursor:
+        cursor.execute("SET LOCAL lock_timeout = %s", (f"{config.SEASON_LOCK_TIMEOUT_SECONDS}s",))
+        cursor.execute(
+            "SELECT archived_at FROM placement_season WHERE season = %s FOR UPDATE",
+            (season,)
+        )
+        row = cursor.fetchone()
+        if row and row['archived_at']:
+            raise ValueError(f"season {season} was archived on {row['archived_at']:%Y-%m-%d}")
+
+        for parent, name in (('application', partition_name(season)),
+                             ('application_view', view_partition_name(season))):
+            cursor.execute(
+                sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES IN ({})")
+                .format(sql.Identifier(name), sql.Identifier(parent), sql.Literal(season))
+            )
+        # One active season at a time (idx_placement_season_active)
+        cursor.execute("UPDATE placement_season SET active = false WHERE active AND season <> %s", (season,))
+        # Profile codes are a global serial: every profile created from now
+        # on gets a higher code than any existing one
+        cursor.execute(
+            """
+            INSERT INTO placement_season (season, active, first_profile_code)
+            VALUES (%s, true, (SELECT coalesce(max(profile_code), 0) + 1 FROM profile))
+            ON CONFLICT (season) DO UPDATE SET active = true
+            """,
+            (season,)
+        )
+        rebuilt = eligibility.rebuild_bitmaps(cursor)
+
+    cache.invalidate('catalog', 'stats')
+    log.info("Season started", extra={'season': season, 'bitmaps_rebuilt': rebuilt})
+
+
+def _export(cursor, copy_query, path):
+    """COPY a query into a gzip file; the file only appears once complete and synced"""
+    partial = path + '.partial'
+    with open(partial, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as compressed:
+            cursor.copy_expert(copy_query, compressed)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+    return cursor.rowcount
+
+
+def archive_season(season, out_dir=None, keep_table=False):
+    """
+    Export a past season, then detach and drop its partition
+
+    One transaction: the season's partition is write-locked while it is
+    exported (the blueprints never touch it), and its rows only leave the
+    database once every export file has been synced to disk. If the
+    detach cannot lock application within SEASON_LOCK_TIMEOUT_SECONDS
+    nothing is removed; the exports are simply written again next time.
+
+    Args:
+        season (int): A season that is not the active one
+        out_dir (str): Export directory (default SEASON_ARCHIVE_DIR)
+        keep_table (bool): Keep the detached partition as a plain table
+
+    Returns:
+        dict: {"season", "files": {table: path}, "rows": {table: n}}
+
+    Raises:
+        ValueError: If the season is unknown, active or already archived
+    """
+    out_dir = out_dir or config.SEASON_ARCHIVE_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    partition = sql.Identifier(partition_name(season))
+
+    exports = {
+        'application': sql.SQL("SELECT * FROM {} ORDER BY profile_code, entry_number").format(partition),
+        'application_status_history': sql.SQL(
+            """
+            SELECT h.* FROM application_status_history h
+            JOIN profile p ON p.profile_code = h.profile_code
+            WHERE p.season = {} ORDER BY h.seq
+            """
+        ).format(sql.Literal(season)),
+        'student_preference': sql.SQL(
+            "SELECT * FROM student_preference WHERE season = {} ORDER BY entry_number, preference"
+        ).format(sql.Literal(season)),
+        'recruiter_ranking': sql.SQL(
+            "SELECT * FROM recruiter_ranking WHERE season = {} ORDER BY profile_code, ranking"
+        ).format(sql.Literal(season)),
+    }
+
+    files, rows = {}, {}
+    with transaction() as cursor:
+        cursor.execute("SET LOCAL lock_timeout = %s", (f"{config.SEASON_LOCK_TIMEOUT_SECONDS}s",))
+        cursor.execute(
+            "SELECT active, archived_at FROM placement_season WHERE season = %s FOR UPDATE",
+            (season,)
+        )
+        state = cursor.fetchone()
+        if state is None:
+            raise ValueError(f"season {season} does not exist")
+        if state['active']:
+            raise ValueError(f"season {season} is the active season")
+        if state['archived_at']:
+            raise ValueError(f"season {season} is already archived")
+
+        cursor.execute(sql.SQL("LOCK TABLE {} IN SHARE MODE").format(partition))
+        for table, query in exports.items():
+            files[table] = os.path.join(out_dir, f"{table}_{season}.csv.gz")
+            rows[table] = _export(
+                cursor,
+                sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER)").format(query).as_string(cursor),
+                files[table]
+            )
+
+        # The allocation lists reference the partition's rows
+        cursor.execute("DELETE FROM student_preference WHERE season = %s", (season,))
+        cursor.execute("DELETE FROM recruiter_ranking WHERE season = %s", (season,))
+        cursor.execute(
+            """
+            DELETE FROM application_status_history h
+            USING profile p
+            WHERE p.profile_code = h.profile_code AND p.season = %s
+            """,
+            (season,)
+        )
+        cursor.execute(sql.SQL("ALTER TABLE application DETACH PARTITION {}").format(partition))
+        if not keep_table:
+            cursor.execute(sql.SQL("DROP TABLE {}").format(partition))
+        # Derived from the partition: nothing to export or keep
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(view_partition_name(season))))
+        cursor.execute("UPDATE placement_season SET archived_at = now() WHERE season = %s", (season,))
+
+    cache.invalidate('catalog', 'stats')
+    result = {'season': season, 'files': files, 'rows': rows}
+    log.info("Season archived", extra={'season': season, 'rows': rows})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Start and archive placement seasons')
+    commands = parser.add_subparsers(dest='command')
+    start = commands.add_parser('start', help='create a season and make it active')
+    start.add_argument('season', type=int)
+    archive = commands.add_parser('archive', help='export a past season, then detach and drop it')
+    archive.add_argument('season', type=int)
+    archive.add_argument('--out', help=f'export directory (default {config.SEASON_ARCHIVE_DIR})')
+    archive.add_argument('--keep-table', action='store_true',
+                         help='keep the detached partition as a plain table')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'start':
+            start_season(args.season)
+            print(f"✅ Season {args.season} is active")
+        elif args.command == 'archive':
+            print(json.dumps(archive_season(args.season, args.out, args.keep_table), indent=2))
+        else:
+            for row in list_seasons():
+                state = 'active' if row['active'] else 'archived' if row['archived_at'] else ''
+                print(f"{row['season']}  {state:<8}  {row['bytes'] / 2**20:8.1f} MB")
+    except ValueError as e:
+        parser.exit(1, f"❌ {e}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Login sessions
+Tokens are renewed while they are in use, so a user active all day logs
+in once: a token within JWT_RENEW_WITHIN_MINUTES of expiry is replaced
+through a response header on any authenticated request, from its own
+claims and without a database query. Renewals keep the login's session
+id and never run past JWT_SESSION_MAX_HOURS after the login.
+
+Logging out revokes the session, and with it every token renewed from it.
+Each worker checks tokens against an in-memory denylist of revoked
+session ids: loaded once, kept current by NOTIFY (schema.sql) and pruned
+as sessions end, so it only ever holds the sessions logged out within
+the last JWT_SESSION_MAX_HOURS.
+"""
+
+import os
+import threading
+import time
+import uuid
+import jwt
+from config import config
+from repositories import repo
+from utils import metrics
+from utils.log import get_logger
+import realtime
+
+
+log = get_logger(__name__)
+
+# Channel trg_session_revoked_notify NOTIFYs on (payload: "<session_id>,<expires_at>")
+SESSION_REVOKED_CHANNEL = 'session_revoked'
+
+# Response header carrying a renewed token
+REFRESHED_TOKEN_HEADER = 'X-Refreshed-Token'
+
+# Full reloads of the denylist cover notifications missed while the
+# listener was reconnecting
+DENYLIST_RELOAD_SECONDS = 300
+DENYLIST_RETRY_SECONDS = 5
+
+
+def issue_token(userid, role, session_id=None, auth_time=None):
+    """
+    Sign a token for a new login, or a renewal of an existing session
+
+    Args:
+        session_id (str): Session being renewed (default: a new session)
+        auth_time (int): When the session logged in (default: now)
+    """
+    now = int(time.time())
+    auth_time = auth_time or now
+    session_end = auth_time + config.JWT_SESSION_MAX_HOURS * 3600
+    payload = {
+        'userid': userid,
+        'role': role,
+        'sid': session_id or uuid.uuid4().hex,
+        'auth_time': auth_time,
+        'iat': now,
+        'exp': min(now + config.JWT_EXPIRATION_HOURS * 3600, session_end)
+    }
+    return jwt.encode(payload, config.JWT_SECRET, algorithm=config.JWT_ALGORITHM)
+
+
+def _auth_time(claims):
+    # Tokens issued before sessions existed only carry iat
+    return claims.get('auth_time', claims.get('iat'))
+
+
+def session_id(claims):
+    """
+    The session a token belongs to, or None
+
+    Tokens issued before sessions existed carry no sid; each one is then
+    its own session, named by its user and issue time.
+    """
+    if claims.get('sid'):
+        return claims['sid']
+    if claims.get('iat') is not None:
+        return f"token:{claims['userid']}:{claims['iat']}"
+    return None
+
+
+def session_end(claims):
+    """time.time() after which a session's tokens can no longer be renewed (None if unknown)"""
+    auth_time = _auth_time(claims)
+    return auth_time + config.JWT_SESSION_MAX_HOURS * 3600 if auth_time is not None else None
+
+
+def renew(claims, force=False):
+    """
+    A renewed token for verified claims, or None
+
+    Returns None while the token is not yet within JWT_RENEW_WITHIN_MINUTES
+    of expiry (unless force), and once its expiry is the session's end.
+    """
+    end = session_end(claims)
+    if end is None or claims['exp'] >= end:
+        return None
+    if not force and claims['exp'] - time.time() > config.JWT_RENEW_WITHIN_MINUTES * 60:
+        return None
+    metrics.incr('sessions.renewed')
+    return issue_token(claims['userid'], claims['role'],
+                       session_id=session_id(claims),
+                       auth_time=_auth_time(claims))
+
+
+class Denylist:
+    """
+    Revoked session ids -> when their entry can be dropped
+
+    Loaded from the repository on first use in each process (prefork
+    servers preload the app) and every DENYLIST_RELOAD_SECONDS after.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._entries = {}
+        self._pid = None
+        self._reload_at = 0.0
+        self._handler_added = False
+
+    def __contains__(self, session_id):
+        self._ensure_loaded()
+        expires_at = self._entries.get(session_id)
+        return expires_at is not None and expires_at > time.time()
+
+    def add(self, session_id, expires_at):
+        with self._lock:
+            self._entries[session_id] = max(expires_at, self._entries.get(session_id, 0.0))
+
+    def _fresh(self):
+        return self._pid == os.getpid() and time.monotonic() < self._reload_at
+
+    def _ensure_loaded(self):
+        if self._fresh():
+            return
+
+        # One thread reloads; the others keep checking against the current
+        # entries, unless this process has not loaded any yet
+        if not self._reload_lock.acquire(blocking=self._pid != os.getpid()):
+            return
+        try:
+            if not self._fresh():
+                self._load()
+        finally:
+            self._reload_lock.release()
+
+    def _load(self):
+        if config.STORAGE_BACKEND == 'postgres':
+            with self._lock:
+                if not self._handler_added:
+                    realtime.hub.add_handler(SESSION_REVOKED_CHANNEL, self._on_revoked)
+                    self._handler_added = True
+            realtime.hub.start()
+
+        try:
+            loaded = repo.revoked_sessions()
+        except Exception as e:
+            # Keep what we have; tokens stay checked against it meanwhile
+            log.warning("Session denylist load failed", exc_info=e)
+            metrics.incr('sessions.denylist_errors')
+            self._pid = os.getpid()
+            self._reload_at = time.monotonic() + DENYLIST_RETRY_SECONDS
+            return
+
+        now = time.time()
+        with self._lock:
+            entries = {sid: until for sid, until in self._entries.items() if until > now}
+            for sid, until in loaded.items():
+                entries[sid] = max(until, entries.get(sid, 0.0))
+            self._entries = entries
+            self._pid = os.getpid()
+            self._reload_at = time.monotonic() + DENYLIST_RELOAD_SECONDS
+
+    def _on_revoked(self, payloads):
+        for payload in payloads:
+            session_id, _, expires_at = payload.rpartition(',')
+            try:
+                self.add(session_id, float(expires_at))
+            except ValueError:
+                log.warning("Bad notification payload", extra={'payload': payload[:200]})
+
+
+# One denylist per worker process
+denylist = Denylist()
+
+
+def revoke(claims):
+    """
+    Log a session out everywhere; its tokens fail verification from now on
+
+    Returns:
+        bool: False if the token names no session that could be revoked
+    """
+    revoked_id = session_id(claims)
+    if revoked_id is None:
+        return False
+    expires_at = session_end(claims) or claims['exp']
+    repo.revoke_session(revoked_id, expires_at)
+    denylist.add(revoked_id, expires_at)
+    metrics.incr('sessions.revoked')
+    return True
@@ -0,0 +1,273 @@
+"""
+Shared cache tier
+Values cached once are reused by every worker and serverless instance.
+A short-lived in-process copy sits in front of the shared backend. The
+worker that changes the underlying rows deletes the shared entries; every
+worker drops its own copies when Postgres LISTEN/NOTIFY reports the change.
+
+Backends (CACHE_BACKEND):
+    none      caching disabled, every lookup runs its loader
+    local     in-process dict, a stand-in for tests and single-process runs
+    redis     any Redis-protocol server at CACHE_URL (requires the redis package)
+    postgres  UNLOGGED table shared_cache in the primary database
+
+Keys used by the routes:
+    catalog          all profiles
+    lock:<userid>    a student's Selected/Accepted offer, if any
+    stats            admin dashboard counts
+"""
+
+import json
+import os
+import threading
+import time
+from config import config
+from database import pooled_connection
+from utils import metrics
+from utils.log import get_logger
+import realtime
+
+try:
+    import redis
+except ImportError:  # only needed for CACHE_BACKEND=redis
+    redis = None
+
+
+log = get_logger(__name__)
+
+# Channel the schema triggers NOTIFY on (payload: comma-separated keys)
+INVALIDATION_CHANNEL = 'cache_invalidation'
+
+KEY_PREFIX = 'ocs:'
+
+
+class LocalCache:
+    """In-process backend with the same interface as the shared ones"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (expires_at, value)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class RedisCache:
+    """Redis-protocol backend (Redis, Valkey, KeyDB, ...)"""
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(KEY_PREFIX + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(KEY_PREFIX + key, value, ex=ttl)
+
+    def delete(self, keys):
+        if keys:
+            self._client.delete(*[KEY_PREFIX + key for key in keys])
+
+
+class PostgresCache:
+    """
+    Fallback backend: an UNLOGGED table on the primary (see schema.sql)
+
+    Unlogged tables skip the WAL, so they are cheap to write but are not
+    replicated; every query therefore runs on a primary connection. Keys
+    are bounded (one per student at most), so expired rows are simply
+    overwritten rather than purged.
+
+    Queries bypass execute_query on purpose: cache writes must not start
+    the read-your-writes window of the request that happened to miss.
+    """
+
+    @staticmethod
+    def _execute(query, params, fetch_one=False):
+        with pooled_connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    row = cursor.fetchone() if fetch_one else None
+                connection.commit()
+                return row
+            except Exception:
+                if not connection.closed:
+                    connection.rollback()
+                raise
+
+    def get(self, key):
+        row = self._execute(
+            "SELECT value FROM shared_cache WHERE key = %s AND expires_at > now()",
+            (KEY_PREFIX + key,),
+            fetch_one=True
+        )
+        return row['value'] if row else None
+
+    def set(self, key, value, ttl):
+        self._execute(
+            """
+            INSERT INTO shared_cache (key, value, expires_at)
+            VALUES (%s, %s, now() + make_interval(secs => %s))
+            ON CONFLICT (key) DO UPDATE
+                SET value = EXCLUDED.value, expires_at = EXCLUDED.expires_at
+            """,
+            (KEY_PREFIX + key, value, ttl)
+        )
+
+    def delete(self, keys):
+        if keys:
+            self._execute(
+                "DELETE FROM shared_cache WHERE key = ANY(%s)",
+                ([KEY_PREFIX + key for key in keys],)
+            )
+
+
+def create_backend(name=None):
+    name = (name or config.CACHE_BACKEND).lower()
+    if name == 'none':
+        return None
+    if name == 'local':
+        return LocalCache()
+    if name == 'redis':
+        return RedisCache(config.CACHE_URL)
+    if name == 'postgres':
+        return PostgresCache()
+    raise ValueError(f"Unknown CACHE_BACKEND '{name}', expected none, local, redis or postgres")
+
+
+class SharedCache:
+    """
+    Two-level cache: in-process copies (CACHE_LOCAL_TTL_SECONDS) over a backend
+
+    A load that raced with an invalidation of its key is returned but
+    not stored, so a stale value cannot be written back after the
+    invalidation went through.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._local = {}        # key -> (expires_at, value)
+        self._generations = {}  # key -> invalidation count
+        self._handlers_added = False
+        self._listener_pid = None
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Return the cached value of key, running loader() on a miss
+
+        Args:
+            key (str): Cache key, e.g. 'catalog' or 'lock:2021CS10001'
+            loader (callable): Produces a JSON-serializable value
+            ttl (int): Seconds the shared copy lives (default CACHE_TTL_SECONDS)
+        """
+        if self.backend is None:
+            return loader()
+        self._ensure_listening()
+
+        now = time.monotonic()
+        entry = self._local.get(key)
+        if entry is not None and entry[0] > now:
+            metrics.incr('cache.local_hits')
+            return entry[1]
+
+        generation = self._generations.get(key, 0)
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            log.warning("Shared cache read failed", exc_info=e)
+            metrics.incr('cache.errors')
+            return loader()
+
+        if cached is not None:
+            metrics.incr('cache.hits')
+            value = json.loads(cached)
+        else:
+            metrics.incr('cache.misses')
+            value = loader()
+            if self._generations.get(key, 0) == generation:
+                try:
+                    self.backend.set(key, json.dumps(value, default=str),
+                                     ttl or config.CACHE_TTL_SECONDS)
+                except Exception as e:
+                    log.warning("Shared cache write failed", exc_info=e)
+                    metrics.incr('cache.errors')
+
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._local[key] = (now + config.CACHE_LOCAL_TTL_SECONDS, value)
+        return value
+
+    def invalidate(self, *keys):
+        """Drop keys here and in the shared backend"""
+        if self.backend is None or not keys:
+            return
+        self._invalidate_local(keys)
+        try:
+            self.backend.delete(list(keys))
+        except Exception as e:
+            log.warning("Shared cache invalidation failed", exc_info=e)
+            metrics.incr('cache.errors')
+
+    def _invalidate_local(self, keys):
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+        metrics.incr('cache.invalidations', len(keys))
+
+    def _ensure_listening(self):
+        # NOTIFY needs the Postgres storage backend; the in-memory engine
+        # only has this process, which invalidate() already covers
+        if self._listener_pid == os.getpid() or config.STORAGE_BACKEND != 'postgres':
+            return
+        with self._lock:
+            if not self._handlers_added:
+                realtime.hub.add_handler(INVALIDATION_CHANNEL, self._on_invalidation)
+                realtime.hub.add_handler(realtime.CHANNEL, self._on_status_events)
+                self._handlers_added = True
+            self._listener_pid = os.getpid()
+        realtime.hub.start()
+
+    def _drop_notified(self, keys):
+        # The writer already deleted the shared entries (invalidate, or the
+        # trigger itself), so listeners drop only their own copies rather
+        # than each repeating the delete; a LocalCache backend is one of those
+        self._invalidate_local(keys)
+        if isinstance(self.backend, LocalCache):
+            self.backend.delete(list(keys))
+
+    def _on_invalidation(self, payloads):
+        keys = {key for payload in payloads for key in payload.split(',') if key}
+        if keys:
+            self._drop_notified(keys)
+
+    def _on_status_events(self, payloads):
+        keys = {'stats'}
+        for payload in payloads:
+            try:
+                keys.add(f"lock:{json.loads(payload)['entry_number']}")
+            except (ValueError, KeyError):
+                continue
+        self._drop_notified(keys)
+
+
+# One cache front per worker process
+cache = SharedCache(create_backend())
@@ -0,0 +1,226 @@
+"""
+Application status history
+Status transitions that append to application_status_history in the
+same statement, and the incremental change feed built on top of it
+"""
+
+from database import execute_query
+from shared_cache import cache
+
+
+# Only rows whose transaction is older than every running transaction
+# are returned, so a slow writer can never slip in behind a client's cursor
+_SAFE_TXID = "h.txid < txid_snapshot_xmin(txid_current_snapshot())"
+
+# changed_by value recorded for transitions made by the expiry sweeper
+OFFER_EXPIRY_ACTOR = 'system:offer-expiry'
+
+# Statuses that hold one of the profile's openings (repositories.base.LOCKING_STATUSES)
+_SEAT_STATUSES = "('Selected', 'Accepted')"
+
+
+def create_application(profile_code, entry_number, changed_by, status='Applied'):
+    """
+    Insert an application and its first history row atomically
+
+    The application goes into the partition of the profile's season.
+
+    Returns:
+        dict: {"seq": <history sequence number>}
+    """
+    return execute_query(
+        """
+        WITH ins AS (
+            INSERT INTO application (season, profile_code, entry_number, status)
+            VALUES ((SELECT season FROM profile WHERE profile_code = %s), %s, %s, %s)
+            RETURNING profile_code, entry_number, status
+        )
+        INSERT INTO application_status_history
+            (profile_code, entry_number, old_status, new_status, changed_by)
+        SELECT profile_code, entry_number, NULL, status, %s FROM ins
+        RETURNING seq
+        """,
+        (profile_code, profile_code, entry_number, status, changed_by),
+        fetch_one=True
+    )
+
+
+def change_status(profile_code, entry_number, new_status, changed_by, expected_status=None):
+    """
+    Update an application's status and record the transition atomically
+
+    Entering 'Selected'/'Accepted' takes a seat with one conditional
+    UPDATE of the profile's seats_filled counter (never a COUNT over
+    application); leaving them gives it back. Concurrent changes on the
+    same profile queue on that single row only for the length of this
+    one-statement transaction, and the WHERE clause is re-checked after
+    the wait, so openings can never be oversubscribed. Moves between the
+    two seat-holding statuses do not touch the profile row at all.
+
+    Args:
+        expected_status (str): If given, only update when the current
+            status still matches (guards check-then-update races)
+
+    Returns:
+        dict: {"seq", "old_status", "openings_filled"}; seq is None when no
+        row was updated (missing application, unchanged status, the
+        expected status no longer holds, or openings_filled: no free seat)
+    """
+    return execute_query(
+        f"""
+        WITH old AS (
+            SELECT profile_code, entry_number, status,
+                   (%(new_status)s IN {_SEAT_STATUSES})::int
+                   - (status IN {_SEAT_STATUSES})::int AS seat_delta
+            FROM application
+            WHERE season = active_season()
+              AND profile_code = %(profile_code)s AND entry_number = %(entry_number)s
+              AND status IS DISTINCT FROM %(new_status)s
+              AND (%(expected_status)s::text IS NULL OR status = %(expected_status)s)
+            FOR UPDATE
+        ), seat AS (
+            UPDATE profile p
+            SET seats_filled = GREATEST(p.seats_filled + old.seat_delta, 0)
+            FROM old
+            WHERE p.profile_code = old.profile_code
+              AND old.seat_delta <> 0
+              AND (old.seat_delta < 0 OR p.openings IS NULL OR p.seats_filled < p.openings)
+            RETURNING p.profile_code
+        ), upd AS (
+            UPDATE application a
+            SET status = %(new_status)s, status_changed_at = now()
+            FROM old
+            WHERE a.season = active_season()
+              AND a.profile_code = old.profile_code
+              AND a.entry_number = old.entry_number
+              AND (old.seat_delta = 0 OR EXISTS (SELECT 1 FROM seat))
+            RETURNING a.profile_code, a.entry_number, old.status AS old_status, a.status AS new_status
+        ), hist AS (
+            INSERT INTO application_status_history
+                (profile_code, entry_number, old_status, new_status, changed_by)
+            SELECT profile_code, entry_number, old_status, new_status, %(changed_by)s FROM upd
+            RETURNING seq, old_status
+        )
+        SELECT (SELECT seq FROM hist) AS seq,
+               (SELECT old_status FROM hist) AS old_status,
+               EXISTS (SELECT 1 FROM old WHERE seat_delta > 0)
+                   AND NOT EXISTS (SELECT 1 FROM seat) AS openings_filled
+        """,
+        {
+            'profile_code': profile_code,
+            'entry_number': entry_number,
+            'new_status': new_status,
+            'expected_status': expected_status,
+            'changed_by': changed_by
+        },
+        fetch_one=True
+    )
+
+
+def expire_offers(expiry_hours, batch_size):
+    """
+    Move offers that stayed 'Selected' too long to 'Not Selected'
+
+    One set-based statement driven by the active season's partial index
+    on status_changed_at, which also frees the offers' seats; rows locked by
+    a concurrent accept/reject are skipped and picked up on the next run.
+
+    Returns:
+        int: Number of offers expired
+    """
+    rows = execute_query(
+        """
+        WITH overdue AS (
+            SELECT profile_code, entry_number
+            FROM application
+            WHERE season = active_season()
+              AND status = 'Selected'
+              AND status_changed_at < now() - make_interval(hours => %s)
+            ORDER BY status_changed_at
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        ), upd AS (
+            UPDATE application a
+            SET status = 'Not Selected', status_changed_at = now()
+            FROM overdue o
+            WHERE a.season = active_season()
+              AND a.profile_code = o.profile_code AND a.entry_number = o.entry_number
+            RETURNING a.profile_code, a.entry_number
+        ), released AS (
+            UPDATE profile p
+            SET seats_filled = GREATEST(p.seats_filled - r.n, 0)
+            FROM (SELECT profile_code, count(*) AS n FROM upd GROUP BY profile_code) r
+            WHERE p.profile_code = r.profile_code
+        )
+        INSERT INTO application_status_history
+            (profile_code, entry_number, old_status, new_status, changed_by)
+        SELECT profile_code, entry_number, 'Selected', 'Not Selected', %s FROM upd
+        RETURNING entry_number
+        """,
+        (expiry_hours, batch_size, OFFER_EXPIRY_ACTOR),
+        fetch_all=True
+    )
+    if rows:
+        cache.invalidate('stats', *{f"lock:{row['entry_number']}" for row in rows})
+    return len(rows)
+
+
+def _scope_filter(entry_number=None, recruiter_email=None):
+    if entry_number is not None:
+        return "AND h.entry_number = %s", (entry_number,)
+    if recruiter_email is not None:
+        return "AND p.recruiter_email = %s", (recruiter_email,)
+    return "", ()
+
+
+def latest_seq(entry_number=None, recruiter_email=None):
+    """
+    Highest sequence number a client can safely start polling from
+
+    Read it BEFORE loading a full list; replaying a change that is
+    already in the list is harmless, missing one is not.
+    """
+    scope_sql, scope_params = _scope_filter(entry_number, recruiter_email)
+    row = execute_query(
+        f"""
+        SELECT h.seq
+        FROM application_status_history h
+        JOIN profile p ON h.profile_code = p.profile_code
+        WHERE {_SAFE_TXID} {scope_sql}
+        ORDER BY h.seq DESC
+        LIMIT 1
+        """,
+        scope_params,
+        fetch_one=True
+    )
+    return row['seq'] if row else 0
+
+
+def fetch_changes(since, limit, entry_number=None, recruiter_email=None):
+    """
+    Status changes after a sequence number, oldest first
+
+    Args:
+        since (int): Last sequence number the client has applied
+        limit (int): Maximum number of changes to return
+        entry_number (str): Restrict to one student's applications
+        recruiter_email (str): Restrict to one recruiter's profiles
+
+    Returns:
+        list: change rows joined with their profile fields
+    """
+    scope_sql, scope_params = _scope_filter(entry_number, recruiter_email)
+    return execute_query(
+        f"""
+        SELECT h.seq, h.profile_code, h.entry_number, h.old_status, h.new_status,
+               h.changed_at, p.company_name, p.designation, p.recruiter_email
+        FROM application_status_history h
+        JOIN profile p ON h.profile_code = p.profile_code
+        WHERE h.seq > %s AND {_SAFE_TXID} {scope_sql}
+        ORDER BY h.seq
+        LIMIT %s
+        """,
+        (since, *scope_params, limit),
+        fetch_all=True
+    )
+
@@ -0,0 +1,80 @@
+"""
+Offer expiry sweeper
+Expires 'Selected' offers older than OFFER_EXPIRY_HOURS in set-based batches
+
+Usage:
+    python sweeper.py            # run forever, one tick every SWEEPER_INTERVAL_SECONDS
+    python sweeper.py --once     # single tick, for cron
+"""
+
+import argparse
+import time
+from config import config
+from status_history import expire_offers
+from utils import metrics
+from utils.log import get_logger
+
+
+log = get_logger(__name__)
+
+
+def sweep(expiry_hours, batch_size):
+    """
+    Run one tick: expire overdue offers batch by batch until none are left
+
+    Returns:
+        int: Number of offers expired in this tick
+    """
+    started = time.monotonic()
+    total = 0
+
+    while True:
+        expired = expire_offers(expiry_hours, batch_size)
+        total += expired
+        if expired < batch_size:
+            break
+
+    duration = time.monotonic() - started
+    metrics.incr('sweeper.ticks')
+    metrics.incr('sweeper.offers_expired', total)
+    metrics.observe('sweeper.duration', duration)
+
+    log.info("Offer sweep", extra={
+        'expired': total,
+        'duration_ms': round(duration * 1000, 1)
+    })
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Expire overdue Selected offers')
+    parser.add_argument('--once', action='store_true', help='run a single tick and exit')
+    parser.add_argument('--interval', type=int, default=config.SWEEPER_INTERVAL_SECONDS,
+                        help='seconds between ticks')
+    parser.add_argument('--expiry-hours', type=int, default=config.OFFER_EXPIRY_HOURS,
+                        help='how long an offer may stay Selected')
+    parser.add_argument('--batch-size', type=int, default=config.SWEEPER_BATCH_SIZE,
+                        help='maximum rows updated per statement')
+    args = parser.parse_args()
+
+    log.info("Offer sweeper started",
+             extra={'expiry_hours': args.expiry_hours, 'batch_size': args.batch_size})
+
+    while True:
+        try:
+            sweep(args.expiry_hours, args.batch_size)
+        except Exception:
+            metrics.incr('sweeper.errors')
+            log.exception("Sweep failed")
+            if args.once:
+                raise
+
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+    log.info("Offer sweeper metrics", extra=metrics.snapshot('sweeper.'))
+
+
+if __name__ == '__main__':
+    main()
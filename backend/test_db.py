@@ -1,13 +1,144 @@
 """
-Test database connection and verify data
-Run this to ensure database is properly configured
-"""
+Database health check
+Verifies the connection, reports table sizes and index usage, and times
+the read queries behind every blueprint against real rows. It reads
+catalog statistics instead of whole tables, so it stays fast at production
+scale (benchmarks/dataset.py loads a placement-day dataset to try it on).
 
-from database import get_db_connection, execute_query
+Usage:
+    python test_db.py
+    python test_db.py --runs 10 --exact      # exact row counts (slower)
 
+Only reads run, so it is safe against a live database.
+"""
 
-def test_connection():
-    """Test database connection and display users"""
+import argparse
+import statistics
+import sys
+import time
+from database import get_db_connection, execute_query
+from repositories import create_repository
+
+
+TABLES = ('users', 'profile', 'application', 'application_view', 'application_status_history',
+          'student_attributes',
+          'student_preference', 'recruiter_ranking', 'placement_season', 'revoked_session')
+
+# Median above this is reported as slow
+SLOW_QUERY_MS = 100
+
+# A table this large that is mostly sequentially scanned is missing an index
+SEQ_SCAN_WARN_ROWS = 10000
+
+
+def _print_header(title):
+    print("\n" + "=" * 60)
+    print(title)
+    print("-" * 60)
+
+
+def row_counts(exact):
+    """{table: rows}; planner estimates (partitions summed) unless exact"""
+    counts = {}
+    for table in TABLES:
+        if exact:
+            counts[table] = execute_query(f"SELECT count(*) AS n FROM {table}", fetch_one=True)['n']
+            continue
+        row = execute_query(
+            """
+            SELECT sum(greatest(c.reltuples, 0))::bigint AS n
+            FROM pg_class c
+            WHERE c.relkind <> 'p'
+              AND (c.oid = to_regclass(%s)
+                   OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s)))
+            """,
+            (table, table),
+            fetch_one=True
+        )
+        counts[table] = row['n']
+    return counts
+
+
+def index_usage():
+    """Scan counts per table (partitions by their own name) and never-used indexes"""
+    tables = execute_query(
+        """
+        SELECT relname, n_live_tup, seq_scan, coalesce(idx_scan, 0) AS idx_scan
+        FROM pg_stat_user_tables
+        ORDER BY n_live_tup DESC
+        """,
+        fetch_all=True
+    )
+    unused = execute_query(
+        """
+        SELECT s.relname, s.indexrelname, pg_size_pretty(pg_relation_size(s.indexrelid)) AS size
+        FROM pg_stat_user_indexes s
+        JOIN pg_index i ON i.indexrelid = s.indexrelid
+        WHERE s.idx_scan = 0 AND NOT i.indisunique
+        ORDER BY pg_relation_size(s.indexrelid) DESC
+        """,
+        fetch_all=True
+    )
+    return tables, unused
+
+
+def sample_ids():
+    """The busiest rows of the active season: worst cases for the per-user queries"""
+    return execute_query(
+        """
+        SELECT
+            (SELECT entry_number FROM application WHERE season = active_season()
+             GROUP BY entry_number ORDER BY count(*) DESC, entry_number LIMIT 1) AS student,
+            (SELECT recruiter_email FROM profile WHERE season = active_season()
+             GROUP BY recruiter_email ORDER BY count(*) DESC, recruiter_email LIMIT 1) AS recruiter,
+            (SELECT profile_code FROM application WHERE season = active_season()
+             GROUP BY profile_code ORDER BY count(*) DESC, profile_code LIMIT 1) AS profile_code,
+            (SELECT company_name FROM profile WHERE season = active_season()
+             ORDER BY profile_code LIMIT 1) AS company_name,
+            (SELECT coalesce(max(seq), 0) FROM application_status_history) AS last_seq
+        """,
+        fetch_one=True
+    )
+
+
+def blueprint_queries(repo, ids):
+    """(blueprint, label, callable) for the reads each blueprint makes"""
+    student, recruiter = ids['student'], ids['recruiter']
+    word = (ids['company_name'] or 'a').split()[0].lower()
+    since = max(0, ids['last_seq'] - 100)
+    return [
+        ('auth', 'get_user', lambda: repo.get_user(student)),
+        ('student', 'list_profiles (catalog)', lambda: repo.list_profiles()),
+        ('student', 'find_locking_offer', lambda: repo.find_locking_offer(student)),
+        ('student', 'list_student_applications', lambda: repo.list_student_applications(student)),
+        ('student', 'eligibility', lambda: repo.eligibility(student)),
+        ('student', f"search_profiles {word!r}", lambda: repo.search_profiles(word, 20)),
+        ('student', f"suggest_profiles {word[:2]!r}", lambda: repo.suggest_profiles(word[:2], 10)),
+        ('student', 'changes (last 100)', lambda: repo.changes_response(since, 100, entry_number=student)),
+        ('recruiter', 'list_profiles (own)', lambda: repo.list_profiles(recruiter)),
+        ('recruiter', 'get_profile', lambda: repo.get_profile(ids['profile_code'])),
+        ('recruiter', 'recruiter_applications', lambda: repo.recruiter_applications(recruiter, limit=100)),
+        ('recruiter', 'get_ranking', lambda: repo.get_ranking(ids['profile_code'])),
+        ('admin', 'stats', lambda: repo.stats()),
+        ('admin', 'users_page', lambda: repo.users_page(100, 0)),
+        ('admin', 'all applications (page 1)', lambda: repo.recruiter_applications(None, limit=100)),
+        ('admin', 'changes (last 100)', lambda: repo.changes_response(since, 100)),
+    ]
+
+
+def time_query(fn, runs):
+    """Milliseconds per run: (median, max), after one warm-up run"""
+    fn()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def test_connection(runs=5, exact=False):
+    """Run the health check; returns True when nothing failed"""
 
     print("=" * 60)
     print("🔄 Testing Database Connection...")
@@ -16,52 +147,46 @@ def test_connection():
     try:
         # Test basic connection
         connection = get_db_connection()
-        print("✅ Database connected successfully!")
         connection.close()
-
-        # Fetch all users
-        print("\n📊 Fetching users from database...")
-        users = execute_query("SELECT * FROM users ORDER BY role, userid", fetch_all=True)
-
-        print(f"✅ Found {len(users)} users in database:")
-        print("-" * 60)
-
-        # Group by role for better display
-        roles = {}
-        for user in users:
-            role = user['role']
-            if role not in roles:
-                roles[role] = []
-            roles[role].append(user['userid'])
-
-        # Display by role
-        for role, userids in roles.items():
-            print(f"\n{role.upper()}S:")
-            for userid in userids:
-                print(f"   • {userid}")
-
-        # Test profiles
-        print("\n" + "=" * 60)
-        print("📋 Fetching job profiles...")
-        profiles = execute_query("SELECT * FROM profile ORDER BY profile_code", fetch_all=True)
-
-        print(f"✅ Found {len(profiles)} job profiles:")
-        print("-" * 60)
-        for profile in profiles:
-            print(f"   [{profile['profile_code']}] {profile['company_name']} - {profile['designation']}")
-
-        # Test applications
-        print("\n" + "=" * 60)
-        print("📝 Fetching applications...")
-        applications = execute_query("SELECT * FROM application ORDER BY profile_code", fetch_all=True)
-
-        print(f"✅ Found {len(applications)} applications:")
-        print("-" * 60)
-        for app in applications:
-            print(f"   Profile {app['profile_code']} ← {app['entry_number']} ({app['status']})")
+        server = execute_query("SELECT version() AS version, active_season() AS season", fetch_one=True)
+        print("✅ Database connected successfully!")
+        print(f"   {server['version'].split(',')[0]}, active season {server['season']}")
+
+        _print_header(f"📊 Row counts ({'exact' if exact else 'estimated'})")
+        for table, count in row_counts(exact).items():
+            print(f"   {table:<30} {count if count is not None else 'missing':>12}")
+
+        _print_header("⏱️  Blueprint queries (median / max ms)")
+        repo = create_repository('postgres')
+        ids = sample_ids()
+        if not ids['student'] or not ids['recruiter']:
+            print("⚠️  No applications in the active season: load data first (benchmarks/dataset.py)")
+        else:
+            print(f"   busiest student {ids['student']}, recruiter {ids['recruiter']}, "
+                  f"profile {ids['profile_code']}")
+            slow = 0
+            for blueprint, label, fn in blueprint_queries(repo, ids):
+                median, worst = time_query(fn, runs)
+                flag = '⚠️ ' if median > SLOW_QUERY_MS else '  '
+                slow += median > SLOW_QUERY_MS
+                print(f" {flag}{blueprint:<10} {label:<32} {median:>9.1f} {worst:>9.1f}")
+            if slow:
+                print(f"⚠️  {slow} queries slower than {SLOW_QUERY_MS} ms")
+
+        _print_header("🗂️  Index usage (since statistics were last reset)")
+        tables, unused = index_usage()
+        for row in tables:
+            flag = '⚠️ ' if (row['n_live_tup'] >= SEQ_SCAN_WARN_ROWS
+                             and row['seq_scan'] > row['idx_scan']) else '  '
+            print(f" {flag}{row['relname']:<30} {row['n_live_tup']:>10} rows "
+                  f"{row['seq_scan']:>8} seq {row['idx_scan']:>10} idx")
+        if unused:
+            print("\n   Never-used indexes:")
+            for row in unused:
+                print(f"   • {row['relname']}.{row['indexrelname']} ({row['size']})")
 
         print("\n" + "=" * 60)
-        print("✅ ALL TESTS PASSED! Database is ready to use.")
+        print("✅ ALL CHECKS PASSED! Database is ready to use.")
         print("=" * 60)
 
         return True
@@ -72,11 +197,15 @@ def test_connection():
         print("\n🔧 Troubleshooting:")
         print("1. Check if DATABASE_URL in .env is correct")
         print("2. Verify Supabase database is running")
-        print("3. Ensure tables are created (users, profile, application)")
-        print("4. Check if test data is inserted")
+        print("3. Ensure tables are created (users, profile, application) and schema.sql applied")
+        print("4. Load data: python benchmarks/dataset.py --scale 0.01")
         print("=" * 60)
         return False
 
 
 if __name__ == "__main__":
-    test_connection()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Database health check')
+    parser.add_argument('--runs', type=int, default=5, help='timed runs per query')
+    parser.add_argument('--exact', action='store_true', help='count rows instead of using estimates')
+    args = parser.parse_args()
+    sys.exit(0 if test_connection(runs=args.runs, exact=args.exact) else 1)
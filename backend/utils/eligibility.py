@@ -0,0 +1,152 @@
+"""
+Profile eligibility criteria and per-student eligibility bitmaps
+A profile may restrict applicants by branch, degree and minimum CGPA. Each
+student carries a bitmap over profile codes: bit n is set when the student
+meets the criteria of restricted profile n. Unrestricted profiles never
+have a bit, so profiles created without criteria need no bitmap updates.
+
+Bitmaps are plain Python ints (bit n = profile_code n). In Postgres they
+are stored as BIT VARYING whose leftmost bit is the active season's first
+profile code, so they only span one season's profiles; encode() and
+decode() convert between the two.
+"""
+
+import bisect
+
+
+CRITERIA_FIELDS = ('eligible_branches', 'eligible_degrees', 'min_cgpa')
+
+
+def normalize_code(value):
+    """Branch and degree codes compare case-insensitively: ' cs ' -> 'CS'"""
+    return value.strip().upper()
+
+
+def criteria_from(data):
+    """
+    Criteria from a validated request body: codes normalized and
+    deduplicated, cgpa rounded as stored (NUMERIC(4,2))
+    """
+    criteria = {}
+    for field in ('eligible_branches', 'eligible_degrees'):
+        values = data.get(field)
+        criteria[field] = sorted({normalize_code(v) for v in values}) if values is not None else None
+    min_cgpa = data.get('min_cgpa')
+    criteria['min_cgpa'] = round(float(min_cgpa), 2) if min_cgpa is not None else None
+    return criteria
+
+
+def is_restricted(profile):
+    """True when the profile row has any eligibility criterion"""
+    return any(profile.get(field) is not None for field in CRITERIA_FIELDS)
+
+
+def admits(profile, student):
+    """
+    Whether a student's attributes meet a profile's criteria
+
+    Args:
+        profile (dict): eligible_branches, eligible_degrees (lists or None), min_cgpa
+        student (dict): branch, degree, cgpa
+    """
+    branches = profile.get('eligible_branches')
+    degrees = profile.get('eligible_degrees')
+    min_cgpa = profile.get('min_cgpa')
+    return ((branches is None or student['branch'] in branches)
+            and (degrees is None or student['degree'] in degrees)
+            and (min_cgpa is None or float(student['cgpa']) >= float(min_cgpa)))
+
+
+def has_bit(bitmap, profile_code):
+    return bool(bitmap >> profile_code & 1)
+
+
+def with_bit(bitmap, profile_code, value):
+    return bitmap | (1 << profile_code) if value else bitmap & ~(1 << profile_code)
+
+
+def encode(bitmap, first_code=0):
+    """Python int -> BIT VARYING text from first_code on ('0101': first_code + 1 and + 3)"""
+    bitmap >>= first_code
+    return format(bitmap, 'b')[::-1] if bitmap else ''
+
+
+def decode(bits, first_code=0):
+    """BIT VARYING text whose first bit is first_code -> Python int"""
+    return int(bits[::-1], 2) << first_code if bits else 0
+
+
+def is_eligible(profile, bitmap):
+    """Apply-time check: a bitmap lookup for restricted profiles"""
+    return not is_restricted(profile) or has_bit(bitmap, profile['profile_code'])
+
+
+def eligible_filter(catalog, bitmap):
+    """
+    Predicate over profile codes for filtering listings and search results
+
+    Args:
+        catalog (list): Catalog rows (carry the criteria fields)
+        bitmap (int): The student's eligibility bitmap
+    """
+    restricted = 0
+    for profile in catalog:
+        if is_restricted(profile):
+            restricted |= 1 << profile['profile_code']
+    blocked = restricted & ~bitmap
+    return lambda profile_code: not has_bit(blocked, profile_code)
+
+
+class EligibilityIndex:
+    """
+    Bitmaps of the restricted profiles, indexed by attribute value
+
+    A student's bitmap is then three lookups and two ANDs instead of one
+    predicate per profile:
+        bitmap(student) = by_branch[branch] & by_degree[degree] & by_cgpa(cgpa)
+    """
+
+    def __init__(self, profiles):
+        restricted = [p for p in profiles if is_restricted(p)]
+
+        self._open_branch = 0  # profiles without a branch restriction
+        self._open_degree = 0
+        self._by_branch = {}
+        self._by_degree = {}
+        for profile in restricted:
+            bit = 1 << profile['profile_code']
+            if profile.get('eligible_branches') is None:
+                self._open_branch |= bit
+            else:
+                for branch in profile['eligible_branches']:
+                    self._by_branch[branch] = self._by_branch.get(branch, 0) | bit
+            if profile.get('eligible_degrees') is None:
+                self._open_degree |= bit
+            else:
+                for degree in profile['eligible_degrees']:
+                    self._by_degree[degree] = self._by_degree.get(degree, 0) | bit
+
+        # admitted_upto[i]: profiles whose minimum is at most thresholds[i]
+        by_threshold = sorted(
+            (float(p['min_cgpa']) if p.get('min_cgpa') is not None else float('-inf'),
+             p['profile_code'])
+            for p in restricted
+        )
+        self._thresholds = []
+        self._admitted_upto = []
+        admitted = 0
+        for threshold, profile_code in by_threshold:
+            admitted |= 1 << profile_code
+            if self._thresholds and self._thresholds[-1] == threshold:
+                self._admitted_upto[-1] = admitted
+            else:
+                self._thresholds.append(threshold)
+                self._admitted_upto.append(admitted)
+
+    def bitmap(self, student):
+        """Eligibility bitmap for one student's branch, degree and cgpa"""
+        position = bisect.bisect_right(self._thresholds, float(student['cgpa']))
+        by_cgpa = self._admitted_upto[position - 1] if position else 0
+        return ((self._open_branch | self._by_branch.get(student['branch'], 0))
+                & (self._open_degree | self._by_degree.get(student['degree'], 0))
+                & by_cgpa)
@@ -0,0 +1,222 @@
+"""
+Structured, non-blocking logging
+Records are written as one JSON object per line by a background thread; the
+thread that logs only puts the record on a bounded queue, so an error storm
+never makes requests wait on stdout
+
+Usage:
+    from utils.log import get_logger
+    log = get_logger(__name__)
+
+    log.exception("Apply error")                       # inside an except block
+    log.warning("Replica read failed", exc_info=e, extra={'replica': host})
+
+Every record carries the id of the request it was logged in (see
+middleware/request_id.py). Identical records (same logger, message and
+exception type) beyond LOG_SAMPLE_BURST per LOG_SAMPLE_WINDOW_SECONDS are
+dropped; the next one let through reports how many were suppressed. When
+the queue is full, records are dropped and counted as log.dropped.
+
+Messages should be constant strings: values belong in extra fields, where
+query parameters go through redact() first.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from config import config
+from utils import metrics
+
+
+ROOT_LOGGER = 'ocs'
+
+# Set per request by middleware/request_id.py
+request_id = ContextVar('request_id', default=None)
+
+MAX_QUERY_LENGTH = 500
+
+# Sampling windows are pruned once this many distinct records were seen
+MAX_SAMPLE_KEYS = 1000
+
+# LogRecord attributes that are not extra fields
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'request_id', 'suppressed'}
+
+
+def redact(params):
+    """
+    Replace query parameter values by their type names
+
+    ('2021CS10001', 3) -> ['str', 'int'], {'status': 'Applied'} -> {'status': 'str'}
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [type(value).__name__ for value in params]
+    return type(params).__name__
+
+
+def compact_query(query):
+    """SQL text on one line, truncated to MAX_QUERY_LENGTH"""
+    text = ' '.join(str(query).split())
+    return text if len(text) <= MAX_QUERY_LENGTH else text[:MAX_QUERY_LENGTH] + '...'
+
+
+class RateLimitSampler(logging.Filter):
+    """Let through at most burst identical records per window seconds"""
+
+    def __init__(self, burst, window):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._lock = threading.Lock()
+        self._windows = {}  # key -> [window start, let through, suppressed]
+
+    def filter(self, record):
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, record.msg, exc_type)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                if entry is None and len(self._windows) >= MAX_SAMPLE_KEYS:
+                    self._prune(now)
+                if entry is not None and entry[2]:
+                    record.suppressed = entry[2]
+                entry = self._windows[key] = [now, 0, 0]
+
+            if entry[1] >= self.burst:
+                entry[2] += 1
+                metrics.incr('log.suppressed')
+                return False
+            entry[1] += 1
+        return True
+
+    def _prune(self, now):
+        for key in [k for k, entry in self._windows.items() if now - entry[0] >= self.window]:
+            del self._windows[key]
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; runs on the writer thread"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'pid': record.process
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+
+        if record.exc_info and record.exc_info[1] is not None:
+            exc_type, exc, tb = record.exc_info
+            # First line only: database errors put row values in their DETAIL lines
+            message = str(exc).strip().split('\n', 1)[0]
+            entry['error'] = f"{exc_type.__name__}: {message}" if message else exc_type.__name__
+            if tb is not None:
+                entry['traceback'] = ''.join(traceback.format_tb(tb))
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without ever blocking the caller"""
+
+    def prepare(self, record):
+        # Rendering happens on the writer thread; capture what belongs to
+        # the calling thread now
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_id = request_id.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr('log.dropped')
+
+    def emit(self, record):
+        _ensure_writer()
+        super().emit(record)
+
+
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(JsonFormatter())
+
+_sampler = RateLimitSampler(config.LOG_SAMPLE_BURST, config.LOG_SAMPLE_WINDOW_SECONDS)
+_queue_handler = _QueueHandler(queue.Queue(maxsize=config.LOG_QUEUE_SIZE))
+_queue_handler.addFilter(_sampler)
+
+_root = logging.getLogger(ROOT_LOGGER)
+_root.setLevel(config.LOG_LEVEL.upper())
+_root.addHandler(_queue_handler)
+_root.propagate = False
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def _ensure_writer():
+    """Start this process's writer thread on first use (after fork too)"""
+    global _writer, _writer_pid
+    if _writer_pid == os.getpid():
+        return
+    with _writer_lock:
+        if _writer_pid != os.getpid():
+            _writer = logging.handlers.QueueListener(_queue_handler.queue, _stream_handler)
+            _writer.start()
+            _writer_pid = os.getpid()
+
+
+def _reset_after_fork():
+    # The parent's queue may be mid-operation and its writer thread does
+    # not exist in the child: start over with an empty queue and fresh locks
+    global _writer, _writer_pid, _writer_lock
+    _queue_handler.queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    _sampler._lock = threading.Lock()
+    _writer_lock = threading.Lock()
+    _writer = None
+    _writer_pid = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@atexit.register
+def flush():
+    """Write out everything queued so far and stop the writer thread"""
+    global _writer, _writer_pid
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            return
+        try:
+            _writer.stop()
+        except queue.Full:  # no room for the stop marker; the thread is a daemon
+            pass
+        _writer = None
+        _writer_pid = None
+
+
+def get_logger(name):
+    """Logger under the shared JSON pipeline, e.g. get_logger(__name__)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,67 @@
+"""
+In-process metrics registry
+Thread-safe counters and timers shared by middleware, routes and background jobs
+"""
+
+import threading
+
+
+_lock = threading.Lock()
+_counters = {}
+_timers = {}
+
+
+def incr(name, value=1):
+    """
+    Increase a counter
+
+    Args:
+        name (str): Dotted metric name, e.g. 'compression.gzip.responses'
+        value (int/float): Amount to add
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, seconds):
+    """
+    Record one duration sample for a timer
+
+    Args:
+        name (str): Dotted metric name, e.g. 'sweeper.duration'
+        seconds (float): Measured duration
+    """
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = {'count': 0, 'total': 0.0, 'max': 0.0}
+        timer['count'] += 1
+        timer['total'] += seconds
+        if seconds > timer['max']:
+            timer['max'] = seconds
+
+
+def snapshot(prefix=None):
+    """
+    Return a copy of all metrics, optionally restricted to a name prefix
+
+    Returns:
+        dict: {"counters": {...}, "timers": {...}}
+    """
+    with _lock:
+        counters = {
+            name: value for name, value in _counters.items()
+            if prefix is None or name.startswith(prefix)
+        }
+        timers = {
+            name: dict(value) for name, value in _timers.items()
+            if prefix is None or name.startswith(prefix)
+        }
+    return {'counters': counters, 'timers': timers}
+
+
+def reset():
+    """Clear all metrics (used by CLI jobs between runs)"""
+    with _lock:
+        _counters.clear()
+        _timers.clear()
@@ -0,0 +1,94 @@
+"""
+In-process prefix index for typeahead
+Sorted (term, key) pairs searched with bisect; inserts are incremental
+"""
+
+import bisect
+import re
+import threading
+
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace so lookups are case-insensitive"""
+    return ' '.join((text or '').lower().split())
+
+
+class PrefixIndex:
+    """
+    Maps normalized terms to keys for prefix lookups
+
+    Every field is indexed both as a whole ("data analyst") and word by
+    word ("analyst"), so typing any word of a name finds it. Matches on
+    the start of a whole field rank above matches on a later word.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._terms = []  # sorted list of (term, is_word, key)
+
+    def __len__(self):
+        return len(self._terms)
+
+    @staticmethod
+    def _entries(key, fields):
+        entries = set()
+        for field in fields:
+            whole = normalize(field)
+            if not whole:
+                continue
+            entries.add((whole, False, key))
+            for word in _WORD.findall(whole)[1:]:
+                entries.add((word, True, key))
+        return entries
+
+    def add(self, key, *fields):
+        """Index one entry under all of its fields"""
+        entries = self._entries(key, fields)
+        with self._lock:
+            for entry in entries:
+                bisect.insort(self._terms, entry)
+
+    def add_many(self, items):
+        """
+        Index many entries at once (one sort instead of an insort each)
+
+        Args:
+            items: iterable of (key, field, field, ...) tuples
+        """
+        entries = []
+        for key, *fields in items:
+            entries.extend(self._entries(key, fields))
+        with self._lock:
+            self._terms.extend(entries)
+            self._terms.sort()
+
+    def search(self, prefix, limit=10, scan_limit=2000):
+        """
+        Keys whose fields start with prefix, best matches first
+
+        Args:
+            prefix (str): What the user has typed so far
+            limit (int): Maximum number of keys returned
+            scan_limit (int): Maximum number of index entries examined
+
+        Returns:
+            list: keys ordered by (whole-field match first, shorter term first)
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        matches = {}
+        with self._lock:
+            start = bisect.bisect_left(self._terms, (prefix,))
+            for term, is_word, key in self._terms[start:start + scan_limit]:
+                if not term.startswith(prefix):
+                    break
+                rank = (is_word, len(term))
+                if key not in matches or rank < matches[key]:
+                    matches[key] = rank
+
+        return sorted(matches, key=lambda k: (matches[k], k))[:limit]
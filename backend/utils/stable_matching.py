@@ -0,0 +1,131 @@
+"""
+Many-to-one stable matching (deferred acceptance)
+Students propose down their preference lists; every profile holds on to
+the best-ranked applicants up to its capacity and turns away the rest.
+Preferences are flattened into typed arrays indexed by dense ids, so a
+cohort of 10k students x 2k profiles is matched in well under a second.
+"""
+
+import heapq
+from array import array
+
+
+class Proposals:
+    """
+    Acceptable (student, profile) pairs in compressed row layout
+
+    Students and profiles are numbered from 0 in the order they first
+    appear. Student s's pairs are positions start[s] .. start[s + 1] - 1
+    of profile_ids (in the student's order of preference) and ranks (the
+    profile's rank of the student, lower is better).
+    """
+
+    def __init__(self):
+        self.students = []        # student index -> entry_number
+        self.profiles = []        # profile index -> profile_code
+        self.start = array('l', [0])
+        self.profile_ids = array('l')
+        self.ranks = array('l')
+        self.demand = array('l')  # profile index -> number of pairs
+        self._profile_index = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build from (entry_number, profile_code, rank) rows
+
+        Rows must be grouped by student and in the student's order of
+        preference within a group (ORDER BY entry_number, preference).
+        """
+        proposals = cls()
+        current = None
+        for entry_number, profile_code, rank in rows:
+            if entry_number != current:
+                if current is not None:
+                    proposals.start.append(len(proposals.profile_ids))
+                proposals.students.append(entry_number)
+                current = entry_number
+            proposals.profile_ids.append(proposals._profile(profile_code))
+            proposals.ranks.append(rank)
+        if current is not None:
+            proposals.start.append(len(proposals.profile_ids))
+        return proposals
+
+    def _profile(self, profile_code):
+        index = self._profile_index.get(profile_code)
+        if index is None:
+            index = self._profile_index[profile_code] = len(self.profiles)
+            self.profiles.append(profile_code)
+            self.demand.append(0)
+        self.demand[index] += 1
+        return index
+
+    def __len__(self):
+        return len(self.profile_ids)
+
+    def capacities(self, free_seats):
+        """
+        Capacity array for deferred_acceptance()
+
+        Args:
+            free_seats (dict): profile_code -> free seats, None = unlimited;
+                profiles missing from it get no seats
+        """
+        capacities = array('l', [0]) * len(self.profiles)
+        for index, profile_code in enumerate(self.profiles):
+            seats = free_seats.get(profile_code, 0)
+            capacities[index] = self.demand[index] if seats is None else max(seats, 0)
+        return capacities
+
+
+def deferred_acceptance(proposals, capacities):
+    """
+    Student-optimal stable assignment
+
+    No student and profile both prefer each other to what they were
+    assigned: every student is placed at the best profile they can get
+    in any stable assignment.
+
+    Args:
+        proposals (Proposals): Acceptable pairs with both sides' orders
+        capacities (array): Seats per profile index
+
+    Returns:
+        array: profile index per student index, -1 when unplaced
+    """
+    start, profile_ids, ranks = proposals.start, proposals.profile_ids, proposals.ranks
+    student_count = len(proposals.students)
+
+    next_choice = array('l', start[:student_count])
+    held = [[] for _ in proposals.profiles]  # max-heap by rank: (-rank, student)
+    free = list(range(student_count - 1, -1, -1))
+
+    while free:
+        student = free.pop()
+        position, end = next_choice[student], start[student + 1]
+        while position < end:
+            profile, rank = profile_ids[position], ranks[position]
+            position += 1
+            heap = held[profile]
+            if len(heap) < capacities[profile]:
+                heapq.heappush(heap, (-rank, student))
+                break
+            if heap and -heap[0][0] > rank:
+                # Bump the worst-ranked holder; it proposes again from where it was
+                free.append(heapq.heapreplace(heap, (-rank, student))[1])
+                break
+        next_choice[student] = position
+
+    assignment = array('l', [-1]) * student_count
+    for profile, heap in enumerate(held):
+        for _, student in heap:
+            assignment[student] = profile
+    return assignment
+
+
+def assigned_pairs(proposals, assignment):
+    """(profile_code, entry_number) for every placed student"""
+    return [
+        (proposals.profiles[profile], proposals.students[student])
+        for student, profile in enumerate(assignment) if profile >= 0
+    ]
@@ -2,6 +2,8 @@
 Input validation utilities
 """
 
+from config import config
+
 
 def validate_login_input(data):
     """
@@ -45,6 +47,197 @@ def validate_profile_input(data):
     if not designation:
         return False, "designation is required"
 
+    if data.get('openings') is not None:
+        is_valid, error = validate_openings_input(data)
+        if not is_valid:
+            return False, error
+
+    return validate_criteria_input(data)
+
+
+def validate_openings_input(data):
+    """Validate an openings value (null = unlimited, else a non-negative integer)"""
+    if not data:
+        return False, "No data provided"
+
+    openings = data.get('openings')
+    if openings is None:
+        return True, None
+
+    if isinstance(openings, bool) or not isinstance(openings, int):
+        return False, "openings must be a whole number or null"
+
+    if not 0 <= openings <= 100000:
+        return False, "openings must be between 0 and 100000"
+
+    return True, None
+
+
+def validate_set_openings_input(data):
+    """Validate a change of a profile's openings"""
+    if not data:
+        return False, "No data provided"
+
+    try:
+        int(data.get('profile_code'))
+    except (ValueError, TypeError):
+        return False, "profile_code must be a number"
+
+    return validate_openings_input(data)
+
+
+def _validate_code_list(values, field):
+    if values is None:
+        return True, None
+
+    if not isinstance(values, list) or not values:
+        return False, f"{field} must be a non-empty list or null"
+
+    if len(values) > config.ELIGIBILITY_MAX_CODES:
+        return False, f"{field} must have at most {config.ELIGIBILITY_MAX_CODES} entries"
+
+    if any(not isinstance(value, str) or not value.strip() or len(value) > 20 for value in values):
+        return False, f"{field} must be codes of 1 to 20 characters"
+
+    return True, None
+
+
+def _validate_cgpa(value, field):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False, f"{field} must be a number"
+
+    if not 0 <= value <= 10:
+        return False, f"{field} must be between 0 and 10"
+
+    return True, None
+
+
+def validate_criteria_input(data):
+    """
+    Validate eligibility criteria (every field optional, null = no restriction)
+
+    Args:
+        data (dict): eligible_branches, eligible_degrees (lists of codes), min_cgpa
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    if not data:
+        return False, "No data provided"
+
+    for field in ('eligible_branches', 'eligible_degrees'):
+        is_valid, error = _validate_code_list(data.get(field), field)
+        if not is_valid:
+            return False, error
+
+    if data.get('min_cgpa') is not None:
+        return _validate_cgpa(data['min_cgpa'], 'min_cgpa')
+
+    return True, None
+
+
+def validate_set_criteria_input(data):
+    """Validate a change of a profile's eligibility criteria"""
+    if not data:
+        return False, "No data provided"
+
+    try:
+        int(data.get('profile_code'))
+    except (ValueError, TypeError):
+        return False, "profile_code must be a number"
+
+    return validate_criteria_input(data)
+
+
+def validate_student_attributes_input(data):
+    """
+    Validate a bulk upload of student attributes
+
+    Args:
+        data (dict): {"students": [{"entry_number", "branch", "degree", "cgpa"}]}
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    if not data:
+        return False, "No data provided"
+
+    students = data.get('students')
+    if not isinstance(students, list) or not students:
+        return False, "students must be a non-empty list"
+
+    if len(students) > config.ELIGIBILITY_MAX_STUDENTS:
+        return False, f"At most {config.ELIGIBILITY_MAX_STUDENTS} students per upload"
+
+    seen = set()
+    for position, student in enumerate(students):
+        if not isinstance(student, dict):
+            return False, f"students[{position}] must be an object"
+
+        entry_number = student.get('entry_number')
+        if not isinstance(entry_number, str) or not entry_number:
+            return False, f"students[{position}].entry_number is required"
+
+        if entry_number in seen:
+            return False, f"students[{position}]: {entry_number} is listed twice"
+        seen.add(entry_number)
+
+        for field in ('branch', 'degree'):
+            value = student.get(field)
+            if not isinstance(value, str) or not value.strip() or len(value) > 20:
+                return False, f"students[{position}].{field} must be a code of 1 to 20 characters"
+
+        is_valid, error = _validate_cgpa(student.get('cgpa'), f"students[{position}].cgpa")
+        if not is_valid:
+            return False, error
+
+    return True, None
+
+
+def validate_preferences_input(data):
+    """Validate a student's preference list (profile codes, most wanted first)"""
+    if not data:
+        return False, "No data provided"
+
+    profile_codes = data.get('profile_codes')
+    if not isinstance(profile_codes, list):
+        return False, "profile_codes must be a list"
+
+    if len(profile_codes) > config.ALLOCATION_MAX_PREFERENCES:
+        return False, f"At most {config.ALLOCATION_MAX_PREFERENCES} preferences are allowed"
+
+    if any(isinstance(code, bool) or not isinstance(code, int) for code in profile_codes):
+        return False, "profile_codes must be numbers"
+
+    if len(set(profile_codes)) != len(profile_codes):
+        return False, "profile_codes must not repeat"
+
+    return True, None
+
+
+def validate_ranking_input(data):
+    """Validate a profile's ranking of its applicants (entry numbers, best first)"""
+    if not data:
+        return False, "No data provided"
+
+    try:
+        int(data.get('profile_code'))
+    except (ValueError, TypeError):
+        return False, "profile_code must be a number"
+
+    entry_numbers = data.get('entry_numbers')
+    if not isinstance(entry_numbers, list):
+        return False, "entry_numbers must be a list"
+
+    if len(entry_numbers) > config.ALLOCATION_MAX_RANKING:
+        return False, f"At most {config.ALLOCATION_MAX_RANKING} applicants can be ranked"
+
+    if any(not isinstance(entry, str) or not entry for entry in entry_numbers):
+        return False, "entry_numbers must be non-empty strings"
+
+    if len(set(entry_numbers)) != len(entry_numbers):
+        return False, "entry_numbers must not repeat"
+
     return True, None
 
 
@@ -88,4 +281,169 @@ def validate_status_change_input(data):
     if new_status not in valid_statuses:
         return False, f"new_status must be one of: {', '.join(valid_statuses)}"
 
-    return True, None
\ No newline at end of file
+    return True, None
+
+BATCH_METHODS = ('GET', 'POST')
+
+# Sub-request headers a batch may set; auth, cookies and the rest come from the batch
+BATCH_HEADERS = ('Idempotency-Key',)
+
+
+def validate_batch_input(data):
+    """
+    Validate a /api/batch request body
+
+    Args:
+        data (dict): {"requests": [{"method", "path", "body", "headers"}]}
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    if not data:
+        return False, "No data provided"
+
+    requests = data.get('requests')
+    if not isinstance(requests, list) or not requests:
+        return False, "requests must be a non-empty list"
+
+    if len(requests) > config.BATCH_MAX_REQUESTS:
+        return False, f"At most {config.BATCH_MAX_REQUESTS} requests per batch"
+
+    for position, sub in enumerate(requests):
+        if not isinstance(sub, dict):
+            return False, f"requests[{position}] must be an object"
+
+        if sub.get('method', 'GET') not in BATCH_METHODS:
+            return False, f"requests[{position}].method must be one of: {', '.join(BATCH_METHODS)}"
+
+        path = sub.get('path')
+        if not isinstance(path, str) or not path.startswith('/api/') or len(path) > 2000:
+            return False, f"requests[{position}].path must be an /api/ path"
+
+        body = sub.get('body')
+        if body is not None and not isinstance(body, (dict, list)):
+            return False, f"requests[{position}].body must be a JSON object or array"
+
+        headers = sub.get('headers') or {}
+        if (not isinstance(headers, dict)
+                or any(name not in BATCH_HEADERS or not isinstance(value, str)
+                       for name, value in headers.items())):
+            return False, f"requests[{position}].headers may only set: {', '.join(BATCH_HEADERS)}"
+
+    return True, None
+
+
+def validate_changes_input(args):
+    """
+    Validate change feed query parameters
+
+    Args:
+        args (dict): Query string with since and optional limit
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    since = args.get('since', '0')
+    limit = args.get('limit', '500')
+
+    try:
+        since = int(since)
+        limit = int(limit)
+    except (ValueError, TypeError):
+        return False, "since and limit must be numbers"
+
+    if since < 0:
+        return False, "since must not be negative"
+
+    if not 1 <= limit <= 1000:
+        return False, "limit must be between 1 and 1000"
+
+    return True, None
+
+
+def validate_search_input(args, param='q'):
+    """
+    Validate search/autocomplete query parameters
+
+    Args:
+        args (dict): Query string with the search text and optional limit
+        param (str): Name of the search text parameter
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    text = (args.get(param) or '').strip()
+    if not text:
+        return False, f"{param} is required"
+
+    if len(text) > 100:
+        return False, f"{param} must be at most 100 characters"
+
+    try:
+        limit = int(args.get('limit', 20))
+    except (ValueError, TypeError):
+        return False, "limit must be a number"
+
+    if not 1 <= limit <= 50:
+        return False, "limit must be between 1 and 50"
+
+    return True, None
+
+
+APPLICATION_SORT_FIELDS = ['profile_code', 'entry_number', 'status']
+
+
+def validate_application_filter_input(args):
+    """
+    Validate filtering, sorting and pagination parameters of application lists
+
+    Args:
+        args (dict): Query string (profile_code, status, sort, order, page, per_page)
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    profile_code = args.get('profile_code')
+    if profile_code:
+        try:
+            int(profile_code)
+        except (ValueError, TypeError):
+            return False, "profile_code must be a number"
+
+    status = args.get('status')
+    valid_statuses = ['Applied', 'Not Selected', 'Selected', 'Accepted']
+    if status and status not in valid_statuses:
+        return False, f"status must be one of: {', '.join(valid_statuses)}"
+
+    if args.get('sort', 'profile_code') not in APPLICATION_SORT_FIELDS:
+        return False, f"sort must be one of: {', '.join(APPLICATION_SORT_FIELDS)}"
+
+    if args.get('order', 'asc') not in ('asc', 'desc'):
+        return False, "order must be asc or desc"
+
+    return validate_pagination_input(args)
+
+
+def validate_pagination_input(args):
+    """
+    Validate page/per_page query parameters
+
+    Args:
+        args (dict): Query string with optional page (default 1) and per_page (default 100)
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    try:
+        page = int(args.get('page', 1))
+        per_page = int(args.get('per_page', 100))
+    except (ValueError, TypeError):
+        return False, "page and per_page must be numbers"
+
+    if page < 1:
+        return False, "page must be at least 1"
+
+    if not 1 <= per_page <= 500:
+        return False, "per_page must be between 1 and 500"
+
+    return True, None
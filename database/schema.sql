@@ -0,0 +1,515 @@
+-- ============================================================
+-- OCS Portal schema additions
+-- Base tables (users, profile, application) live in Supabase;
+-- every statement below is idempotent and safe to re-run.
+-- ============================================================
+
+
+-- ------------------------------------------------------------
+-- Application status history (append-only change feed)
+-- Written in the same statement as every status transition.
+-- txid lets the feed hide rows whose transaction committed
+-- after an older, still-running one (no gaps for pollers).
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS application_status_history (
+    seq           BIGSERIAL PRIMARY KEY,
+    profile_code  INTEGER NOT NULL,
+    entry_number  TEXT NOT NULL,
+    old_status    TEXT,
+    new_status    TEXT NOT NULL,
+    changed_by    TEXT NOT NULL,
+    changed_at    TIMESTAMPTZ NOT NULL DEFAULT now(),
+    txid          BIGINT NOT NULL DEFAULT txid_current()
+);
+
+CREATE INDEX IF NOT EXISTS idx_status_history_student
+    ON application_status_history (entry_number, seq);
+
+CREATE INDEX IF NOT EXISTS idx_status_history_profile
+    ON application_status_history (profile_code, seq);
+
+CREATE INDEX IF NOT EXISTS idx_profile_recruiter
+    ON profile (recruiter_email, profile_code);
+
+
+-- ------------------------------------------------------------
+-- Status change notifications (Server-Sent Events push)
+-- Fired per history row; delivered to listeners on commit.
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION notify_application_status() RETURNS trigger AS $$
+BEGIN
+    -- Cached values the change makes stale (CACHE_BACKEND=postgres)
+    DELETE FROM shared_cache WHERE key IN ('ocs:stats', 'ocs:lock:' || NEW.entry_number);
+    PERFORM pg_notify('application_status', json_build_object(
+        'seq', NEW.seq,
+        'profile_code', NEW.profile_code,
+        'entry_number', NEW.entry_number,
+        'old_status', NEW.old_status,
+        'new_status', NEW.new_status,
+        'recruiter_email', (SELECT recruiter_email FROM profile WHERE profile_code = NEW.profile_code)
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_application_status_notify ON application_status_history;
+CREATE TRIGGER trg_application_status_notify
+    AFTER INSERT ON application_status_history
+    FOR EACH ROW EXECUTE FUNCTION notify_application_status();
+
+
+-- ------------------------------------------------------------
+-- Offer expiry
+-- status_changed_at is set by every transition; the partial
+-- index lets the sweeper find overdue offers without scanning
+-- the rest of application.
+-- ------------------------------------------------------------
+ALTER TABLE application
+    ADD COLUMN IF NOT EXISTS status_changed_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS idx_application_selected_since
+    ON application (status_changed_at)
+    WHERE status = 'Selected';
+
+
+-- ------------------------------------------------------------
+-- Profile search
+-- Prefix full-text matching on a generated tsvector, plus
+-- trigram indexes for typo-tolerant similarity ranking.
+-- ------------------------------------------------------------
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE profile
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(company_name, '') || ' ' || coalesce(designation, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_profile_search
+    ON profile USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_profile_company_trgm
+    ON profile USING GIN (company_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_profile_designation_trgm
+    ON profile USING GIN (designation gin_trgm_ops);
+
+
+-- ------------------------------------------------------------
+-- Eligibility criteria
+-- A profile may restrict applicants by branch, degree and
+-- minimum CGPA (NULL = no restriction). eligible_profiles has
+-- bit n set when the student meets the criteria of restricted
+-- profile first_profile_code + n of the active season
+-- (placement_season, utils/eligibility.py), so a bitmap only
+-- spans one season's profiles; the repository updates it
+-- whenever criteria or attributes change, so listings and
+-- apply checks are bit lookups. Change criteria through the
+-- API: direct UPDATEs leave the bitmaps stale.
+-- ------------------------------------------------------------
+ALTER TABLE profile
+    ADD COLUMN IF NOT EXISTS eligible_branches TEXT[],
+    ADD COLUMN IF NOT EXISTS eligible_degrees TEXT[],
+    ADD COLUMN IF NOT EXISTS min_cgpa NUMERIC(4, 2) CHECK (min_cgpa IS NULL OR min_cgpa BETWEEN 0 AND 10);
+
+CREATE TABLE IF NOT EXISTS student_attributes (
+    entry_number       TEXT PRIMARY KEY REFERENCES users (userid) ON DELETE CASCADE,
+    branch             TEXT NOT NULL,
+    degree             TEXT NOT NULL,
+    cgpa               NUMERIC(4, 2) NOT NULL CHECK (cgpa BETWEEN 0 AND 10),
+    eligible_profiles  BIT VARYING NOT NULL DEFAULT B''
+);
+
+
+-- ------------------------------------------------------------
+-- Shared cache (CACHE_BACKEND=postgres)
+-- UNLOGGED: no WAL, not replicated, emptied after a crash --
+-- acceptable for cached values. Triggers delete the cache keys
+-- a write makes stale, in the writer's transaction, and
+-- broadcast them so every worker drops its own copies;
+-- application status changes are broadcast on
+-- application_status (and delete their keys there).
+-- ------------------------------------------------------------
+CREATE UNLOGGED TABLE IF NOT EXISTS shared_cache (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    expires_at  TIMESTAMPTZ NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM shared_cache WHERE key = ANY(ARRAY(SELECT 'ocs:' || k FROM unnest(TG_ARGV) k));
+    PERFORM pg_notify('cache_invalidation', array_to_string(TG_ARGV, ','));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_profile_cache_invalidation ON profile;
+-- Only catalog columns: seat counter updates must not flush it
+CREATE TRIGGER trg_profile_cache_invalidation
+    AFTER INSERT OR DELETE OR UPDATE OF recruiter_email, company_name, designation,
+        eligible_branches, eligible_degrees, min_cgpa ON profile
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation('catalog', 'stats');
+
+DROP TRIGGER IF EXISTS trg_users_cache_invalidation ON users;
+CREATE TRIGGER trg_users_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON users
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation('stats');
+
+
+-- ------------------------------------------------------------
+-- Profile openings
+-- openings caps how many applications may hold 'Selected' or
+-- 'Accepted' at once (NULL = unlimited). seats_filled is the
+-- running count, changed by the same statement as the status
+-- (status_history.py) with a conditional UPDATE, so capacity is
+-- enforced without counting application rows. The backfill
+-- recomputes it; run it again to repair drift, while quiet.
+-- ------------------------------------------------------------
+ALTER TABLE profile
+    ADD COLUMN IF NOT EXISTS openings INTEGER CHECK (openings IS NULL OR openings >= 0),
+    ADD COLUMN IF NOT EXISTS seats_filled INTEGER NOT NULL DEFAULT 0;
+
+UPDATE profile p
+SET seats_filled = held.n
+FROM (
+    SELECT pr.profile_code, count(a.entry_number)::int AS n
+    FROM profile pr
+    LEFT JOIN application a
+        ON a.profile_code = pr.profile_code AND a.status IN ('Selected', 'Accepted')
+    GROUP BY pr.profile_code
+) held
+WHERE p.profile_code = held.profile_code AND p.seats_filled <> held.n;
+
+
+-- ------------------------------------------------------------
+-- Batch allocation (allocation.py)
+-- Students order the profiles they applied to, recruiters rank
+-- each profile's applicants; both reference the application
+-- they are about. A run offers every still-'Applied', unlocked
+-- student a stable assignment; the lists are kept, so a later
+-- run fills seats that declined offers gave back.
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS student_preference (
+    entry_number  TEXT NOT NULL,
+    profile_code  INTEGER NOT NULL,
+    preference    INTEGER NOT NULL CHECK (preference >= 1),
+    PRIMARY KEY (entry_number, profile_code),
+    FOREIGN KEY (profile_code, entry_number)
+        REFERENCES application (profile_code, entry_number) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS recruiter_ranking (
+    profile_code  INTEGER NOT NULL,
+    entry_number  TEXT NOT NULL,
+    ranking       INTEGER NOT NULL CHECK (ranking >= 1),
+    PRIMARY KEY (profile_code, entry_number),
+    FOREIGN KEY (profile_code, entry_number)
+        REFERENCES application (profile_code, entry_number) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_student_preference_order
+    ON student_preference (entry_number, preference);
+
+
+-- ------------------------------------------------------------
+-- Placement seasons (seasons.py)
+-- Every profile belongs to a season (2025 = the 2025-26
+-- season) and application is LIST-partitioned by it, one
+-- partition per season. Queries filter on active_season(), so
+-- they prune to the active partition and its indexes; old
+-- seasons are read by nobody until seasons.py archives them
+-- (export, then detach and drop). Profiles stay one table:
+-- they are few, referenced everywhere, and idx_profile_season
+-- keeps the catalog to one season.
+--
+-- The first run converts the existing application table into
+-- the active season's partition (ACCESS EXCLUSIVE while it
+-- runs; one pass to build the new primary key).
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS placement_season (
+    season       SMALLINT PRIMARY KEY,
+    active       BOOLEAN NOT NULL DEFAULT false,
+    started_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    archived_at  TIMESTAMPTZ
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_placement_season_active
+    ON placement_season (active) WHERE active;
+
+-- Where the season's eligibility bit positions start: no profile
+-- of the season has a lower code (0 for seasons created before)
+ALTER TABLE placement_season
+    ADD COLUMN IF NOT EXISTS first_profile_code INTEGER NOT NULL DEFAULT 0;
+
+-- On first install: the season that started last July
+INSERT INTO placement_season (season, active)
+SELECT extract(year FROM now() - interval '6 months')::smallint, true
+WHERE NOT EXISTS (SELECT 1 FROM placement_season);
+
+CREATE OR REPLACE FUNCTION active_season() RETURNS smallint AS $$
+    SELECT season FROM placement_season WHERE active
+$$ LANGUAGE sql STABLE;
+
+ALTER TABLE profile
+    ADD COLUMN IF NOT EXISTS season SMALLINT;
+
+UPDATE profile SET season = active_season() WHERE season IS NULL;
+
+ALTER TABLE profile
+    ALTER COLUMN season SET DEFAULT active_season(),
+    ALTER COLUMN season SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_profile_season
+    ON profile (season, profile_code);
+
+DO $$
+DECLARE
+    current_season smallint := active_season();
+    partition_name text := format('application_%s', active_season());
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'application'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    LOCK TABLE application IN ACCESS EXCLUSIVE MODE;
+
+    -- References to application are re-created against the parent
+    ALTER TABLE student_preference
+        DROP CONSTRAINT IF EXISTS student_preference_profile_code_entry_number_fkey,
+        ADD COLUMN season SMALLINT NOT NULL DEFAULT active_season();
+    ALTER TABLE recruiter_ranking
+        DROP CONSTRAINT IF EXISTS recruiter_ranking_profile_code_entry_number_fkey,
+        ADD COLUMN season SMALLINT NOT NULL DEFAULT active_season();
+
+    ALTER TABLE application ADD COLUMN season SMALLINT;
+    UPDATE application a SET season = p.season FROM profile p WHERE p.profile_code = a.profile_code;
+    ALTER TABLE application
+        ALTER COLUMN season SET NOT NULL,
+        DROP CONSTRAINT application_pkey;
+    EXECUTE format('ALTER TABLE application RENAME TO %I', partition_name);
+    EXECUTE format('ALTER INDEX IF EXISTS idx_application_selected_since RENAME TO %I',
+                   partition_name || '_selected_since');
+
+    EXECUTE format('CREATE TABLE application (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+                    PARTITION BY LIST (season)', partition_name);
+    ALTER TABLE application
+        ADD PRIMARY KEY (season, profile_code, entry_number),
+        ADD CONSTRAINT application_profile_code_fkey
+            FOREIGN KEY (profile_code) REFERENCES profile (profile_code),
+        ADD CONSTRAINT application_entry_number_fkey
+            FOREIGN KEY (entry_number) REFERENCES users (userid);
+    EXECUTE format('ALTER TABLE application ATTACH PARTITION %I FOR VALUES IN (%s)',
+                   partition_name, current_season);
+
+    CREATE INDEX idx_application_selected_since
+        ON application (status_changed_at)
+        WHERE status = 'Selected';
+
+    ALTER TABLE student_preference
+        ADD FOREIGN KEY (season, profile_code, entry_number)
+        REFERENCES application (season, profile_code, entry_number) ON DELETE CASCADE;
+    ALTER TABLE recruiter_ranking
+        ADD FOREIGN KEY (season, profile_code, entry_number)
+        REFERENCES application (season, profile_code, entry_number) ON DELETE CASCADE;
+END;
+$$;
+
+-- Rolling over to a new season must flush the catalog and stats
+DROP TRIGGER IF EXISTS trg_placement_season_cache_invalidation ON placement_season;
+CREATE TRIGGER trg_placement_season_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON placement_season
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation('catalog', 'stats');
+
+
+-- ------------------------------------------------------------
+-- Revoked sessions (sessions.py)
+-- Logging out revokes the whole login session: every token
+-- renewed from it carries the same session_id. Workers keep
+-- the live rows in memory and learn of new ones through the
+-- NOTIFY below, so checking a token never queries this table.
+-- Rows are pruned once the session could no longer be renewed.
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS revoked_session (
+    session_id  TEXT PRIMARY KEY,
+    expires_at  TIMESTAMPTZ NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION notify_session_revoked() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('session_revoked',
+                      NEW.session_id || ',' || extract(epoch FROM NEW.expires_at)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_session_revoked_notify ON revoked_session;
+CREATE TRIGGER trg_session_revoked_notify
+    AFTER INSERT ON revoked_session
+    FOR EACH ROW EXECUTE FUNCTION notify_session_revoked();
+
+
+-- ------------------------------------------------------------
+-- Idempotency keys (middleware/idempotency.py)
+-- A write sent with an Idempotency-Key claims (userid, key) by
+-- inserting its row; the response is stored on the same row
+-- when it completes, so a retry is answered from here by any
+-- worker. A claim whose owner died (claimed_at older than the
+-- lease) or whose row expired can be taken over. A user's
+-- expired rows are pruned when they next claim a key.
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS idempotency_key (
+    userid       TEXT NOT NULL,
+    key          TEXT NOT NULL,
+    fingerprint  TEXT NOT NULL,
+    owner        TEXT NOT NULL,
+    claimed_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at   TIMESTAMPTZ NOT NULL,
+    status_code  SMALLINT,  -- NULL while the first attempt is running
+    body         BYTEA,
+    mimetype     TEXT,
+    PRIMARY KEY (userid, key)
+);
+
+
+-- ------------------------------------------------------------
+-- Application read model
+-- application_view is application plus the profile columns the
+-- listings show, so the student, recruiter and admin lists are
+-- one index range scan each, without joining profile. Triggers
+-- keep it current in the same transaction as every write;
+-- statement-level with transition tables, so COPY and batch
+-- status updates stay set-based. Keys of application rows never
+-- change, and the API never edits the copied profile columns
+-- (the profile trigger covers manual edits). Partitioned like
+-- application; seasons.py creates and drops both together.
+-- rebuild_application_view() refills it from application (run
+-- it while quiet to repair drift); the first run calls it once.
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS application_view (
+    season           SMALLINT NOT NULL,
+    profile_code     INTEGER NOT NULL,
+    entry_number     TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    company_name     TEXT NOT NULL,
+    designation      TEXT NOT NULL,
+    recruiter_email  TEXT NOT NULL,
+    PRIMARY KEY (season, profile_code, entry_number)
+) PARTITION BY LIST (season);
+
+-- Covering: both lists are answered from the index alone
+CREATE INDEX IF NOT EXISTS idx_application_view_recruiter
+    ON application_view (season, recruiter_email, profile_code, entry_number)
+    INCLUDE (status, company_name, designation);
+
+CREATE INDEX IF NOT EXISTS idx_application_view_student
+    ON application_view (season, entry_number, profile_code)
+    INCLUDE (status, company_name, designation, recruiter_email);
+
+DO $$
+DECLARE
+    s smallint;
+BEGIN
+    FOR s IN SELECT season FROM placement_season WHERE archived_at IS NULL LOOP
+        EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF application_view FOR VALUES IN (%s)',
+                       'application_view_' || s, s);
+    END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION application_view_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO application_view
+        (season, profile_code, entry_number, status, company_name, designation, recruiter_email)
+    SELECT n.season, n.profile_code, n.entry_number, n.status,
+           p.company_name, p.designation, p.recruiter_email
+    FROM new_rows n
+    JOIN profile p ON p.profile_code = n.profile_code;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION application_view_update() RETURNS trigger AS $$
+BEGIN
+    UPDATE application_view v
+    SET status = n.status
+    FROM new_rows n
+    WHERE v.season = n.season AND v.profile_code = n.profile_code
+      AND v.entry_number = n.entry_number AND v.status <> n.status;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION application_view_delete() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM application_view v
+    USING old_rows o
+    WHERE v.season = o.season AND v.profile_code = o.profile_code
+      AND v.entry_number = o.entry_number;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION application_view_profile() RETURNS trigger AS $$
+BEGIN
+    UPDATE application_view
+    SET company_name = NEW.company_name,
+        designation = NEW.designation,
+        recruiter_email = NEW.recruiter_email
+    WHERE season = NEW.season AND profile_code = NEW.profile_code;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_application_view_insert ON application;
+CREATE TRIGGER trg_application_view_insert
+    AFTER INSERT ON application
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION application_view_insert();
+
+DROP TRIGGER IF EXISTS trg_application_view_update ON application;
+CREATE TRIGGER trg_application_view_update
+    AFTER UPDATE ON application
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION application_view_update();
+
+DROP TRIGGER IF EXISTS trg_application_view_delete ON application;
+CREATE TRIGGER trg_application_view_delete
+    AFTER DELETE ON application
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION application_view_delete();
+
+DROP TRIGGER IF EXISTS trg_application_view_profile ON profile;
+CREATE TRIGGER trg_application_view_profile
+    AFTER UPDATE OF company_name, designation, recruiter_email ON profile
+    FOR EACH ROW
+    WHEN ((OLD.company_name, OLD.designation, OLD.recruiter_email)
+          IS DISTINCT FROM (NEW.company_name, NEW.designation, NEW.recruiter_email))
+    EXECUTE FUNCTION application_view_profile();
+
+CREATE OR REPLACE FUNCTION rebuild_application_view() RETURNS bigint AS $$
+DECLARE
+    written bigint;
+BEGIN
+    LOCK TABLE application IN SHARE MODE;
+    TRUNCATE application_view;
+    INSERT INTO application_view
+        (season, profile_code, entry_number, status, company_name, designation, recruiter_email)
+    SELECT a.season, a.profile_code, a.entry_number, a.status,
+           p.company_name, p.designation, p.recruiter_email
+    FROM application a
+    JOIN profile p ON p.profile_code = a.profile_code
+    WHERE a.season IN (SELECT season FROM placement_season WHERE archived_at IS NULL);
+    GET DIAGNOSTICS written = ROW_COUNT;
+    ANALYZE application_view;
+    RETURN written;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM application_view) AND EXISTS (SELECT 1 FROM application) THEN
+        PERFORM rebuild_application_view();
+    END IF;
+END;
+$$;
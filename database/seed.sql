@@ -0,0 +1,3 @@
+-- Sample data is generated rather than kept here:
+--   python backend/benchmarks/dataset.py --scale 0.01   (from the repository root)
+-- loads a deterministic, seeded dataset with COPY; see docs/BENCHMARKS.md.
@@ -1,108 +1,222 @@
 document.addEventListener('DOMContentLoaded', () => {
     checkAuth();
-    loadAdminData();
+
+    // Both tables render only the rows in view and pull pages as they scroll
+    usersTable = new VirtualTable({
+        container: document.getElementById('admin-users-scroll'),
+        tbody: document.getElementById('admin-users-table'),
+        columns: 2,
+        rowKey: user => user.userid,
+        renderRow: renderUserRow,
+        fetchPage: fetchUsersPage,
+        emptyText: 'No users yet.'
+    });
+    applicationsTable = new VirtualTable({
+        container: document.getElementById('admin-apps-scroll'),
+        tbody: document.getElementById('admin-apps-table'),
+        columns: 5,
+        rowKey: applicationKey,
+        renderRow: renderApplicationRow,
+        fetchPage: fetchApplicationsPage,
+        emptyText: 'No applications yet.'
+    });
+
+    // Issued in the same tick: one /api/batch round trip for all three,
+    // answered from the service worker's copy when it has one
+    loadStats(true);
+    usersTable.reload();
+    reloadApplications(false, true);
+
+    // ...and reloaded from it once its background revalidation brought news
+    subscribeToCacheUpdates(paths => {
+        if (paths.includes('/admin/stats')) loadStats(true);
+        if (paths.includes('/admin/users')) usersTable.reload({ keepScroll: true });
+        if (paths.includes('/admin/applications')) reloadApplications(true, true);
+    });
+
+    document.getElementById('filter-profile').addEventListener('change', e => {
+        filters.profile_code = e.target.value;
+        reloadApplications();
+    });
+    document.getElementById('filter-status').addEventListener('change', e => {
+        filters.status = e.target.value;
+        reloadApplications();
+    });
+
+    if (!subscribeToStatusEvents(syncApplications)) {
+        setInterval(syncApplications, CHANGE_POLL_INTERVAL);
+    }
 });
 
-async function loadAdminData() {
-    try {
-        const headers = getAuthHeaders();
+let usersTable;
+let applicationsTable;
 
-        // 1. Fetch Users
-        const usersRes = await fetch(`${API_BASE_URL}/admin/users`, { headers });
-        const usersData = await usersRes.json();
-        renderUsers(usersData.users);
+// Change-feed position of the loaded application pages (null while reloading)
+let lastSeq = null;
+let filters = { profile_code: '', status: '' };
+let facets = { profiles: [], statuses: [] };
 
-        // 2. Fetch Profiles (for stats only)
-        const profilesRes = await fetch(`${API_BASE_URL}/admin/profiles`, { headers });
-        const profilesData = await profilesRes.json();
+// Whether page fetches may be answered from the service worker's copy: on
+// the first load and after it revalidated, not after a known change
+let usersFromCache = true;
+let applicationsFromCache = true;
 
-        // 3. Fetch Applications
-        const appsRes = await fetch(`${API_BASE_URL}/admin/applications`, { headers });
-        const appsData = await appsRes.json();
-        renderApplications(appsData.applications);
+const STATUS_OPTIONS = ['Applied', 'Selected', 'Not Selected', 'Accepted'];
 
-        // Update Stats
-        document.getElementById('count-users').textContent = usersData.users.length;
-        document.getElementById('count-profiles').textContent = profilesData.profiles.length;
-        document.getElementById('count-applications').textContent = appsData.applications.length;
+async function loadStats(cached = false) {
+    try {
+        const { body: data } = await batchedGet('/admin/stats', { cached });
+        if (!data.success) return;
+
+        const sum = counts => Object.values(counts).reduce((a, b) => a + b, 0);
+        document.getElementById('count-users').textContent = sum(data.stats.users);
+        document.getElementById('count-profiles').textContent = data.stats.profiles;
+        document.getElementById('count-applications').textContent = sum(data.stats.applications);
 
     } catch (error) {
-        console.error("Admin load error:", error);
+        console.error("Admin stats error:", error);
     }
 }
 
-function renderUsers(users) {
-    const tbody = document.getElementById('admin-users-table');
-    tbody.innerHTML = '';
-
-    users.forEach(user => {
-        const tr = document.createElement('tr');
-        tr.innerHTML = `
-            <td>${user.userid}</td>
-            <td><span class="badge" style="background:#eee">${user.role}</span></td>
-        `;
-        tbody.appendChild(tr);
-    });
+async function fetchUsersPage(page) {
+    const params = new URLSearchParams({ page: page, per_page: VIRTUAL_PAGE_SIZE });
+    const { body: data } = await batchedGet(`/admin/users?${params}`, { cached: usersFromCache });
+    if (!data.success) throw new Error(data.error);
+
+    document.getElementById('admin-users-summary').textContent = `${data.total} users`;
+    return { rows: data.users, total: data.total };
 }
 
-function renderApplications(apps) {
-    const tbody = document.getElementById('admin-apps-table');
-    tbody.innerHTML = '';
+async function fetchApplicationsPage(page) {
+    const params = new URLSearchParams({ page: page, per_page: VIRTUAL_PAGE_SIZE });
+    if (filters.profile_code) params.set('profile_code', filters.profile_code);
+    if (filters.status) params.set('status', filters.status);
+
+    const { body: data } = await batchedGet(`/admin/applications?${params}`, { cached: applicationsFromCache });
+    if (!data.success) throw new Error(data.error);
 
-    apps.forEach(app => {
-        const tr = document.createElement('tr');
+    // Later pages are newer than the first; replaying changes onto them is harmless
+    if (lastSeq === null) lastSeq = data.last_seq || 0;
+    facets = data.facets;
+    renderFilters(data.total);
+    return { rows: data.applications, total: data.total };
+}
 
-        // Admin dropdown to force status change
-        const statusOptions = ['Applied', 'Selected', 'Not Selected', 'Accepted'];
-        let selectHtml = `<select onchange="adminChangeStatus(this, '${app.profile_code}', '${app.entry_number}')" class="admin-select">`;
+function reloadApplications(keepScroll = false, cached = false) {
+    lastSeq = null;
+    applicationsFromCache = cached;
+    return applicationsTable.reload({ keepScroll: keepScroll });
+}
 
-        statusOptions.forEach(status => {
-            const selected = app.status === status ? 'selected' : '';
-            selectHtml += `<option value="${status}" ${selected}>${status}</option>`;
+// Apply status changes to the loaded rows instead of reloading everything.
+// Rows in pages that are not loaded yet arrive fresh when scrolled to; only
+// changes that move rows (new applications, a status filter) re-query the window.
+async function syncApplications() {
+    if (lastSeq === null) return;
+    let changed = false;
+    let needsReload = false;
+
+    try {
+        lastSeq = await pullChanges('/admin/applications/changes', lastSeq, change => {
+            if (change.old_status === null || filters.status) {
+                needsReload = true;
+                return;
+            }
+            applicationsTable.updateRow(applicationKey(change), { status: change.new_status });
+            adjustStatusFacet(change.old_status, -1);
+            adjustStatusFacet(change.new_status, 1);
+            changed = true;
         });
-        selectHtml += `</select>`;
-
-        tr.innerHTML = `
-            <td><strong>${app.entry_number}</strong></td>
-            <td>${app.company_name}</td>
-            <td>${app.designation}</td>
-            <td><span class="badge status-${app.status.toLowerCase().replace(' ', '-')}">${app.status}</span></td>
-            <td>${selectHtml}</td>
-        `;
-        tbody.appendChild(tr);
+    } catch (error) {
+        console.error("Admin sync error:", error);
+    }
+
+    if (needsReload) {
+        reloadApplications(true);
+    } else if (changed) {
+        renderFilters(applicationsTable.total);
+    }
+    if (needsReload || changed) loadStats();
+}
+
+function adjustStatusFacet(status, delta) {
+    const facet = facets.statuses.find(f => f.status === status);
+    if (facet) {
+        facet.count += delta;
+    } else if (delta > 0) {
+        facets.statuses.push({ status: status, count: delta });
+    }
+}
+
+function renderFilters(total) {
+    fillFacetSelect('filter-profile', 'All profiles', facets.profiles.map(f => ({
+        value: f.profile_code,
+        label: `${f.profile_code} · ${f.company_name} · ${f.designation} (${f.count})`
+    })), filters.profile_code);
+    fillFacetSelect('filter-status', 'All statuses', facets.statuses.map(f => ({
+        value: f.status,
+        label: `${f.status} (${f.count})`
+    })), filters.status);
+
+    document.getElementById('admin-apps-summary').textContent = `${total} applications`;
+}
+
+function renderUserRow(user) {
+    return `
+        <td>${user.userid}</td>
+        <td><span class="badge" style="background:#eee">${user.role}</span></td>
+    `;
+}
+
+function renderApplicationRow(app) {
+    // Admin dropdown to force status change; the handler works off the row key,
+    // not this element, so the row may scroll out of the DOM meanwhile
+    const key = applicationKey(app);
+    let selectHtml = `<select onchange="adminChangeStatus('${key}', this.value)" class="admin-select">`;
+
+    STATUS_OPTIONS.forEach(status => {
+        const selected = app.status === status ? 'selected' : '';
+        selectHtml += `<option value="${status}" ${selected}>${status}</option>`;
     });
+    selectHtml += `</select>`;
+
+    return `
+        <td><strong>${app.entry_number}</strong></td>
+        <td>${app.company_name}</td>
+        <td>${app.designation}</td>
+        <td><span class="badge status-${app.status.toLowerCase().replace(' ', '-')}">${app.status}</span></td>
+        <td>${selectHtml}</td>
+    `;
 }
 
-async function adminChangeStatus(selectElem, profileCode, studentId) {
-    const newStatus = selectElem.value;
-    const originalValue = selectElem.getAttribute('data-original'); // You'd need to store this to be perfect, but skipping for simplicity
+async function adminChangeStatus(key, newStatus) {
+    const app = applicationsTable.get(key);
+    if (!app) return;
 
-    if(!confirm(`⚠️ ADMIN OVERRIDE:\nForce change ${studentId}'s status to '${newStatus}'?`)) {
-        // user cancelled, reload to reset dropdown
-        loadAdminData();
+    if(!confirm(`⚠️ ADMIN OVERRIDE:\nForce change ${app.entry_number}'s status to '${newStatus}'?`)) {
+        // user cancelled, re-render to reset dropdown
+        applicationsTable.scheduleRender();
         return;
     }
 
     try {
-        const response = await fetch(`${API_BASE_URL}/recruiter/application/change_status`, {
-            method: 'POST',
-            headers: getAuthHeaders(),
-            body: JSON.stringify({
-                profile_code: profileCode,
-                entry_number: studentId,
-                new_status: newStatus
-            })
+        const response = await postAction('/recruiter/application/change_status', {
+            profile_code: app.profile_code,
+            entry_number: app.entry_number,
+            new_status: newStatus
         });
 
         const data = await response.json();
         if (data.success) {
-            // refresh to show correct badges
-            loadAdminData();
+            // pull just the changed rows to show correct badges
+            syncApplications();
         } else {
             alert("Error: " + data.error);
+            applicationsTable.scheduleRender();
         }
     } catch (error) {
         console.error(error);
         alert("Failed to update");
+        applicationsTable.scheduleRender();
     }
-}
\ No newline at end of file
+}
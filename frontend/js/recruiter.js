@@ -2,25 +2,67 @@ document.addEventListener('DOMContentLoaded', () => {
     checkAuth();
     document.getElementById('userDisplay').textContent = localStorage.getItem('userid');
 
-    loadApplications();
+    // Only the rows in view are rendered; further pages load on scroll
+    applicationsTable = new VirtualTable({
+        container: document.getElementById('applications-scroll'),
+        tbody: document.getElementById('applications-table-body'),
+        columns: 6,
+        rowKey: applicationKey,
+        renderRow: renderApplicationRow,
+        fetchPage: fetchApplicationsPage,
+        emptyText: 'No applications yet.'
+    });
+    // The service worker's copy first; reloaded once its revalidation brings news
+    loadApplications(false, true);
+    subscribeToCacheUpdates(paths => {
+        if (paths.includes('/recruiter/applications')) loadApplications(true, true);
+    });
+    if (!subscribeToStatusEvents(syncApplications)) {
+        setInterval(syncApplications, CHANGE_POLL_INTERVAL);
+    }
 
     // Handle Create Profile
     document.getElementById('createProfileForm').addEventListener('submit', createProfile);
+
+    // Filters re-query the server, which also returns fresh facet counts
+    document.getElementById('filter-profile').addEventListener('change', e => {
+        filters.profile_code = e.target.value;
+        loadApplications();
+    });
+    document.getElementById('filter-status').addEventListener('change', e => {
+        filters.status = e.target.value;
+        loadApplications();
+    });
 });
 
+// This recruiter's applications, loaded page by page and kept current by the change feed
+let applicationsTable;
+let lastSeq = null;  // change-feed position of the loaded pages (null while reloading)
+let filters = { profile_code: '', status: '' };
+let facets = { profiles: [], statuses: [] };
+let applicationsFromCache = true;  // page fetches may use the service worker's copy
+
+// "CS, EE" -> ['CS', 'EE']; blank -> null (no restriction)
+function codeList(value) {
+    const codes = value.split(',').map(code => code.trim()).filter(code => code);
+    return codes.length ? codes : null;
+}
+
 async function createProfile(e) {
     e.preventDefault();
     const company = document.getElementById('companyName').value;
     const designation = document.getElementById('designation').value;
+    const openings = document.getElementById('openings').value;
+    const minCgpa = document.getElementById('minCgpa').value;
 
     try {
-        const response = await fetch(`${API_BASE_URL}/recruiter/create_profile`, {
-            method: 'POST',
-            headers: getAuthHeaders(),
-            body: JSON.stringify({
-                company_name: company,
-                designation: designation
-            })
+        const response = await postAction('/recruiter/create_profile', {
+            company_name: company,
+            designation: designation,
+            openings: openings === '' ? null : parseInt(openings, 10),
+            eligible_branches: codeList(document.getElementById('eligibleBranches').value),
+            eligible_degrees: codeList(document.getElementById('eligibleDegrees').value),
+            min_cgpa: minCgpa === '' ? null : parseFloat(minCgpa)
         });
 
         const data = await response.json();
@@ -37,73 +79,122 @@ async function createProfile(e) {
     }
 }
 
-async function loadApplications() {
-    try {
-        const response = await fetch(`${API_BASE_URL}/recruiter/applications`, {
-            headers: getAuthHeaders()
-        });
+function loadApplications(keepScroll = false, cached = false) {
+    lastSeq = null;
+    applicationsFromCache = cached;
+    return applicationsTable.reload({ keepScroll: keepScroll });
+}
 
-        const data = await response.json();
-        const tbody = document.getElementById('applications-table-body');
-        tbody.innerHTML = '';
+async function fetchApplicationsPage(page) {
+    const params = new URLSearchParams({ page: page, per_page: VIRTUAL_PAGE_SIZE });
+    if (filters.profile_code) params.set('profile_code', filters.profile_code);
+    if (filters.status) params.set('status', filters.status);
 
-        if (data.applications.length === 0) {
-            tbody.innerHTML = '<tr><td colspan="6" style="text-align:center;">No applications yet.</td></tr>';
-            return;
-        }
+    const response = await apiFetch(`/recruiter/applications?${params}`, {
+        headers: cachedReadHeaders(applicationsFromCache)
+    });
 
-        data.applications.forEach(app => {
-            const tr = document.createElement('tr');
-
-            // Determine available actions based on status
-            let actionButtons = '';
-
-            if (app.status === 'Applied') {
-                actionButtons = `
-                    <button onclick="updateStatus(${app.profile_code}, '${app.entry_number}', 'Selected')" class="btn-success btn-sm">Select</button>
-                    <button onclick="updateStatus(${app.profile_code}, '${app.entry_number}', 'Not Selected')" class="btn-danger btn-sm">Reject</button>
-                `;
-            } else if (app.status === 'Selected') {
-                actionButtons = `<span class="badge status-selected">Waiting for Student</span>`;
-                // Option to revert if needed
-                actionButtons += ` <button onclick="updateStatus(${app.profile_code}, '${app.entry_number}', 'Applied')" class="btn-sm" style="font-size:0.7rem; margin-left:5px;">Undo</button>`;
-            } else {
-                actionButtons = `<span class="badge status-${app.status.toLowerCase().replace(' ', '-')}">${app.status}</span>`;
-            }
+    const data = await response.json();
+    if (!data.success) throw new Error(data.error);
 
-            tr.innerHTML = `
-                <td>${app.profile_code}</td>
-                <td>${app.company_name}</td>
-                <td>${app.designation}</td>
-                <td><strong>${app.entry_number}</strong></td>
-                <td><span class="badge status-${app.status.toLowerCase().replace(' ', '-')}">${app.status}</span></td>
-                <td>${actionButtons}</td>
-            `;
-            tbody.appendChild(tr);
-        });
+    // Later pages are newer than the first; replaying changes onto them is harmless
+    if (lastSeq === null) lastSeq = data.last_seq || 0;
+    facets = data.facets;
+    renderFilters(data.total);
+    return { rows: data.applications, total: data.total };
+}
+
+// Apply status changes to loaded rows locally (rows not loaded yet arrive
+// fresh when scrolled to); anything that moves rows re-queries the window
+async function syncApplications() {
+    if (lastSeq === null) return;
+    let changed = false;
+    let needsReload = false;
 
+    try {
+        lastSeq = await pullChanges('/recruiter/applications/changes', lastSeq, change => {
+            if (change.old_status === null || filters.status) {
+                needsReload = true;
+                return;
+            }
+            applicationsTable.updateRow(applicationKey(change), { status: change.new_status });
+            adjustStatusFacet(change.old_status, -1);
+            adjustStatusFacet(change.new_status, 1);
+            changed = true;
+        });
     } catch (error) {
-        console.error("Error loading apps:", error);
+        console.error("Error syncing apps:", error);
+    }
+
+    if (needsReload) {
+        loadApplications(true);
+    } else if (changed) {
+        renderFilters(applicationsTable.total);
+    }
+}
+
+function adjustStatusFacet(status, delta) {
+    const facet = facets.statuses.find(f => f.status === status);
+    if (facet) {
+        facet.count += delta;
+    } else if (delta > 0) {
+        facets.statuses.push({ status: status, count: delta });
     }
 }
 
+function renderFilters(total) {
+    fillFacetSelect('filter-profile', 'All profiles', facets.profiles.map(f => ({
+        value: f.profile_code,
+        label: `${f.profile_code} · ${f.designation} (${f.count})`
+    })), filters.profile_code);
+    fillFacetSelect('filter-status', 'All statuses', facets.statuses.map(f => ({
+        value: f.status,
+        label: `${f.status} (${f.count})`
+    })), filters.status);
+
+    document.getElementById('applications-summary').textContent = `${total} applications`;
+}
+
+function renderApplicationRow(app) {
+    // Determine available actions based on status
+    let actionButtons = '';
+
+    if (app.status === 'Applied') {
+        actionButtons = `
+            <button onclick="updateStatus(${app.profile_code}, '${app.entry_number}', 'Selected')" class="btn-success btn-sm">Select</button>
+            <button onclick="updateStatus(${app.profile_code}, '${app.entry_number}', 'Not Selected')" class="btn-danger btn-sm">Reject</button>
+        `;
+    } else if (app.status === 'Selected') {
+        actionButtons = `<span class="badge status-selected">Waiting for Student</span>`;
+        // Option to revert if needed
+        actionButtons += ` <button onclick="updateStatus(${app.profile_code}, '${app.entry_number}', 'Applied')" class="btn-sm" style="font-size:0.7rem; margin-left:5px;">Undo</button>`;
+    } else {
+        actionButtons = `<span class="badge status-${app.status.toLowerCase().replace(' ', '-')}">${app.status}</span>`;
+    }
+
+    return `
+        <td>${app.profile_code}</td>
+        <td>${app.company_name}</td>
+        <td>${app.designation}</td>
+        <td><strong>${app.entry_number}</strong></td>
+        <td><span class="badge status-${app.status.toLowerCase().replace(' ', '-')}">${app.status}</span></td>
+        <td>${actionButtons}</td>
+    `;
+}
+
 async function updateStatus(profileCode, studentId, newStatus) {
     if (!confirm(`Change status of ${studentId} to '${newStatus}'?`)) return;
 
     try {
-        const response = await fetch(`${API_BASE_URL}/recruiter/application/change_status`, {
-            method: 'POST',
-            headers: getAuthHeaders(),
-            body: JSON.stringify({
-                profile_code: profileCode,
-                entry_number: studentId,
-                new_status: newStatus
-            })
+        const response = await postAction('/recruiter/application/change_status', {
+            profile_code: profileCode,
+            entry_number: studentId,
+            new_status: newStatus
         });
 
         const data = await response.json();
         if (data.success) {
-            loadApplications(); // Refresh table
+            syncApplications(); // Pull just the changed rows
         } else {
             alert(data.error);
         }
@@ -1,22 +1,46 @@
 document.addEventListener('DOMContentLoaded', () => {
     checkAuth(); // From utils.js
-    loadDashboard();
+    loadDashboard(true);
+
+    // Re-render as soon as a recruiter changes one of our applications
+    subscribeToStatusEvents(() => loadDashboard());
+
+    // The cached copy shown first turned out to be out of date
+    subscribeToCacheUpdates(() => loadDashboard(true));
+
+    // An action made offline has been sent
+    subscribeToReplayedActions(({ body }) => {
+        if (body && !body.success) alert(body.error);
+        loadDashboard();
+    });
 
 
     document.getElementById('userDisplay').textContent = localStorage.getItem('userid');
+
+    const searchInput = document.getElementById('profile-search');
+    searchInput.addEventListener('input', () => {
+        clearTimeout(suggestTimer);
+        suggestTimer = setTimeout(() => suggestProfiles(searchInput.value), 150);
+    });
+    searchInput.addEventListener('change', () => searchProfiles(searchInput.value));
 });
 
-async function loadDashboard() {
+// Applications of the current student, used to badge already-applied profiles
+let myApplications = [];
+let suggestTimer = null;
+
+// cached: show the service worker's last copy at once (it revalidates behind it)
+async function loadDashboard(cached = false) {
     const loading = document.getElementById('loading');
     const offerView = document.getElementById('offer-view');
     const browsingView = document.getElementById('browsing-view');
 
     try {
-        // 1. First, check my own status (Are we locked?)
-        const myAppsResponse = await fetch(`${API_BASE_URL}/student/applications/mine`, {
-            headers: getAuthHeaders()
-        });
-        const myAppsData = await myAppsResponse.json();
+        // 1. My own status (Are we locked?) and the listing, in one round trip
+        const [{ body: myAppsData }, profilesResult] = await Promise.all([
+            batchedGet('/student/applications/mine', { cached }),
+            batchedGet('/student/profiles', { cached })
+        ]);
 
         // Find if we have any 'Selected' or 'Accepted' offer
         const activeOffer = myAppsData.applications.find(app =>
@@ -38,7 +62,10 @@ async function loadDashboard() {
             browsingView.style.display = 'block';
 
 
-            loadProfiles(myAppsData.applications);
+            myApplications = myAppsData.applications;
+            if (profilesResult.status === 200) {
+                renderProfiles(profilesResult.body.profiles);
+            }
         }
 
     } catch (error) {
@@ -73,11 +100,9 @@ function renderOfferView(offer) {
     }
 }
 
-async function loadProfiles(myApplications) {
+async function loadProfiles() {
     try {
-        const response = await fetch(`${API_BASE_URL}/student/profiles`, {
-            headers: getAuthHeaders()
-        });
+        const response = await apiFetch('/student/profiles');
 
         if (response.status === 403) {
             // Safety fallback if backend blocks us
@@ -85,52 +110,100 @@ async function loadProfiles(myApplications) {
         }
 
         const data = await response.json();
-        const tbody = document.getElementById('profiles-table-body');
-        tbody.innerHTML = '';
-
-        data.profiles.forEach(profile => {
-            const tr = document.createElement('tr');
-
-            // Check if I already applied to this profile
-            const myApp = myApplications.find(app => app.profile_code === profile.profile_code);
-
-            let actionHtml = '';
-            if (myApp) {
-                // Already applied
-                actionHtml = `<span class="badge status-${myApp.status.toLowerCase().replace(' ', '-')}">${myApp.status}</span>`;
-            } else {
-                // Can apply
-                actionHtml = `<button onclick="applyToJob(${profile.profile_code})" class="btn-apply">Apply</button>`;
-            }
+        renderProfiles(data.profiles);
+
+    } catch (error) {
+        console.error("Error loading profiles:", error);
+    }
+}
+
+async function searchProfiles(query) {
+    query = query.trim();
+    if (!query) {
+        loadProfiles();
+        return;
+    }
+
+    try {
+        const response = await apiFetch(`/student/profiles/search?q=${encodeURIComponent(query)}`);
+
+        if (response.status === 403) return;
+
+        const data = await response.json();
+        if (data.success) renderProfiles(data.profiles);
 
-            tr.innerHTML = `
-                <td>${profile.company_name}</td>
-                <td>${profile.designation}</td>
-                <td>${actionHtml}</td>
-            `;
-            tbody.appendChild(tr);
+    } catch (error) {
+        console.error("Error searching profiles:", error);
+    }
+}
+
+async function suggestProfiles(prefix) {
+    const datalist = document.getElementById('profile-suggestions');
+    prefix = prefix.trim();
+    if (!prefix) {
+        datalist.innerHTML = '';
+        return;
+    }
+
+    try {
+        const response = await apiFetch(`/student/profiles/autocomplete?prefix=${encodeURIComponent(prefix)}`);
+        const data = await response.json();
+        if (!data.success) return;
+
+        datalist.innerHTML = '';
+        data.suggestions.forEach(suggestion => {
+            const option = document.createElement('option');
+            option.value = suggestion.company_name;
+            option.textContent = suggestion.designation;
+            datalist.appendChild(option);
         });
 
     } catch (error) {
-        console.error("Error loading profiles:", error);
+        console.error("Error loading suggestions:", error);
     }
 }
 
+function renderProfiles(profiles) {
+    const tbody = document.getElementById('profiles-table-body');
+    tbody.innerHTML = '';
+
+    profiles.forEach(profile => {
+        const tr = document.createElement('tr');
+
+        // Check if I already applied to this profile
+        const myApp = myApplications.find(app => app.profile_code === profile.profile_code);
+
+        let actionHtml = '';
+        if (myApp) {
+            // Already applied
+            actionHtml = `<span class="badge status-${myApp.status.toLowerCase().replace(' ', '-')}">${myApp.status}</span>`;
+        } else {
+            // Can apply
+            actionHtml = `<button onclick="applyToJob(${profile.profile_code})" class="btn-apply">Apply</button>`;
+        }
+
+        tr.innerHTML = `
+            <td>${profile.company_name}</td>
+            <td>${profile.designation}</td>
+            <td>${actionHtml}</td>
+        `;
+        tbody.appendChild(tr);
+    });
+}
+
 // === ACTIONS ===
 
 async function applyToJob(profileCode) {
     if(!confirm("Are you sure you want to apply?")) return;
 
     try {
-        const response = await fetch(`${API_BASE_URL}/student/apply`, {
-            method: 'POST',
-            headers: getAuthHeaders(),
-            body: JSON.stringify({ profile_code: profileCode })
-        });
+        const response = await postAction('/student/apply', { profile_code: profileCode });
 
         const data = await response.json();
 
-        if (data.success) {
+        if (data.queued) {
+            alert(data.message); // Offline: sent later by the service worker
+        } else if (data.success) {
             alert("Applied successfully!");
             loadDashboard(); // Refresh UI
         } else {
@@ -146,11 +219,7 @@ async function respondToOffer(profileCode, action) {
     if(!confirm(`Are you sure you want to ${action.toUpperCase()} this offer? This cannot be undone.`)) return;
 
     try {
-        const response = await fetch(`${API_BASE_URL}/student/application/${action}`, {
-            method: 'POST',
-            headers: getAuthHeaders(),
-            body: JSON.stringify({ profile_code: profileCode })
-        });
+        const response = await postAction(`/student/application/${action}`, { profile_code: profileCode });
 
         const data = await response.json();
 
@@ -15,13 +15,293 @@ function checkAuth() {
     const token = localStorage.getItem('token');
     if (!token) {
         window.location.href = 'index.html';
+        return;
+    }
+    setInterval(keepSessionAlive, TOKEN_CHECK_INTERVAL);
+}
+
+
+// Authenticated request to an /api path. A token close to expiry comes back
+// renewed in X-Refreshed-Token and replaces the stored one.
+async function apiFetch(path, options = {}) {
+    const response = await fetch(`${API_BASE_URL}${path}`, {
+        ...options,
+        headers: { ...getAuthHeaders(), ...options.headers }
+    });
+
+    const refreshed = response.headers.get('X-Refreshed-Token');
+    if (refreshed) localStorage.setItem('token', refreshed);
+    return response;
+}
+
+// Pages that only listen to the event stream make no requests to renew
+// their token on, so they renew it themselves shortly before it expires
+const TOKEN_CHECK_INTERVAL = 5 * 60 * 1000;
+const TOKEN_RENEW_BEFORE = 15 * 60;
+
+
+function tokenExpiry() {
+    try {
+        const payload = localStorage.getItem('token').split('.')[1];
+        return JSON.parse(atob(payload.replace(/-/g, '+').replace(/_/g, '/'))).exp;
+    } catch (error) {
+        return null;
+    }
+}
+
+
+async function keepSessionAlive() {
+    const exp = tokenExpiry();
+    if (exp === null || exp - Date.now() / 1000 > TOKEN_RENEW_BEFORE) return;
+
+    try {
+        await apiFetch('/token/refresh', { method: 'POST' });
+    } catch (error) {
+        console.error("Token refresh error:", error);
     }
 }
 
 
 function logout() {
+    // Cached lists and queued actions belong to this user
+    postToServiceWorker({ type: 'logout' });
+
+    // Revoke the session server-side; keepalive lets it finish after we navigate away
+    if (localStorage.getItem('token')) {
+        fetch(`${API_BASE_URL}/logout`, { method: 'POST', headers: getAuthHeaders(), keepalive: true })
+            .catch(() => {});
+    }
     localStorage.removeItem('token');
     localStorage.removeItem('role');
     localStorage.removeItem('userid');
     window.location.href = 'index.html';
-}
\ No newline at end of file
+}
+
+// One Idempotency-Key per pending action: double clicks and retries of the
+// same action reuse it, so the server runs the action only once
+const pendingActionKeys = new Map();
+
+
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+
+async function postAction(path, payload) {
+    const body = JSON.stringify(payload);
+    const action = `${path}|${body}`;
+    if (!pendingActionKeys.has(action)) {
+        pendingActionKeys.set(action, newIdempotencyKey());
+    }
+
+    const response = await apiFetch(path, {
+        method: 'POST',
+        headers: { 'Idempotency-Key': pendingActionKeys.get(action) },
+        body
+    });
+
+    // Answered: the next click is a new action. A network error keeps the key.
+    pendingActionKeys.delete(action);
+    return response;
+}
+
+// GETs issued in the same tick are sent together through /api/batch, so a
+// page that loads several resources on start pays one round trip for them
+const BATCH_MAX_REQUESTS = 20;
+let batchQueue = [];
+
+
+// GET an /api path, resolving to { status, body }. With cached: true the
+// service worker may answer from its last copy (see cachedReadHeaders).
+function batchedGet(path, { cached = false } = {}) {
+    return new Promise((resolve, reject) => {
+        batchQueue.push({ path, cached, resolve, reject });
+        if (batchQueue.length === 1) setTimeout(flushBatchQueue, 0);
+    });
+}
+
+
+function flushBatchQueue() {
+    const queued = batchQueue;
+    batchQueue = [];
+
+    // Cached and fresh reads go in separate batches
+    [true, false].forEach(cached => {
+        const entries = queued.filter(entry => entry.cached === cached);
+        for (let start = 0; start < entries.length; start += BATCH_MAX_REQUESTS) {
+            sendBatch(entries.slice(start, start + BATCH_MAX_REQUESTS), cached);
+        }
+    });
+}
+
+
+async function sendBatch(entries, cached) {
+    try {
+        if (entries.length === 1) {
+            const response = await apiFetch(entries[0].path, { headers: cachedReadHeaders(cached) });
+            entries[0].resolve({ status: response.status, body: await response.json() });
+            return;
+        }
+
+        const response = await apiFetch('/batch', {
+            method: 'POST',
+            headers: cachedReadHeaders(cached),
+            body: JSON.stringify({
+                requests: entries.map(entry => ({ method: 'GET', path: `${API_BASE_URL}${entry.path}` }))
+            })
+        });
+        const data = await response.json();
+
+        entries.forEach((entry, i) => entry.resolve(
+            data.success ? data.responses[i] : { status: response.status, body: data }
+        ));
+    } catch (error) {
+        entries.forEach(entry => entry.reject(error));
+    }
+}
+
+// === Service worker (sw.js) ===
+// It keeps the last copy of the catalog and application lists per user and
+// queues apply/accept/reject made while offline. Pages read the copy on
+// their first load, and reload when the worker reports that its background
+// revalidation brought something new.
+
+// Asks the service worker for its cached copy of a read
+const CACHED_READ_HEADER = 'X-Cached-Read';
+
+const cacheUpdateHandlers = [];
+const replayedActionHandlers = [];
+
+
+function cachedReadHeaders(cached) {
+    // Only a controlled page's requests reach the worker; others need no header
+    const controlled = 'serviceWorker' in navigator && navigator.serviceWorker.controller;
+    return cached && controlled ? { [CACHED_READ_HEADER]: '1' } : {};
+}
+
+
+function postToServiceWorker(message) {
+    if (!('serviceWorker' in navigator)) return;
+    navigator.serviceWorker.ready.then(registration => registration.active.postMessage(message));
+}
+
+
+// Hand the worker the current token and let it send what it queued offline
+function flushQueuedActions() {
+    const token = localStorage.getItem('token');
+    if (token) postToServiceWorker({ type: 'flush', token: token });
+}
+
+
+// onUpdate(paths) runs when cached /api paths (e.g. '/student/profiles') changed
+function subscribeToCacheUpdates(onUpdate) {
+    cacheUpdateHandlers.push(onUpdate);
+}
+
+
+// onReplayed({ path, status, body }) runs for each queued action once it was sent
+function subscribeToReplayedActions(onReplayed) {
+    replayedActionHandlers.push(onReplayed);
+}
+
+
+function registerServiceWorker() {
+    if (!('serviceWorker' in navigator)) return;
+
+    navigator.serviceWorker.register('sw.js')
+        .catch(error => console.error("Service worker registration error:", error));
+
+    navigator.serviceWorker.addEventListener('message', event => {
+        const message = event.data || {};
+        if (message.type === 'cache-updated') {
+            cacheUpdateHandlers.forEach(handler => handler(message.paths));
+        } else if (message.type === 'action-replayed') {
+            replayedActionHandlers.forEach(handler => handler(message));
+        } else if (message.type === 'token' && localStorage.getItem('token')) {
+            // Renewed on a background revalidation
+            localStorage.setItem('token', message.token);
+        }
+    });
+
+    window.addEventListener('online', flushQueuedActions);
+    flushQueuedActions();
+}
+
+registerServiceWorker();
+
+// How often dashboards poll the change feed (ms)
+const CHANGE_POLL_INTERVAL = 15000;
+
+
+function applicationKey(app) {
+    return `${app.profile_code}:${app.entry_number}`;
+}
+
+
+// Pull every status change after `since` from a /changes endpoint,
+// calling onChange for each one. Returns the new last_seq.
+async function pullChanges(path, since, onChange) {
+    let hasMore = true;
+
+    while (hasMore) {
+        const response = await apiFetch(`${path}?since=${since}`);
+        const data = await response.json();
+        if (!data.success) break;
+
+        data.changes.forEach(onChange);
+        since = data.last_seq;
+        hasMore = data.has_more;
+    }
+
+    return since;
+}
+
+
+// Open the Server-Sent Events stream of status changes for the current user.
+// Returns false when the browser has no EventSource, so callers can fall back to polling.
+function subscribeToStatusEvents(onStatus) {
+    if (!window.EventSource) return false;
+
+    let lastEventId = '';
+    const open = () => {
+        // The token in the URL is fixed per connection: once it is refused
+        // (renewed and expired, or logged out), reopen with the current one
+        const token = encodeURIComponent(localStorage.getItem('token'));
+        const source = new EventSource(
+            `${API_BASE_URL}/events/stream?token=${token}&last_event_id=${lastEventId}`
+        );
+        // Ids are the server's resume watermark, carried by both event types
+        source.addEventListener('status', event => {
+            lastEventId = event.lastEventId;
+            onStatus(JSON.parse(event.data));
+        });
+        source.addEventListener('checkpoint', event => {
+            lastEventId = event.lastEventId;
+        });
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) setTimeout(open, SSE_REOPEN_DELAY);
+        };
+    };
+    open();
+    return true;
+}
+
+// Wait before reopening a refused event stream (ms)
+const SSE_REOPEN_DELAY = 5000;
+
+
+// Refill a filter <select> with facet options ({ value, label }) after an "all" option
+function fillFacetSelect(selectId, allLabel, options, selected) {
+    const select = document.getElementById(selectId);
+    select.innerHTML = `<option value="">${allLabel}</option>`;
+    options.forEach(({ value, label }) => {
+        const option = document.createElement('option');
+        option.value = value;
+        option.textContent = label;
+        select.appendChild(option);
+    });
+    select.value = selected;
+}
@@ -0,0 +1,165 @@
+// Windowed table: only the rows in (and just around) the visible part of the
+// scroll container are in the DOM. Rows are fetched page by page from a
+// paginated endpoint as they scroll into view and kept in a sparse model,
+// so actions and change-feed updates work on rows that are not rendered.
+//
+//   const table = new VirtualTable({
+//       container: document.getElementById('apps-scroll'),  // overflow-y: auto
+//       tbody: document.getElementById('apps-body'),
+//       columns: 5,
+//       rowKey: app => applicationKey(app),
+//       renderRow: app => `<td>...</td>`,
+//       fetchPage: async page => ({ rows: [...], total: 1234 })
+//   });
+//   table.reload();
+
+const VIRTUAL_ROW_HEIGHT = 45;   // px, every row is clamped to this height
+const VIRTUAL_OVERSCAN = 10;     // rows rendered above and below the viewport
+const VIRTUAL_PAGE_SIZE = 100;   // rows per fetched page (the endpoints' per_page)
+
+
+class VirtualTable {
+    constructor({ container, tbody, columns, rowKey, renderRow, fetchPage,
+                  rowHeight = VIRTUAL_ROW_HEIGHT, pageSize = VIRTUAL_PAGE_SIZE,
+                  emptyText = 'No rows.' }) {
+        this.container = container;
+        this.tbody = tbody;
+        this.columns = columns;
+        this.rowKey = rowKey;
+        this.renderRow = renderRow;
+        this.fetchPage = fetchPage;
+        this.rowHeight = rowHeight;
+        this.pageSize = pageSize;
+        this.emptyText = emptyText;
+
+        this.total = 0;
+        this.rows = [];            // sparse: index -> row
+        this.indexByKey = new Map();
+        this.loading = new Map();  // page -> fetch promise, pending or settled
+        this.measured = false;
+        this.generation = 0;       // bumped by reload() to drop late responses
+        this.renderQueued = false;
+
+        this.container.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+        window.addEventListener('resize', () => this.scheduleRender());
+    }
+
+    // Drop everything and fetch the rows at the current scroll position again
+    // (filters changed, or the data moved under the loaded pages)
+    async reload({ keepScroll = false } = {}) {
+        this.generation++;
+        this.rows = [];
+        this.indexByKey = new Map();
+        this.loading = new Map();
+        if (!keepScroll) this.container.scrollTop = 0;
+
+        const firstPage = this.visiblePages()[0];
+        await this.loadPage(firstPage);
+        this.render();
+    }
+
+    get(key) {
+        const index = this.indexByKey.get(key);
+        return index === undefined ? undefined : this.rows[index];
+    }
+
+    has(key) {
+        return this.indexByKey.has(key);
+    }
+
+    // Patch a loaded row in the model; it is re-rendered only if visible
+    updateRow(key, changes) {
+        const row = this.get(key);
+        if (!row) return false;
+        Object.assign(row, changes);
+        this.scheduleRender();
+        return true;
+    }
+
+    visibleRange() {
+        const first = Math.floor(this.container.scrollTop / this.rowHeight) - VIRTUAL_OVERSCAN;
+        const count = Math.ceil(this.container.clientHeight / this.rowHeight) + 2 * VIRTUAL_OVERSCAN;
+        const start = Math.max(0, first);
+        return [start, Math.min(this.total, start + count)];
+    }
+
+    visiblePages() {
+        const [start, end] = this.visibleRange();
+        const firstPage = Math.floor(start / this.pageSize) + 1;
+        const lastPage = Math.max(firstPage, Math.floor(Math.max(start, end - 1) / this.pageSize) + 1);
+        const pages = [];
+        for (let page = firstPage; page <= lastPage; page++) pages.push(page);
+        return pages;
+    }
+
+    loadPage(page) {
+        if (this.loading.has(page)) return this.loading.get(page);
+
+        const generation = this.generation;
+        const pending = this.fetchPage(page).then(({ rows, total }) => {
+            if (generation !== this.generation) return;
+            this.total = total;
+            const offset = (page - 1) * this.pageSize;
+            rows.forEach((row, i) => {
+                this.rows[offset + i] = row;
+                this.indexByKey.set(this.rowKey(row), offset + i);
+            });
+            this.scheduleRender();
+        }).catch(error => {
+            console.error('Table page load error:', error);
+            if (generation === this.generation) this.loading.delete(page);  // retried on next scroll
+        });
+
+        this.loading.set(page, pending);
+        return pending;
+    }
+
+    scheduleRender() {
+        if (this.renderQueued) return;
+        this.renderQueued = true;
+        requestAnimationFrame(() => {
+            this.renderQueued = false;
+            this.render();
+        });
+    }
+
+    spacer(height) {
+        return height > 0
+            ? `<tr class="virtual-spacer" style="height:${height}px"><td colspan="${this.columns}"></td></tr>`
+            : '';
+    }
+
+    // Spacer heights assume every row is rowHeight tall; take the real height
+    // from the first rendered row in case the stylesheet differs
+    measure() {
+        if (this.measured) return;
+        const sample = this.tbody.querySelector('.virtual-row');
+        if (!sample || !sample.offsetHeight) return;
+        this.measured = true;
+        if (sample.offsetHeight !== this.rowHeight) {
+            this.rowHeight = sample.offsetHeight;
+            this.scheduleRender();
+        }
+    }
+
+    render() {
+        if (this.total === 0) {
+            this.tbody.innerHTML = `<tr><td colspan="${this.columns}" style="text-align:center;">${this.emptyText}</td></tr>`;
+            return;
+        }
+
+        const [start, end] = this.visibleRange();
+        let html = this.spacer(start * this.rowHeight);
+        for (let i = start; i < end; i++) {
+            const row = this.rows[i];
+            html += row
+                ? `<tr class="virtual-row" data-key="${this.rowKey(row)}">${this.renderRow(row)}</tr>`
+                : `<tr class="virtual-row virtual-placeholder"><td colspan="${this.columns}">Loading…</td></tr>`;
+        }
+        html += this.spacer((this.total - end) * this.rowHeight);
+        this.tbody.innerHTML = html;
+        this.measure();
+
+        this.visiblePages().forEach(page => this.loadPage(page));
+    }
+}
@@ -0,0 +1,479 @@
+// Service worker: cached reads, offline pages and queued actions.
+//
+//   Pages, js/, css/   network first (a deploy shows up at once), the last
+//                      copy when offline. Fingerprinted /assets/ never
+//                      change, so they are served from the cache.
+//   Cached API reads   the catalog and the application lists (CACHED_READS),
+//                      directly or inside /api/batch. A read sent with the
+//                      X-Cached-Read header gets the last copy immediately and
+//                      is revalidated in the background with the request's own
+//                      Authorization; the pages are told when that brings
+//                      something new. Other reads go to the network and fall
+//                      back to the copy when offline.
+//   Queued actions     apply/accept/reject made offline are kept in IndexedDB
+//                      and sent in order, with their Idempotency-Key, once
+//                      the browser is back online.
+//
+// Copies are kept per user (the token's userid). A write drops its user's
+// copies, so nobody is shown a list older than their own last action, and
+// logging out drops everything.
+
+const API_BASE = '/api';
+
+const STATIC_CACHE = 'ocs-static-v1';
+const API_CACHE_PREFIX = 'ocs-api-';
+
+// Fingerprinted assets kept; the oldest go first (earlier deploys)
+const ASSET_CACHE_LIMIT = 60;
+
+// A copy younger than this (ms) is served without revalidating it
+const REVALIDATE_AFTER = 10 * 1000;
+
+const CACHED_READ_HEADER = 'X-Cached-Read';
+const CACHED_AT_HEADER = 'X-Cached-At';
+
+// API paths (below /api) whose GET responses are cached
+const CACHED_READS = [
+    /^\/student\/profiles$/,
+    /^\/student\/applications\/mine$/,
+    /^\/recruiter\/applications$/,
+    /^\/admin\/(stats|users|applications)$/
+];
+
+// Actions queued while offline
+const QUEUED_ACTIONS = ['/student/apply', '/student/application/accept', '/student/application/reject'];
+
+// Writes that change no data: passed through untouched
+const IGNORED_WRITES = ['/login', '/logout', '/token/refresh'];
+
+// Replies that keep a queued action for a later retry: an expired token,
+// a timeout, a duplicate still in progress, rate limiting and server or
+// proxy errors. Anything else is the action's final answer.
+const RETRY_STATUSES = [401, 408, 409, 429];
+
+const QUEUE_DB = 'ocs-offline';
+const QUEUE_STORE = 'actions';
+const SYNC_TAG = 'ocs-actions';
+
+// Most recent token seen from a page, used to replay queued actions
+let latestToken = null;
+
+// Bumped whenever cached copies are dropped, so revalidations that were
+// already running do not store what they fetched before the write
+let generation = 0;
+
+
+self.addEventListener('install', () => self.skipWaiting());
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter(name => name.startsWith('ocs-static-') && name !== STATIC_CACHE)
+            .map(name => caches.delete(name)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (url.pathname.startsWith(`${API_BASE}/`)) {
+        const path = apiPath(url);
+        if (request.method === 'GET') {
+            if (isCachedRead(path)) event.respondWith(read(event));
+        } else if (path === '/batch') {
+            event.respondWith(batch(event));
+        } else if (!IGNORED_WRITES.includes(path)) {
+            event.respondWith(write(event));
+        }
+        return;
+    }
+
+    if (request.method === 'GET') event.respondWith(staticFile(event));
+});
+
+self.addEventListener('message', event => {
+    const message = event.data || {};
+    if (message.type === 'flush') {
+        event.waitUntil(replayQueue(message.token));
+    } else if (message.type === 'logout') {
+        latestToken = null;
+        event.waitUntil(forgetEverything());
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag !== SYNC_TAG) return;
+    // Rejecting asks the browser to try again later
+    event.waitUntil(replayQueue().then(done => {
+        if (!done) throw new Error("Queued actions not sent");
+    }));
+});
+
+
+// === Helpers ===
+
+function apiPath(url) {
+    return new URL(url, self.location.origin).pathname.slice(API_BASE.length);
+}
+
+function isCachedRead(path) {
+    return CACHED_READS.some(pattern => pattern.test(path));
+}
+
+function bearer(request) {
+    const header = request.headers.get('Authorization') || '';
+    return header.startsWith('Bearer ') ? header.slice(7) : null;
+}
+
+// userid claim of a token (not verified: it only picks the cache to use)
+function tokenUser(token) {
+    try {
+        const payload = token.split('.')[1];
+        return JSON.parse(atob(payload.replace(/-/g, '+').replace(/_/g, '/'))).userid || null;
+    } catch (error) {
+        return null;
+    }
+}
+
+function isRetryable(status) {
+    return status >= 500 || RETRY_STATUSES.includes(status);
+}
+
+function requestUser(request) {
+    const token = bearer(request);
+    if (token) latestToken = token;
+    return token ? tokenUser(token) : null;
+}
+
+function jsonResponse(data, status = 200, extraHeaders = {}) {
+    return new Response(JSON.stringify(data), {
+        status: status,
+        headers: { 'Content-Type': 'application/json', ...extraHeaders }
+    });
+}
+
+// The stored form of a response body: no refreshed token, stamped with its age
+function cacheCopy(body) {
+    return new Response(body, {
+        headers: { 'Content-Type': 'application/json', [CACHED_AT_HEADER]: String(Date.now()) }
+    });
+}
+
+function isStale(cached) {
+    return Date.now() - Number(cached.headers.get(CACHED_AT_HEADER) || 0) > REVALIDATE_AFTER;
+}
+
+// The request as the server should see it (without X-Cached-Read)
+async function forServer(request) {
+    const headers = new Headers(request.headers);
+    headers.delete(CACHED_READ_HEADER);
+    const init = { method: request.method, headers: headers, credentials: request.credentials, cache: 'no-store' };
+    if (request.method !== 'GET' && request.method !== 'HEAD') {
+        init.body = await request.clone().text();
+    }
+    return new Request(request.url, init);
+}
+
+async function notifyPages(message) {
+    const pages = await self.clients.matchAll({ type: 'window' });
+    pages.forEach(page => page.postMessage(message));
+}
+
+// A background response can carry a renewed token the page never sees
+function passOnToken(response) {
+    const token = response.headers.get('X-Refreshed-Token');
+    if (token) notifyPages({ type: 'token', token: token });
+}
+
+async function dropCachedReads(user) {
+    generation++;
+    if (user) await caches.delete(API_CACHE_PREFIX + user);
+}
+
+async function forgetEverything() {
+    generation++;
+    const names = await caches.keys();
+    await Promise.all(names.filter(name => name.startsWith(API_CACHE_PREFIX)).map(name => caches.delete(name)));
+    await queueRequest('readwrite', store => store.clear());
+}
+
+
+// === Pages and assets ===
+
+async function staticFile(event) {
+    const request = event.request;
+    const cache = await caches.open(STATIC_CACHE);
+
+    if (new URL(request.url).pathname.startsWith('/assets/')) {
+        const cached = await cache.match(request);
+        if (cached) return cached;
+        const response = await fetch(request);
+        if (response.ok) event.waitUntil(storeAsset(cache, request, response.clone()));
+        return response;
+    }
+
+    try {
+        const response = await fetch(request);
+        if (response.ok) event.waitUntil(cache.put(request, response.clone()));
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request, { ignoreSearch: true });
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+async function storeAsset(cache, request, response) {
+    await cache.put(request, response);
+    const assets = (await cache.keys()).filter(key => new URL(key.url).pathname.startsWith('/assets/'));
+    await Promise.all(assets.slice(0, Math.max(0, assets.length - ASSET_CACHE_LIMIT)).map(key => cache.delete(key)));
+}
+
+
+// === Cached reads ===
+
+async function read(event) {
+    const request = event.request;
+    const user = requestUser(request);
+    const upstream = await forServer(request);
+    if (!user) return fetch(upstream);
+
+    const cache = await caches.open(API_CACHE_PREFIX + user);
+    const cached = await cache.match(request.url);
+
+    if (cached && request.headers.has(CACHED_READ_HEADER)) {
+        if (isStale(cached)) event.waitUntil(revalidate(cache, upstream, cached.clone()));
+        return cached;
+    }
+
+    const started = generation;
+    try {
+        const response = await fetch(upstream);
+        if (response.status === 200) event.waitUntil(storeCopy(cache, request.url, response.clone(), started));
+        return response;
+    } catch (error) {
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+async function storeCopy(cache, url, response, started) {
+    const body = await response.text();
+    if (generation === started) await cache.put(url, cacheCopy(body));
+}
+
+async function revalidate(cache, request, cached) {
+    const started = generation;
+    try {
+        const response = await fetch(request);
+        passOnToken(response);
+        if (response.status !== 200) return;
+
+        const body = await response.text();
+        if (generation !== started) return;
+        await cache.put(request.url, cacheCopy(body));
+        if (body !== await cached.text()) {
+            notifyPages({ type: 'cache-updated', paths: [apiPath(request.url)] });
+        }
+    } catch (error) {
+        // Offline: the cached copy stays
+    }
+}
+
+// Batches: the GETs in CACHED_READS are cached one by one, under their own
+// URL, so a batch and a direct read of the same list share one copy
+async function batch(event) {
+    const request = event.request;
+    const user = requestUser(request);
+    const upstream = await forServer(request);
+
+    let subs;
+    try {
+        subs = (await request.clone().json()).requests;
+    } catch (error) {
+        return fetch(upstream);
+    }
+    if (!user || !Array.isArray(subs)) return fetch(upstream);
+
+    const cache = await caches.open(API_CACHE_PREFIX + user);
+    const cached = await Promise.all(subs.map(sub =>
+        (sub.method || 'GET') === 'GET' && isCachedRead(apiPath(sub.path))
+            ? cache.match(new URL(sub.path, self.location.origin).href)
+            : null
+    ));
+    const allCached = cached.every(Boolean);
+
+    if (allCached && request.headers.has(CACHED_READ_HEADER)) {
+        if (cached.some(isStale)) {
+            const previous = cached.map(copy => copy.clone());
+            event.waitUntil(revalidateBatch(cache, upstream, subs, previous));
+        }
+        return batchResponse(cached);
+    }
+
+    const started = generation;
+    try {
+        const response = await fetch(upstream);
+        const previous = cached.map(copy => copy && copy.clone());
+        event.waitUntil(storeBatch(cache, subs, previous, response.clone(), started));
+        return response;
+    } catch (error) {
+        if (allCached) return batchResponse(cached);
+        throw error;
+    }
+}
+
+async function batchResponse(cached) {
+    const bodies = await Promise.all(cached.map(copy => copy.json()));
+    return jsonResponse({ success: true, responses: bodies.map(body => ({ status: 200, body: body })) });
+}
+
+// Store the cacheable sub-responses of a batch response; returns the API
+// paths whose copy changed. previous[i] is the old copy, undefined if there
+// was none, or null if subs[i] is not a cached read.
+async function storeBatch(cache, subs, previous, response, started) {
+    if (response.status !== 200) return [];
+    const data = await response.json();
+    if (!data.success || generation !== started) return [];
+
+    const changed = [];
+    await Promise.all(subs.map(async (sub, i) => {
+        const result = data.responses[i];
+        if (!result || result.status !== 200) return;
+        if (previous[i] === null) return;
+
+        const body = JSON.stringify(result.body);
+        await cache.put(new URL(sub.path, self.location.origin).href, cacheCopy(body));
+        if (previous[i] === undefined) return;
+        const before = await previous[i].json();
+        if (JSON.stringify(before) !== body) changed.push(apiPath(sub.path));
+    }));
+    return changed;
+}
+
+async function revalidateBatch(cache, request, subs, previous) {
+    const started = generation;
+    try {
+        const response = await fetch(request);
+        passOnToken(response);
+        const changed = await storeBatch(cache, subs, previous, response, started);
+        if (changed.length) notifyPages({ type: 'cache-updated', paths: changed });
+    } catch (error) {
+        // Offline: the cached copies stay
+    }
+}
+
+
+// === Writes and the offline queue ===
+
+async function write(event) {
+    const request = event.request;
+    const user = requestUser(request);
+    const path = apiPath(request.url);
+    const body = QUEUED_ACTIONS.includes(path) ? await request.clone().text() : null;
+
+    let response;
+    try {
+        response = await fetch(request);
+    } catch (error) {
+        if (body === null || !user) throw error;
+        return enqueue(request, user, path, body);
+    }
+
+    if (response.ok) await dropCachedReads(user);
+    return response;
+}
+
+function queueRequest(mode, operation) {
+    return new Promise((resolve, reject) => {
+        const open = indexedDB.open(QUEUE_DB, 1);
+        open.onupgradeneeded = () => {
+            open.result.createObjectStore(QUEUE_STORE, { keyPath: 'id', autoIncrement: true });
+        };
+        open.onerror = () => reject(open.error);
+        open.onsuccess = () => {
+            const db = open.result;
+            const transaction = db.transaction(QUEUE_STORE, mode);
+            const result = operation(transaction.objectStore(QUEUE_STORE));
+            transaction.oncomplete = () => {
+                db.close();
+                resolve(result.result);
+            };
+            transaction.onerror = () => {
+                db.close();
+                reject(transaction.error);
+            };
+        };
+    });
+}
+
+async function enqueue(request, user, path, body) {
+    const queued = await queueRequest('readonly', store => store.getAll());
+    // A second click while offline is the same action, not another one
+    const duplicate = queued.some(action => action.user === user && action.path === path && action.body === body);
+    if (!duplicate) {
+        await queueRequest('readwrite', store => store.add({
+            user: user,
+            path: path,
+            body: body,
+            token: bearer(request),
+            idempotency_key: request.headers.get('Idempotency-Key'),
+            queued_at: Date.now()
+        }));
+    }
+
+    if (self.registration.sync) {
+        self.registration.sync.register(SYNC_TAG).catch(() => {});
+    }
+
+    return jsonResponse({
+        success: true,
+        queued: true,
+        message: "You are offline. This will be sent as soon as you are back online."
+    }, 202);
+}
+
+let replaying = null;
+
+// Send the queued actions in order; resolves to true once the queue is empty
+function replayQueue(token) {
+    if (token) latestToken = token;
+    if (!replaying) {
+        replaying = sendQueued().finally(() => {
+            replaying = null;
+        });
+    }
+    return replaying;
+}
+
+async function sendQueued() {
+    const queued = await queueRequest('readonly', store => store.getAll());
+
+    for (const action of queued) {
+        // The page's current token if it is the same user's; it may have been renewed
+        const token = latestToken && tokenUser(latestToken) === action.user ? latestToken : action.token;
+        const headers = { 'Content-Type': 'application/json', 'Authorization': `Bearer ${token}` };
+        if (action.idempotency_key) headers['Idempotency-Key'] = action.idempotency_key;
+
+        let response;
+        try {
+            response = await fetch(`${API_BASE}${action.path}`, { method: 'POST', headers: headers, body: action.body });
+        } catch (error) {
+            return false;  // still offline
+        }
+        // Expired token (wait for a page to hand over a current one) or a
+        // failure worth retrying: stop here and try again later. The
+        // Idempotency-Key makes sending it again safe.
+        if (isRetryable(response.status)) return false;
+
+        await queueRequest('readwrite', store => store.delete(action.id));
+        await dropCachedReads(action.user);
+        const body = await response.json().catch(() => null);
+        notifyPages({ type: 'action-replayed', path: action.path, status: response.status, body: body });
+    }
+    return true;
+}
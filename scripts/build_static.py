@@ -0,0 +1,357 @@
+"""
+Static asset build
+Minifies and bundles frontend/ into dist/: every page gets one script bundle
+(js/utils.js + its page script) and the shared stylesheet, named by content
+hash so they can be cached forever. Assets are precompressed to .gz (and .br
+when the brotli package is installed) and the HTML is rewritten to point at
+the fingerprinted names.
+
+Output:
+    dist/*.html                     rewritten pages (revalidated on every load)
+    dist/sw.js                      service worker, copied as is (revalidated too)
+    dist/assets/<name>.<hash>.js    bundles, immutable
+    dist/assets/<name>.<hash>.css   stylesheets, immutable
+    dist/asset-manifest.json        source files -> fingerprinted asset
+    dist/_headers                   Cache-Control rules for static hosts
+
+Usage (from the repository root):
+    python scripts/build_static.py
+    python scripts/build_static.py --no-minify --out /tmp/dist
+
+The minifiers are deliberately conservative (comments and layout only, line
+breaks are kept so automatic semicolon insertion still applies); run the
+pages once against the build before deploying.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:  # .br files are skipped without it
+    brotli = None
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cache-Control values served for the build (mirrored in vercel.json)
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'public, max-age=0, must-revalidate'
+
+HASH_LENGTH = 10
+
+# Files smaller than this are not worth a compressed copy
+MIN_COMPRESS_BYTES = 256
+
+LOCAL_SCRIPT = re.compile(r'[ \t]*<script src="(js/[^"]+\.js)"></script>\n?')
+LOCAL_STYLESHEET = re.compile(r'<link rel="stylesheet" href="(css/[^"]+\.css)">')
+
+# After one of these a '/' starts a regex literal rather than a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+                   'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+
+# Spaces next to these can go without merging two tokens
+_JS_TIGHT = set('{}();,:[]=<>?&|')
+_CSS_TIGHT = set('{};:,>')
+# ...but 'a :hover' is not 'a:hover', so ':' only sheds the space after it
+_CSS_TIGHT_BEFORE = _CSS_TIGHT - {':'}
+
+
+def _skip_string(source, i):
+    """Index just past the quoted string starting at source[i]"""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+
+def _skip_template(source, i):
+    """Index just past the template literal starting at source[i]"""
+    i += 1
+    while i < len(source) and source[i] != '`':
+        if source[i] == '\\':
+            i += 2
+        elif source.startswith('${', i):
+            depth = 1
+            i += 2
+            while i < len(source) and depth:
+                c = source[i]
+                if c in '"\'':
+                    i = _skip_string(source, i)
+                    continue
+                if c == '`':
+                    i = _skip_template(source, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(c, 0)
+                i += 1
+        else:
+            i += 1
+    return i + 1
+
+
+def _skip_regex(source, i):
+    """Index just past the regex literal (and its flags) starting at source[i]"""
+    i += 1
+    in_class = False
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            break
+        i += 1
+    i += 1
+    while i < len(source) and source[i].isalpha():
+        i += 1
+    return i
+
+
+def _regex_allowed(out):
+    text = ''.join(out[-12:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in _REGEX_PRECEDERS:
+        return True
+    word = re.search(r'[A-Za-z_$]+$', text)
+    return bool(word) and word.group() in _REGEX_KEYWORDS
+
+
+def minify_js(source):
+    """
+    Strip comments and indentation from JavaScript
+
+    Strings, template literals and regex literals are copied verbatim.
+    Line breaks between statements are kept (collapsed to one) so code
+    relying on automatic semicolon insertion keeps working.
+    """
+    out = []
+    i = 0
+    n = len(source)
+
+    def emit_space(newline):
+        if not out or out[-1] == '\n':
+            return
+        if out[-1] == ' ':
+            if not newline:
+                return
+            out.pop()
+            if not out or out[-1] == '\n':
+                return
+        out.append('\n' if newline else ' ')
+
+    while i < n:
+        c = source[i]
+        if c in '"\'':
+            end = _skip_string(source, i)
+            out.append(source[i:end])
+            i = end
+        elif c == '`':
+            end = _skip_template(source, i)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            emit_space('\n' in source[i:end])
+            i = end
+        elif c == '/' and _regex_allowed(out):
+            end = _skip_regex(source, i)
+            out.append(source[i:end])
+            i = end
+        elif c.isspace():
+            end = i
+            while end < n and source[end].isspace():
+                end += 1
+            newline = '\n' in source[i:end]
+            if newline or not (out and out[-1][-1:] in _JS_TIGHT):
+                emit_space(newline)
+            i = end
+        else:
+            if c in _JS_TIGHT and out and out[-1] == ' ':
+                out.pop()
+            out.append(c)
+            i += 1
+
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    out = []
+    i = 0
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c in '"\'':
+            end = _skip_string(source, i)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c.isspace():
+            while i < n and source[i].isspace():
+                i += 1
+            if out and out[-1] not in _CSS_TIGHT and out[-1] != ' ' and \
+                    (i >= n or source[i] not in _CSS_TIGHT_BEFORE):
+                out.append(' ')
+        else:
+            if c in _CSS_TIGHT_BEFORE and out and out[-1] == ' ':
+                out.pop()
+            if c == '}' and out and out[-1] == ';':
+                out.pop()
+            out.append(c)
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+
+def fingerprint(name, data):
+    """'student.js' + content -> 'student.<sha256 prefix>.js'"""
+    stem, ext = os.path.splitext(name)
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return f"{stem}.{digest}{ext}"
+
+
+def write_compressed(path, data):
+    """Write path plus precompressed .gz/.br siblings; returns the sizes"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    sizes = {'raw': len(data)}
+    if len(data) < MIN_COMPRESS_BYTES:
+        return sizes
+
+    # mtime=0 keeps the .gz byte-identical between builds
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(path + '.gz', 'wb') as f:
+        f.write(compressed)
+    sizes['gz'] = len(compressed)
+
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        with open(path + '.br', 'wb') as f:
+            f.write(compressed)
+        sizes['br'] = len(compressed)
+    return sizes
+
+
+class StaticBuild:
+    """One build of src_dir into out_dir"""
+
+    def __init__(self, src_dir, out_dir, minify=True):
+        self.src_dir = src_dir
+        self.out_dir = out_dir
+        self.minify = minify
+        self.manifest = {}  # bundle key -> {"file", "sources", sizes}
+
+    def _read(self, relpath):
+        with open(os.path.join(self.src_dir, relpath), encoding='utf-8') as f:
+            return f.read()
+
+    def _emit(self, key, name, sources, text):
+        existing = self.manifest.get(key)
+        if existing:
+            return existing['file']
+
+        data = text.encode('utf-8')
+        filename = 'assets/' + fingerprint(name, data)
+        sizes = write_compressed(os.path.join(self.out_dir, filename), data)
+        self.manifest[key] = {'file': filename, 'sources': sources, **sizes}
+        return filename
+
+    def script_bundle(self, sources):
+        key = '+'.join(sources)
+        # Concatenated as separate statements; each file keeps its globals
+        text = ';\n'.join(self._read(src).strip() for src in sources) + '\n'
+        if self.minify:
+            text = minify_js(text)
+        return self._emit(key, os.path.basename(sources[-1]), sources, text)
+
+    def stylesheet(self, source):
+        text = self._read(source)
+        if self.minify:
+            text = minify_css(text)
+        return self._emit(source, os.path.basename(source), [source], text)
+
+    def page(self, name):
+        html = self._read(name)
+
+        scripts = LOCAL_SCRIPT.findall(html)
+        if scripts:
+            bundle = self.script_bundle(scripts)
+            first = LOCAL_SCRIPT.search(html)
+            indent = re.match(r'[ \t]*', first.group()).group()
+            html = (html[:first.start()] +
+                    f'{indent}<script src="{bundle}"></script>\n' +
+                    LOCAL_SCRIPT.sub('', html[first.start():]))
+
+        html = LOCAL_STYLESHEET.sub(
+            lambda m: f'<link rel="stylesheet" href="{self.stylesheet(m.group(1))}">', html
+        )
+        write_compressed(os.path.join(self.out_dir, name), html.encode('utf-8'))
+
+    def run(self):
+        if os.path.isdir(self.out_dir):
+            shutil.rmtree(self.out_dir)
+        os.makedirs(os.path.join(self.out_dir, 'assets'))
+
+        for name in sorted(os.listdir(self.src_dir)):
+            path = os.path.join(self.src_dir, name)
+            if name.endswith('.html'):
+                self.page(name)
+            elif os.path.isfile(path):
+                # Anything else at the top level (favicon, robots.txt) as is
+                shutil.copy2(path, os.path.join(self.out_dir, name))
+
+        with open(os.path.join(self.out_dir, 'asset-manifest.json'), 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        self.write_headers()
+        return self.manifest
+
+    def write_headers(self):
+        """
+        _headers file for hosts that read one (Netlify, Cloudflare Pages);
+        Vercel takes the same values from vercel.json
+        """
+        with open(os.path.join(self.out_dir, '_headers'), 'w') as f:
+            f.write(f"/assets/*\n  Cache-Control: {IMMUTABLE_CACHE}\n\n")
+            f.write(f"/*.html\n  Cache-Control: {REVALIDATE_CACHE}\n\n")
+            f.write(f"/sw.js\n  Cache-Control: {REVALIDATE_CACHE}\n\n")
+            f.write(f"/\n  Cache-Control: {REVALIDATE_CACHE}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build fingerprinted static assets')
+    parser.add_argument('--src', default=os.path.join(ROOT, 'frontend'))
+    parser.add_argument('--out', default=os.path.join(ROOT, 'dist'))
+    parser.add_argument('--no-minify', action='store_true',
+                        help='Bundle and fingerprint only (for debugging a build)')
+    args = parser.parse_args()
+
+    manifest = StaticBuild(args.src, args.out, minify=not args.no_minify).run()
+
+    for key, asset in sorted(manifest.items()):
+        sizes = ', '.join(f"{kind} {asset[kind]:,} B" for kind in ('raw', 'gz', 'br')
+                          if kind in asset)
+        print(f"✅ {asset['file']}  ({sizes})  <- {key}")
+    if brotli is None:
+        print("⚠️  brotli not installed, .br files skipped", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()